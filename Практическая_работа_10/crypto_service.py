@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Асинхронный сервис операций с ключами RSA и Эль-Гамаля
+Практическая работа №10 - Вариант 7
+
+Методы encrypt, decrypt, sign и verify - сопрограммы: запросы
+складываются в очереди по (ключ, операция), диспетчер собирает их
+в пакеты до batch_size запросов (подождав batch_delay, пока пакет
+заполняется) и выполняет пакет в пуле процессов, не блокируя цикл
+событий. Подписи RSA и проверки подписей выполняются пакетными методами
+(sign_batch, verify_batch), остальные операции - по очереди в процессе.
+
+Противодавление: одновременно принимается не больше max_pending
+запросов (остальные ждут свободного места), в пуле выполняется не больше
+двух пакетов на процесс. stats() возвращает глубину очереди, число
+выполняемых запросов и перцентили задержки последних запросов.
+
+    async with CryptoService(workers=2) as service:
+        service.add_rsa_key('rsa', rsa)
+        signature = await service.sign('rsa', "сообщение")
+        assert await service.verify('rsa', "сообщение", signature)
+
+Нагрузочный тест с фиксированной частотой запросов:
+
+    python3 crypto_service.py --rates 50 100 200 --duration 5
+"""
+
+import asyncio
+import collections
+import contextlib
+import logging
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import shared_modules  # noqa: F401 - каталог общих модулей работы №9
+
+from elgamal_implementation import ElGamal
+from key_registry import KeyRegistry
+from rsa_benchmark import percentile
+from rsa_implementation import RSAImplementation
+
+logger = logging.getLogger(__name__)
+
+# Наибольшее число запросов в одном пакете
+DEFAULT_BATCH_SIZE = 64
+# Время ожидания заполнения пакета (с)
+DEFAULT_BATCH_DELAY = 0.002
+# Наибольшее число принятых, но не выполненных запросов
+DEFAULT_MAX_PENDING = 4096
+# Число последних запросов, по которым считаются перцентили задержки
+LATENCY_WINDOW = 10000
+
+OPERATIONS = ('encrypt', 'decrypt', 'sign', 'verify')
+
+# Ключи, использованные в процессе пула, и их производные данные (описание ключа - идентификатор)
+_worker_registry = KeyRegistry()
+
+
+def _primitive(spec: tuple):
+    """Объект RSAImplementation или ElGamal по описанию ключа (из реестра процесса)"""
+    if spec not in _worker_registry:
+        if spec[0] == 'rsa':
+            _worker_registry.add_rsa(spec, *spec[1:])
+        else:
+            _worker_registry.add_elgamal(spec, *spec[1:])
+    return _worker_registry.get(spec)
+
+
+def _run_one(primitive, operation: str, payload):
+    """Одна операция над объектом алгоритма"""
+    is_rsa = isinstance(primitive, RSAImplementation)
+    if operation == 'encrypt':
+        return primitive.encrypt(payload, primitive.public_key)
+    if operation == 'decrypt':
+        return primitive.decrypt(payload, primitive.private_key) if is_rsa else primitive.decrypt(payload)
+    if operation == 'sign':
+        return primitive.sign(payload)
+    message, signature = payload
+    if is_rsa:
+        return primitive.verify(message, signature, primitive.public_key)
+    return primitive.verify_signature(message, signature, primitive.public_key)
+
+
+def _run_batch(spec: tuple, operation: str, payloads: list) -> List[Tuple[Optional[BaseException], Any]]:
+    """
+    Выполнение пакета в процессе пула: список пар (исключение, результат)
+    Подписи RSA и проверки подписей выполняются пакетно; если пакетный метод
+    отклоняет данные (TypeError, ValueError), запросы выполняются по одному,
+    чтобы ошибка досталась только своему
+    """
+    primitive = _primitive(spec)
+    try:
+        if operation == 'sign' and spec[0] == 'rsa':
+            return [(None, result) for result in primitive.sign_batch(payloads)]
+        if operation == 'verify':
+            messages = [message for message, _ in payloads]
+            signatures = [signature for _, signature in payloads]
+            return [(None, result) for result in
+                    primitive.verify_batch(messages, signatures, primitive.public_key)]
+    except (TypeError, ValueError) as error:
+        logger.debug("Пакет %s/%s из %d запросов выполняется по одному: %r",
+                     spec[0], operation, len(payloads), error)
+    results = []
+    for payload in payloads:
+        try:
+            results.append((None, _run_one(primitive, operation, payload)))
+        except Exception as error:
+            results.append((error, None))
+    return results
+
+
+class CryptoService:
+    """Асинхронная обертка над RSAImplementation и ElGamal с пакетами и пулом процессов"""
+
+    def __init__(self, workers: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 batch_delay: float = DEFAULT_BATCH_DELAY, max_pending: int = DEFAULT_MAX_PENDING,
+                 executor: Optional[Executor] = None):
+        """
+        workers - число процессов пула (по умолчанию - число ядер);
+        executor - готовый исполнитель вместо собственного пула процессов
+        """
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("Размер пакета и число запросов должны быть положительными")
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self._executor = executor
+        self._own_executor = executor is None
+        self._keys: Dict[str, tuple] = {}
+        self._queues: Dict[Tuple[str, str], Deque[tuple]] = collections.OrderedDict()
+        self._latencies: Deque[float] = collections.deque(maxlen=LATENCY_WINDOW)
+        self._queued = 0
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def add_rsa_key(self, key_id: str, rsa: RSAImplementation):
+        """Регистрация ключевой пары RSA под именем key_id"""
+        if not rsa.d:
+            raise ValueError("Ключи RSA не сгенерированы")
+        self._keys[key_id] = ('rsa', rsa.p, rsa.q, rsa.e, rsa.d)
+
+    def add_elgamal_key(self, key_id: str, elgamal: ElGamal):
+        """Регистрация параметров и ключевой пары Эль-Гамаля под именем key_id"""
+        if not elgamal.private_key:
+            raise ValueError("Ключи Эль-Гамаля не сгенерированы")
+        self._keys[key_id] = ('elgamal', elgamal.p, elgamal.n, elgamal.alpha,
+                              elgamal.private_key, elgamal.public_key)
+
+    async def start(self):
+        """Запуск пула процессов и диспетчера пакетов"""
+        if self._dispatcher is not None:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._batch_slots = asyncio.Semaphore(2 * self.workers)
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        """Остановка диспетчера и пула (принятые запросы отменяются)"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._dispatcher
+            self._dispatcher = None
+        for queue in self._queues.values():
+            for _, future, _ in queue:
+                future.cancel()
+        self._queues.clear()
+        if self._own_executor and self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+            self._executor = None
+
+    async def __aenter__(self) -> "CryptoService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+        return False
+
+    async def encrypt(self, key_id: str, message: str):
+        """Шифрование открытым ключом key_id"""
+        return await self._submit(key_id, 'encrypt', message)
+
+    async def decrypt(self, key_id: str, encrypted):
+        """Расшифрование закрытым ключом key_id"""
+        return await self._submit(key_id, 'decrypt', encrypted)
+
+    async def sign(self, key_id: str, message):
+        """Подпись сообщения закрытым ключом key_id"""
+        return await self._submit(key_id, 'sign', message)
+
+    async def verify(self, key_id: str, message, signature) -> bool:
+        """Проверка подписи открытым ключом key_id"""
+        return await self._submit(key_id, 'verify', (message, signature))
+
+    def stats(self) -> dict:
+        """Глубина очереди, число выполняемых запросов и задержка (с)"""
+        latencies = list(self._latencies)
+        return {
+            'queue_depth': self._queued,
+            'in_flight': self._in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'batches': self.batches,
+            'mean_batch_size': (self.completed + self.failed) / self.batches if self.batches else 0.0,
+            'latency_p50': percentile(latencies, 50) if latencies else None,
+            'latency_p99': percentile(latencies, 99) if latencies else None,
+        }
+
+    async def _submit(self, key_id: str, operation: str, payload):
+        """Постановка запроса в очередь и ожидание результата"""
+        if self._dispatcher is None:
+            raise RuntimeError("Сервис не запущен (start или async with)")
+        if key_id not in self._keys:
+            raise KeyError(f"Неизвестный ключ: {key_id}")
+        async with self._slots:
+            future = asyncio.get_running_loop().create_future()
+            started = time.perf_counter()
+            self._queues.setdefault((key_id, operation), collections.deque()).append(
+                (payload, future, started))
+            self._queued += 1
+            self._wakeup.set()
+            try:
+                return await future
+            finally:
+                self._latencies.append(time.perf_counter() - started)
+
+    async def _dispatch(self):
+        """Сбор запросов в пакеты и отправка пакетов в пул"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.batch_delay and all(len(queue) < self.batch_size for queue in self._queues.values()):
+                await asyncio.sleep(self.batch_delay)
+            for group in list(self._queues):
+                queue = self._queues[group]
+                while queue:
+                    await self._batch_slots.acquire()
+                    batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+                    self._queued -= len(batch)
+                    self._in_flight += len(batch)
+                    self.batches += 1
+                    key_id, operation = group
+                    future = loop.run_in_executor(self._executor, _run_batch, self._keys[key_id],
+                                                  operation, [payload for payload, _, _ in batch])
+                    future.add_done_callback(lambda done, batch=batch: self._finish(batch, done))
+                if not queue:
+                    del self._queues[group]
+
+    def _finish(self, batch: List[tuple], done: asyncio.Future):
+        """Передача результатов пакета ожидающим запросам"""
+        self._batch_slots.release()
+        self._in_flight -= len(batch)
+        if done.cancelled() or done.exception() is not None:
+            error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+            results = [(error, None)] * len(batch)
+        else:
+            results = done.result()
+        for (_, future, _), (error, result) in zip(batch, results):
+            if future.done():
+                continue
+            if error is not None:
+                self.failed += 1
+                future.set_exception(error)
+            else:
+                self.completed += 1
+                future.set_result(result)
+
+
+async def load_test(service: CryptoService, key_id: str, operation: str, payload,
+                    rate: float, duration: float) -> dict:
+    """
+    Нагрузка с фиксированной частотой rate запросов в секунду в течение
+    duration секунд (запросы отправляются по расписанию, не дожидаясь
+    предыдущих); перцентили задержки, пропускная способность и наибольшая
+    глубина очереди
+    """
+    loop = asyncio.get_running_loop()
+    call = getattr(service, operation)
+    arguments = payload if operation == 'verify' else (payload,)
+    latencies: List[float] = []
+    max_depth = 0
+
+    async def request():
+        started = time.perf_counter()
+        await call(key_id, *arguments)
+        latencies.append(time.perf_counter() - started)
+
+    count = max(1, int(rate * duration))
+    start = loop.time()
+    tasks = []
+    for i in range(count):
+        delay = start + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(request()))
+        max_depth = max(max_depth, service.stats()['queue_depth'])
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+    return {
+        'operation': operation,
+        'rate': rate,
+        'requests': count,
+        'throughput': count / elapsed,
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'max_queue_depth': max_depth,
+    }
+
+
+async def _run_load_test(rates: Sequence[float], duration: float, operations: Sequence[str],
+                         workers: Optional[int], bits: int) -> List[dict]:
+    """Нагрузочный тест RSA (модуль bits бит) для каждой частоты и операции"""
+    import rsa_benchmark
+
+    rsa = RSAImplementation()
+    rsa_benchmark.make_key(rsa, bits, '65537')
+    message = "Нагрузочный тест"
+    payloads = {'encrypt': message, 'decrypt': rsa.encrypt(message, rsa.public_key),
+                'sign': message, 'verify': (message, rsa.sign(message))}
+    results = []
+    async with CryptoService(workers=workers) as service:
+        service.add_rsa_key('rsa', rsa)
+        for operation in operations:
+            for rate in rates:
+                results.append(await load_test(service, 'rsa', operation, payloads[operation],
+                                               rate, duration))
+        results.append({'service': service.stats()})
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки: нагрузочный тест"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Нагрузочный тест асинхронного сервиса")
+    parser.add_argument('--rates', type=float, nargs='+', default=[50, 100, 200],
+                        help="частоты запросов в секунду")
+    parser.add_argument('--duration', type=float, default=5.0, help="длительность каждого замера (с)")
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=['sign', 'verify'])
+    parser.add_argument('--workers', type=int, default=None, help="число процессов")
+    parser.add_argument('--bits', type=int, default=2048, help="длина модуля RSA")
+    parser.add_argument('--json', action='store_true', help="вывести результаты в формате JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(_run_load_test(args.rates, args.duration, args.operations,
+                                         args.workers, args.bits))
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+    print(f"{'Операция':<10} {'Частота':>8} {'Запросов':>9} {'Запр./с':>9} "
+          f"{'p50, мс':>9} {'p99, мс':>9} {'Очередь':>8}")
+    for record in results[:-1]:
+        print(f"{record['operation']:<10} {record['rate']:>8.0f} {record['requests']:>9} "
+              f"{record['throughput']:>9.1f} {record['p50'] * 1e3:>9.2f} {record['p99'] * 1e3:>9.2f} "
+              f"{record['max_queue_depth']:>8}")
+    print(f"Сервис: {results[-1]['service']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
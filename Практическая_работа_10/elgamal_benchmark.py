@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Замеры шифрования Эль-Гамаля в подробном и тихом режимах
+Практическая работа №10 - Вариант 7
+
+Шифрует и расшифровывает сообщение заданной длины (по умолчанию 1 МБ)
+экземплярами ElGamal(verbose=True) и ElGamal(verbose=False). В подробном
+режиме вывод направляется в /dev/null, поэтому разница во времени -
+стоимость форматирования входных данных и списков шифртекста:
+
+    python3 elgamal_benchmark.py --bytes 1048576
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+from typing import List, Optional, Sequence, Tuple
+
+import shared_modules  # noqa: F401 - каталог общих модулей работы №9
+
+from elgamal_implementation import ElGamal
+from rsa_benchmark import measure, summarize
+
+DEFAULT_MESSAGE_BYTES = 1 << 20
+# Группа по умолчанию: p = 2039, n = 1019, alpha = 4 (порядок n)
+DEFAULT_GROUP = (2039, 1019, 4)
+
+
+def make_message(size: int) -> str:
+    """Сообщение из size символов алфавита (буквы и пробелы)"""
+    pattern = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG "
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+
+def run_benchmark(message_bytes: int = DEFAULT_MESSAGE_BYTES,
+                  group: Tuple[int, int, int] = DEFAULT_GROUP, repeats: int = 1) -> List[dict]:
+    """Сводки времени encrypt/decrypt для подробного и тихого режимов"""
+    message = make_message(message_bytes)
+    p, n, alpha = group
+    records = []
+    for verbose in (True, False):
+        elgamal = ElGamal(verbose=verbose)
+        elgamal.p, elgamal.n, elgamal.alpha = p, n, alpha
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            elgamal.generate_keys(p, n, alpha)
+            encrypted = elgamal.encrypt(message, elgamal.public_key)
+            actions = (('encrypt', lambda: elgamal.encrypt(message, elgamal.public_key)),
+                       ('decrypt', lambda: elgamal.decrypt(encrypted)))
+            for operation, action in actions:
+                samples = measure(action, repeats)
+                records.append({'operation': operation, 'verbose': verbose, 'message_bytes': message_bytes,
+                                **summarize(samples, message_bytes)})
+    return records
+
+
+def format_results(records: List[dict]) -> str:
+    """Таблица результатов с ускорением тихого режима"""
+    lines = [f"{'Операция':<10} {'Режим':<10} {'Размер':>10} {'Среднее, с':>12} {'МБ/с':>8} {'Ускорение':>10}"]
+    verbose_times = {record['operation']: record['mean'] for record in records if record['verbose']}
+    for record in records:
+        mode = 'подробный' if record['verbose'] else 'тихий'
+        speedup = verbose_times[record['operation']] / record['mean'] if record['mean'] else float('inf')
+        lines.append(f"{record['operation']:<10} {mode:<10} {record['message_bytes']:>10} "
+                     f"{record['mean']:>12.3f} {record['throughput_bytes_per_s'] / 2 ** 20:>8.2f} "
+                     f"{speedup:>9.2f}x")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(description="Замеры шифрования Эль-Гамаля в подробном и тихом режимах")
+    parser.add_argument('--bytes', type=int, default=DEFAULT_MESSAGE_BYTES, help="длина сообщения")
+    parser.add_argument('--group', type=int, nargs=3, metavar=('P', 'N', 'ALPHA'),
+                        default=list(DEFAULT_GROUP), help="параметры группы")
+    parser.add_argument('--repeats', type=int, default=1, help="повторов каждой операции")
+    parser.add_argument('--json', action='store_true', help="вывести результаты в формате JSON")
+    args = parser.parse_args(argv)
+
+    records = run_benchmark(args.bytes, tuple(args.group), args.repeats)
+    if args.json:
+        print(json.dumps(records, ensure_ascii=False, indent=2))
+    else:
+        print(format_results(records))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Компактный двоичный контейнер шифртекста Эль-Гамаля
+Практическая работа №10 - Вариант 7
+
+Формат:
+    заголовок HEADER (сигнатура, версия, размер блока, ширина элемента,
+    число пар) + p (width байт, big-endian)
+    + count пар (c1, c2), каждое число - width байт big-endian
+
+Размер блока - число символов алфавита в одном элементе (encrypt_blocks);
+0 означает шифрование по одному алфавитному коду на элемент (encrypt).
+Все пары имеют одинаковую ширину, поэтому к любой паре можно обратиться
+по смещению - в том числе в файле, отображенном в память (open_file).
+"""
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class ElGamalCiphertextContainer:
+    """
+    Пары (c1, c2) фиксированной ширины в одном непрерывном буфере
+    Работает поверх bytes/bytearray/memoryview/mmap без копирования пар
+    """
+
+    MAGIC = b"ELGC"
+    VERSION = 1
+    HEADER = struct.Struct(">4sBHHQ")
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap.mmap]):
+        """Разбор шифртекста из двоичных данных"""
+        self._view = memoryview(data)
+        self._mapping: Optional[mmap.mmap] = None
+        if len(self._view) < self.HEADER.size:
+            raise ValueError("Данные короче заголовка шифртекста")
+        magic, version, self.block_size, self.width, self.count = self.HEADER.unpack_from(self._view)
+        if magic != self.MAGIC:
+            raise ValueError("Неизвестный формат шифртекста")
+        if version != self.VERSION:
+            raise ValueError(f"Неподдерживаемая версия шифртекста: {version}")
+        if self.width < 1:
+            raise ValueError("Некорректная ширина элемента в заголовке")
+        self._offset = self.HEADER.size + self.width
+        if len(self._view) != self._offset + 2 * self.width * self.count:
+            raise ValueError("Размер шифртекста не соответствует числу пар")
+        self.p = int.from_bytes(self._view[self.HEADER.size:self._offset], 'big')
+        if self.p.bit_length() > 8 * self.width or self.p < 3:
+            raise ValueError("Некорректное значение p в заголовке")
+
+    @staticmethod
+    def element_width(p: int) -> int:
+        """Число байт на элемент группы по модулю p"""
+        return (p.bit_length() + 7) // 8
+
+    @classmethod
+    def build(cls, p: int, block_size: int,
+              pairs: Iterable[Tuple[int, int]]) -> "ElGamalCiphertextContainer":
+        """Сборка шифртекста из пар (c1, c2); пары могут поступать генератором"""
+        width = cls.element_width(p)
+        body = bytearray(cls.HEADER.size) + p.to_bytes(width, 'big')
+        count = 0
+        for c1, c2 in pairs:
+            body += c1.to_bytes(width, 'big')
+            body += c2.to_bytes(width, 'big')
+            count += 1
+        cls.HEADER.pack_into(body, 0, cls.MAGIC, cls.VERSION, block_size, width, count)
+        return cls(body)
+
+    @classmethod
+    def open_file(cls, path: Union[str, Path]) -> "ElGamalCiphertextContainer":
+        """
+        Шифртекст из файла, отображенного в память (только чтение)
+        Пары читаются с диска при обращении; файл освобождается close()
+        """
+        with open(path, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            container = cls(mapping)
+        except ValueError:
+            mapping.close()
+            raise
+        container._mapping = mapping
+        return container
+
+    def write_file(self, path: Union[str, Path]):
+        """Запись шифртекста в файл"""
+        with open(path, 'wb') as file:
+            file.write(self._view)
+
+    def close(self):
+        """Освобождение буфера (и отображения файла, если оно есть)"""
+        self._view.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self) -> "ElGamalCiphertextContainer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        """Число пар (c1, c2)"""
+        return self.count
+
+    def pair(self, index: int) -> Tuple[int, int]:
+        """Пара (c1, c2) с номером index"""
+        if not 0 <= index < self.count:
+            raise IndexError(f"Пара {index} вне диапазона 0..{self.count - 1}")
+        offset = self._offset + 2 * index * self.width
+        middle = offset + self.width
+        return (int.from_bytes(self._view[offset:middle], 'big'),
+                int.from_bytes(self._view[middle:middle + self.width], 'big'))
+
+    def pairs(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Пары с номерами [start, stop)"""
+        stop = self.count if stop is None else min(stop, self.count)
+        return [self.pair(index) for index in range(start, stop)]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """Все пары по порядку"""
+        for index in range(self.count):
+            yield self.pair(index)
+
+    def to_bytes(self) -> bytes:
+        """Сериализованный шифртекст"""
+        return bytes(self._view)
@@ -16,7 +16,7 @@ def demo_elgamal():
     print("Практическая работа №10 - Вариант 7")
     print("=" * 60)
     
-    elgamal = ElGamal()
+    elgamal = ElGamal(verbose=True)
     
     # Пример 1: Маленькие числа для демонстрации
     print("\nПРИМЕР 1: Маленькие числа")
@@ -6,67 +6,88 @@
 Практическая работа №10 - Вариант 7
 """
 
+import hashlib
+import itertools
+import logging
 import random
 import math
-from typing import Tuple, List
+import sys
+from typing import BinaryIO, Dict, Optional, Tuple, List, Union
+
+import shared_modules  # noqa: F401 - каталог общих модулей работы №9
+
+from elgamal_container import ElGamalCiphertextContainer
+import elgamal_params
+import instrumentation
+from nonce_pool import NONCE_POOL_CAPACITY, NonceEntry, NoncePool
+import number_theory
+from prime_sieve import get_prime_sieve
+import text_codec
+
+logger = logging.getLogger(__name__)
 
 
 class ElGamal:
     """Класс для реализации алгоритма Эль-Гамаля"""
     
-    def __init__(self):
+    # Ниже этой границы простота определяется по общему решету малых простых,
+    # выше - тестом Миллера-Рабина (number_theory.is_probable_prime)
+    SMALL_PRIME_LIMIT = 1 << 16
+    # Наибольшее число хранимых таблиц степеней (alpha и открытые ключи)
+    MAX_FIXED_BASE_TABLES = 16
+    # Хеш-функция подписи и размер порции при чтении потока
+    SIGNATURE_HASH = 'sha256'
+    DIGEST_CHUNK_SIZE = 1 << 16
+    # Длина случайных весов при пакетной проверке подписей
+    BATCH_VERIFY_WEIGHT_BITS = 64
+    # Число пар, шифруемых и расшифровываемых за один проход в контейнере
+    CONTAINER_CHUNK_SIZE = 1 << 16
+    
+    def __init__(self, verbose: bool = False):
+        """
+        verbose=True - ход вычислений печатается (интерактивная программа
+        и демонстрация), иначе передается в журнал logging на уровне DEBUG
+        и форматируется, только если этот уровень включен
+        """
+        self.verbose = verbose
         self.p = 0  # Простое число
         self.n = 0  # Порядок группы
         self.alpha = 0  # Генератор группы
         self.private_key = 0  # Закрытый ключ
         self.public_key = 0  # Открытый ключ
+        # Таблицы степеней фиксированных оснований: (основание, p, длина показателя) -> таблица
+        self._fixed_base_tables: Dict[Tuple[int, int, int], number_theory.FixedBaseTable] = {}
+        # Последние проверенные параметры (p, n, alpha) и результат проверки alpha^n = 1
+        self._subgroup_check: Tuple[Tuple[int, int, int], bool] = ((0, 0, 0), False)
+        # Последний проверенный открытый ключ (p, n, y) и результат проверки y^n = 1
+        self._public_key_check: Tuple[Tuple[int, int, int], bool] = ((0, 0, 0), False)
+        # Пул заранее вычисленных одноразовых ключей (start_nonce_pool)
+        self.nonce_pool: Optional[NoncePool] = None
+    
+    def _report(self, message: str, *args):
+        """Сообщение о ходе вычислений (аргументы подставляются как в logging)"""
+        if self.verbose:
+            print(message % args if args else message)
+        else:
+            logger.debug(message, *args)
     
     def is_prime(self, n: int) -> bool:
-        """Проверка числа на простоту методом перебора"""
-        if n < 2:
-            return False
-        if n == 2:
-            return True
-        if n % 2 == 0:
-            return False
-        
-        for i in range(3, int(math.sqrt(n)) + 1, 2):
-            if n % i == 0:
-                return False
-        return True
+        """
+        Проверка числа на простоту методом перебора
+        Используется общее решето: малые числа проверяются по таблице,
+        для больших перебираются только простые делители до √n
+        """
+        return get_prime_sieve().is_prime(n)
     
     def miller_rabin_test(self, n: int, k: int = 10) -> bool:
-        """Тест Миллера-Рабина для проверки простоты"""
+        """Тест Миллера-Рабина для проверки простоты (k случайных оснований)"""
         if n < 2:
             return False
         if n == 2 or n == 3:
             return True
         if n % 2 == 0:
             return False
-        
-        # Записываем n-1 в виде d * 2^r
-        r = 0
-        d = n - 1
-        while d % 2 == 0:
-            r += 1
-            d //= 2
-        
-        # Проводим k раундов теста
-        for _ in range(k):
-            a = random.randrange(2, n - 1)
-            x = pow(a, d, n)
-            
-            if x == 1 or x == n - 1:
-                continue
-            
-            for _ in range(r - 1):
-                x = pow(x, 2, n)
-                if x == n - 1:
-                    break
-            else:
-                return False
-        
-        return True
+        return number_theory.miller_rabin(n, [random.randrange(2, n - 1) for _ in range(k)])
     
     def fermat_test(self, n: int, k: int = 10) -> bool:
         """Малая теорема Ферма для проверки простоты"""
@@ -83,204 +104,568 @@ class ElGamal:
                 return False
         return True
     
+    @instrumentation.operation('check_prime')
     def check_prime(self, p: int) -> bool:
-        """Комплексная проверка простоты числа"""
-        print(f"Проверка простоты числа {p}...")
-        
-        # Сначала быстрая проверка перебором
-        if not self.is_prime(p):
-            print("❌ Число не является простым (проверка перебором)")
-            return False
-        
-        # Затем тест Миллера-Рабина для больших чисел
-        if p > 1000:
-            if not self.miller_rabin_test(p):
-                print("❌ Число не является простым (тест Миллера-Рабина)")
+        """
+        Проверка простоты числа с выбором метода по размеру числа:
+        p < SMALL_PRIME_LIMIT - по таблице решета малых простых, иначе -
+        тестом Миллера-Рабина (детерминированным ниже 3.3·10^24,
+        с 40 случайными основаниями для больших p)
+        """
+        self._report("Проверка простоты числа %d...", p)
+        
+        if p < self.SMALL_PRIME_LIMIT:
+            if not self.is_prime(p):
+                self._report("❌ Число не является простым (проверка по таблице)")
                 return False
-        
-        # Дополнительная проверка тестом Ферма
-        if not self.fermat_test(p):
-            print("❌ Число не является простым (тест Ферма)")
+        elif not number_theory.is_probable_prime(p):
+            self._report("❌ Число не является простым (тест Миллера-Рабина)")
             return False
         
-        print("✅ Число является простым")
+        self._report("✅ Число является простым")
         return True
     
+    @instrumentation.operation('check_parameters')
     def check_parameters(self, p: int, n: int, alpha: int) -> bool:
         """Проверка допустимости параметров n и alpha"""
-        print(f"Проверка параметров n={n}, alpha={alpha} для p={p}...")
+        self._report("Проверка параметров n=%d, alpha=%d для p=%d...", n, alpha, p)
         
         # Проверяем, что n делит p-1
         if (p - 1) % n != 0:
-            print(f"❌ n={n} не делит p-1={p-1}")
+            self._report("❌ n=%d не делит p-1=%d", n, p - 1)
             return False
         
         # Проверяем, что alpha^n ≡ 1 (mod p)
         if pow(alpha, n, p) != 1:
-            print(f"❌ alpha^{n} ≢ 1 (mod {p})")
+            self._report("❌ alpha^%d ≢ 1 (mod %d)", n, p)
             return False
         
-        # Проверяем, что alpha не является корнем меньшей степени
-        for i in range(1, n):
-            if pow(alpha, i, p) == 1:
-                print(f"❌ alpha^{i} ≡ 1 (mod {p}), но i={i} < n={n}")
+        # Проверяем, что alpha не является корнем меньшей степени:
+        # порядок alpha делит n, поэтому он меньше n только если
+        # alpha^(n/q) ≡ 1 для некоторого простого делителя q числа n
+        with instrumentation.phase('factorization'):
+            try:
+                factors = number_theory.factorize(n)
+            except ValueError as error:
+                self._report("❌ %s", error)
+                return False
+        for q in factors:
+            if pow(alpha, n // q, p) == 1:
+                self._report("❌ alpha^%d ≡ 1 (mod %d), но %d < n=%d", n // q, p, n // q, n)
                 return False
         
-        print("✅ Параметры корректны")
+        self._subgroup_check = ((p, n, alpha), True)
+        self._report("✅ Параметры корректны")
         return True
     
+    @instrumentation.operation('generate_parameters')
+    def generate_parameters(self, p_bits: int = 2048, n_bits: int = 256, **options) -> Tuple[int, int, int]:
+        """
+        Генерация параметров группы (p, n, alpha) заданной длины
+        (см. elgamal_params.generate_group, options передаются туда же)
+        Параметры сохраняются в объекте и возвращаются
+        """
+        self.p, self.n, self.alpha = elgamal_params.generate_group(p_bits, n_bits, **options)
+        self._subgroup_check = ((self.p, self.n, self.alpha), True)
+        return self.p, self.n, self.alpha
+    
+    @instrumentation.operation('generate_keys')
     def generate_keys(self, p: int, n: int, alpha: int) -> Tuple[int, int]:
         """Генерация ключевой пары"""
-        print("Генерация ключевой пары...")
+        self._report("Генерация ключевой пары...")
         
         # Генерируем закрытый ключ
         self.private_key = random.randrange(1, n)
         
         # Вычисляем открытый ключ
-        self.public_key = pow(alpha, self.private_key, p)
+        with instrumentation.phase('exponentiation'):
+            self.public_key = pow(alpha, self.private_key, p)
+            instrumentation.count_exponentiation(self.private_key)
+        
+        # Таблицы степеней для шифрования строятся заранее
+        with instrumentation.phase('precomputation'):
+            self.fixed_base_table(alpha, p, n)
+            self.fixed_base_table(self.public_key, p, n)
         
-        print(f"Закрытый ключ: {self.private_key}")
-        print(f"Открытый ключ: {self.public_key}")
+        self._report("Закрытый ключ: %d", self.private_key)
+        self._report("Открытый ключ: %d", self.public_key)
         
         return self.private_key, self.public_key
     
+    def fixed_base_table(self, base: int, p: int, n: int) -> number_theory.FixedBaseTable:
+        """
+        Таблица степеней base по модулю p для показателей меньше n
+        Строится при первом обращении и затем переиспользуется; хранятся
+        MAX_FIXED_BASE_TABLES последних использованных таблиц
+        """
+        key = (base, p, max(1, (n - 1).bit_length()))
+        table = self._fixed_base_tables.pop(key, None)
+        if table is None:
+            table = number_theory.FixedBaseTable(base, p, key[2])
+            while len(self._fixed_base_tables) >= self.MAX_FIXED_BASE_TABLES:
+                del self._fixed_base_tables[next(iter(self._fixed_base_tables))]
+        self._fixed_base_tables[key] = table
+        return table
+    
+    def precompute(self):
+        """
+        Вычисление производных данных текущих параметров и ключевой пары:
+        таблиц степеней alpha и открытого ключа и проверки принадлежности
+        открытого ключа подгруппе
+        """
+        if not self.public_key:
+            raise ValueError("Ключи Эль-Гамаля не сгенерированы")
+        self.fixed_base_table(self.alpha, self.p, self.n)
+        self.fixed_base_table(self.public_key, self.p, self.n)
+        self.public_key_in_subgroup(self.public_key)
+    
+    def memory_size(self) -> int:
+        """Оценка памяти объекта с ключом и таблицами степеней в байтах"""
+        values = (self.p, self.n, self.alpha, self.private_key, self.public_key)
+        return (sys.getsizeof(self) + sum(sys.getsizeof(value) for value in values)
+                + sum(table.memory_size() for table in self._fixed_base_tables.values()))
+    
+    def start_nonce_pool(self, capacity: int = NONCE_POOL_CAPACITY,
+                         background: bool = True) -> NoncePool:
+        """
+        Запуск пула одноразовых ключей для текущих параметров и открытого ключа
+        Подпись и шифрование этим ключом берут (k, alpha^k, k^(-1), y^k)
+        из пула; прежний пул останавливается
+        """
+        self.stop_nonce_pool()
+        self.nonce_pool = NoncePool(self.p, self.n, self.alpha, self.public_key, capacity, background)
+        return self.nonce_pool
+    
+    def stop_nonce_pool(self):
+        """Остановка пула одноразовых ключей"""
+        if self.nonce_pool is not None:
+            self.nonce_pool.close()
+            self.nonce_pool = None
+    
+    def _pooled_nonce(self, public_key: Optional[int] = None) -> Optional[NonceEntry]:
+        """Запись из пула, если он подходит к текущим параметрам и ключу public_key"""
+        pool = self.nonce_pool
+        if pool is None or not pool.matches(self.p, self.n, self.alpha, public_key):
+            return None
+        return pool.take()
+    
     def text_to_numbers(self, text: str) -> List[int]:
         """Преобразование текста в числа"""
-        print(f"Преобразование текста '{text}' в числа...")
+        self._report("Преобразование текста '%s' в числа...", text)
         
         # Простое преобразование: каждому символу соответствует его позиция в алфавите
-        # A=1, B=2, ..., Z=26, пробел=27
-        numbers = []
-        for char in text:
-            if char == ' ':
-                numbers.append(27)
-            elif char.isalpha():
-                numbers.append(ord(char.upper()) - ord('A') + 1)
-            else:
-                # Для других символов используем их ASCII код по модулю 26
-                numbers.append((ord(char) % 26) + 1)
-        
-        print(f"Результат: {numbers}")
+        # A=1, B=2, ..., Z=26, пробел=27, прочие символы - ASCII код по модулю 26
+        # (текст перекодируется целиком по таблице, см. text_codec)
+        numbers = text_codec.to_list(text_codec.encode_alphabet(text))
+        
+        self._report("Результат: %s", numbers)
         return numbers
     
     def numbers_to_text(self, numbers: List[int]) -> str:
         """Преобразование чисел в текст"""
-        print(f"Преобразование чисел {numbers} в текст...")
-        
-        text = ""
-        for num in numbers:
-            if num == 27:
-                text += ' '
-            elif 1 <= num <= 26:
-                text += chr(ord('A') + num - 1)
-            else:
-                # Для других чисел используем обратное преобразование
-                text += chr((num - 1) % 26 + ord('A'))
-        
-        print(f"Результат: '{text}'")
+        self._report("Преобразование чисел %s в текст...", numbers)
+        
+        text = text_codec.decode_alphabet(numbers)
+        
+        self._report("Результат: '%s'", text)
         return text
     
+    @instrumentation.operation('encrypt')
     def encrypt(self, message: str, public_key: int) -> List[Tuple[int, int]]:
         """Шифрование сообщения"""
-        print(f"Шифрование сообщения '{message}'...")
+        self._report("Шифрование сообщения '%s'...", message)
         
         # Преобразуем текст в числа
-        numbers = self.text_to_numbers(message)
+        with instrumentation.phase('text_conversion'):
+            numbers = self.text_to_numbers(message)
         
-        encrypted = []
-        for m in numbers:
-            # Выбираем случайное k
-            k = random.randrange(1, self.n)
-            
-            # Вычисляем c1 = alpha^k mod p
-            c1 = pow(self.alpha, k, self.p)
-            
-            # Вычисляем c2 = m * (public_key^k) mod p
-            c2 = (m * pow(public_key, k, self.p)) % self.p
-            
-            encrypted.append((c1, c2))
+        encrypted = self._encrypt_numbers(numbers, public_key)
         
-        print(f"Зашифрованное сообщение: {encrypted}")
+        self._report("Зашифрованное сообщение: %s", encrypted)
         return encrypted
     
+    def _encrypt_numbers(self, numbers: List[int], public_key: int) -> List[Tuple[int, int]]:
+        """Шифрование последовательности чисел: по паре (c1, c2) на число"""
+        # Степени alpha и открытого ключа берутся из пула одноразовых ключей,
+        # если он запущен для public_key, иначе из таблиц (см. fixed_base_table)
+        pool = self.nonce_pool
+        if pool is not None and pool.matches(self.p, self.n, self.alpha, public_key):
+            encrypted = []
+            for m in numbers:
+                entry = pool.take()
+                encrypted.append((entry.alpha_power, (m * entry.key_power) % self.p))
+            instrumentation.count(multiplications=len(numbers))
+            return encrypted
+        
+        with instrumentation.phase('precomputation'):
+            alpha_table = self.fixed_base_table(self.alpha, self.p, self.n)
+            key_table = self.fixed_base_table(public_key, self.p, self.n)
+        
+        encrypted = []
+        with instrumentation.phase('exponentiation'):
+            for m in numbers:
+                # Выбираем случайное k
+                k = random.randrange(1, self.n)
+                
+                # Вычисляем c1 = alpha^k mod p
+                c1 = alpha_table.power(k)
+                
+                # Вычисляем c2 = m * (public_key^k) mod p
+                c2 = (m * key_table.power(k)) % self.p
+                
+                encrypted.append((c1, c2))
+                instrumentation.count(multiplications=1)
+        return encrypted
+    
+    @instrumentation.operation('decrypt')
     def decrypt(self, encrypted: List[Tuple[int, int]]) -> str:
         """Расшифрование сообщения"""
-        print(f"Расшифрование сообщения {encrypted}...")
+        self._report("Расшифрование сообщения %s...", encrypted)
         
-        decrypted_numbers = []
-        for c1, c2 in encrypted:
-            # Вычисляем m = c2 * (c1^(p-1-private_key)) mod p
-            # Это эквивалентно m = c2 * (c1^(-private_key)) mod p
-            m = (c2 * pow(c1, self.p - 1 - self.private_key, self.p)) % self.p
-            decrypted_numbers.append(m)
+        decrypted_numbers = self._decrypt_numbers(encrypted)
         
         # Преобразуем числа в текст
-        message = self.numbers_to_text(decrypted_numbers)
+        with instrumentation.phase('text_conversion'):
+            message = self.numbers_to_text(decrypted_numbers)
         
-        print(f"Расшифрованное сообщение: '{message}'")
+        self._report("Расшифрованное сообщение: '%s'", message)
         return message
     
-    def sign(self, message: str) -> Tuple[int, int]:
-        """Создание цифровой подписи"""
-        print(f"Создание цифровой подписи для сообщения '{message}'...")
+    def subgroup_order_known(self) -> bool:
+        """
+        Проверка, что порядок alpha делит n (alpha^n = 1 mod p)
+        Тогда c1 = alpha^k лежит в подгруппе порядка n и c1^(-x) = c1^(n-x).
+        Результат запоминается для текущих (p, n, alpha)
+        """
+        key = (self.p, self.n, self.alpha)
+        checked, known = self._subgroup_check
+        if checked != key:
+            known = (self.p > 2 and self.n > 0 and (self.p - 1) % self.n == 0
+                     and pow(self.alpha, self.n, self.p) == 1)
+            self._subgroup_check = (key, known)
+        return known
+    
+    def public_key_in_subgroup(self, public_key: int) -> bool:
+        """
+        Проверка, что открытый ключ лежит в подгруппе порядка n (y^n = 1 mod p)
+        Тогда в y^r показатель r можно привести по модулю n.
+        Результат запоминается для последнего проверенного ключа
+        """
+        key = (self.p, self.n, public_key)
+        checked, known = self._public_key_check
+        if checked != key:
+            known = self.subgroup_order_known()
+            if known:
+                known = pow(public_key, self.n, self.p) == 1
+                instrumentation.count_exponentiation(self.n)
+            self._public_key_check = (key, known)
+        return known
+    
+    def _decrypt_numbers(self, encrypted: List[Tuple[int, int]]) -> List[int]:
+        """
+        Расшифрование пар (c1, c2) в последовательность чисел
+        
+        Если порядок подгруппы известен, m = c2 * c1^(n-x) mod p: показатель
+        длиной log2(n) бит вместо log2(p) и ни одного обращения. Иначе
+        вычисляются общие секреты c1^x и обращаются все сразу приемом
+        Монтгомери (одно обращение и три умножения на пару)
+        """
+        if any(not 0 < c1 < self.p for c1, _ in encrypted):
+            raise ValueError(f"c1 должно лежать в интервале 1..{self.p - 1}")
+        
+        with instrumentation.phase('exponentiation'):
+            if self.subgroup_order_known():
+                # c1^(n-x) = c1^(-x), так как c1^n = 1
+                exponent = (-self.private_key) % self.n
+                decrypted_numbers = [(c2 * pow(c1, exponent, self.p)) % self.p for c1, c2 in encrypted]
+                for _ in encrypted:
+                    instrumentation.count_exponentiation(exponent)
+                instrumentation.count(multiplications=len(encrypted))
+                return decrypted_numbers
+            
+            exponent = self.private_key % (self.p - 1)
+            secrets = [pow(c1, exponent, self.p) for c1, _ in encrypted]
+            for _ in encrypted:
+                instrumentation.count_exponentiation(exponent)
+        
+        with instrumentation.phase('inverse'):
+            inverses = number_theory.batch_modular_inverse(secrets, self.p)
+        instrumentation.count(multiplications=4 * len(encrypted))
+        return [(c2 * inverse) % self.p for (_, c2), inverse in zip(encrypted, inverses)]
+    
+    def block_size(self) -> int:
+        """Число символов, упаковываемых в один элемент группы (блок меньше p)"""
+        return text_codec.alphabet_block_size(self.p)
+    
+    @instrumentation.operation('encrypt_blocks')
+    def encrypt_blocks(self, message: str, public_key: int) -> List[Tuple[int, int]]:
+        """
+        Блочное шифрование сообщения
+        Алфавитные коды символов упаковываются по block_size() штук в одно
+        число меньше p (цифры по основанию 28), и каждое такое число
+        шифруется одной парой (c1, c2)
+        """
+        self._report("Блочное шифрование сообщения '%s'...", message)
+        
+        size = self.block_size()
+        if size < 1:
+            raise ValueError(f"p = {self.p} слишком мало для блочного режима (нужно p >= 28)")
+        
+        with instrumentation.phase('text_conversion'):
+            blocks = text_codec.pack_alphabet(self.text_to_numbers(message), size)
+        self._report("Символов в блоке: %d, блоков: %d", size, len(blocks))
+        
+        encrypted = self._encrypt_numbers(blocks, public_key)
+        
+        self._report("Зашифрованное сообщение: %s", encrypted)
+        return encrypted
+    
+    @instrumentation.operation('decrypt_blocks')
+    def decrypt_blocks(self, encrypted: List[Tuple[int, int]]) -> str:
+        """Расшифрование сообщения, зашифрованного encrypt_blocks"""
+        self._report("Блочное расшифрование сообщения %s...", encrypted)
         
-        # Преобразуем сообщение в число (хеш)
-        message_hash = hash(message) % self.p
-        if message_hash < 0:
-            message_hash += self.p
+        blocks = self._decrypt_numbers(encrypted)
         
-        # Выбираем случайное k
-        k = random.randrange(1, self.n)
-        while math.gcd(k, self.n) != 1:
-            k = random.randrange(1, self.n)
+        with instrumentation.phase('text_conversion'):
+            message = self.numbers_to_text(text_codec.unpack_alphabet(blocks))
+        
+        self._report("Расшифрованное сообщение: '%s'", message)
+        return message
+    
+    @instrumentation.operation('encrypt_container')
+    def encrypt_container(self, message: str, public_key: int, block_mode: bool = False) -> bytes:
+        """
+        Шифрование в двоичный контейнер (см. elgamal_container.py)
+        block_mode=True - упаковка символов в блоки, как в encrypt_blocks,
+        иначе по паре на символ, как в encrypt. Числа шифруются порциями
+        по CONTAINER_CHUNK_SIZE и сразу записываются в контейнер, поэтому
+        список пар (c1, c2) целиком не создается
+        """
+        with instrumentation.phase('text_conversion'):
+            numbers = self.text_to_numbers(message)
+            block_size = 0
+            if block_mode:
+                block_size = self.block_size()
+                if block_size < 1:
+                    raise ValueError(f"p = {self.p} слишком мало для блочного режима (нужно p >= 28)")
+                numbers = text_codec.pack_alphabet(numbers, block_size)
+        
+        chunk = self.CONTAINER_CHUNK_SIZE
+        pairs = itertools.chain.from_iterable(
+            self._encrypt_numbers(numbers[start:start + chunk], public_key)
+            for start in range(0, len(numbers), chunk))
+        container = ElGamalCiphertextContainer.build(self.p, block_size, pairs)
+        self._report("Зашифровано %d символов в %d парах", len(message), len(container))
+        return container.to_bytes()
+    
+    def _open_container(self, data: Union[bytes, bytearray, memoryview, ElGamalCiphertextContainer]
+                        ) -> ElGamalCiphertextContainer:
+        """Разбор контейнера и проверка, что он создан для текущего p"""
+        container = data if isinstance(data, ElGamalCiphertextContainer) else ElGamalCiphertextContainer(data)
+        if container.p != self.p:
+            raise ValueError("Контейнер зашифрован для другого значения p")
+        return container
+    
+    def _container_text(self, container: ElGamalCiphertextContainer, numbers: List[int]) -> str:
+        """Текст по расшифрованным числам контейнера"""
+        if container.block_size:
+            numbers = text_codec.unpack_alphabet(numbers)
+        return self.numbers_to_text(numbers)
+    
+    @instrumentation.operation('decrypt_container')
+    def decrypt_container(self, data: Union[bytes, bytearray, memoryview,
+                                            ElGamalCiphertextContainer]) -> str:
+        """
+        Расшифрование контейнера (в том числе открытого через
+        ElGamalCiphertextContainer.open_file); пары читаются порциями
+        по CONTAINER_CHUNK_SIZE
+        """
+        container = self._open_container(data)
+        chunk = self.CONTAINER_CHUNK_SIZE
+        numbers = []
+        for start in range(0, len(container), chunk):
+            numbers += self._decrypt_numbers(container.pairs(start, start + chunk))
         
-        # Вычисляем r = alpha^k mod p
-        r = pow(self.alpha, k, self.p)
+        with instrumentation.phase('text_conversion'):
+            message = self._container_text(container, numbers)
+        self._report("Расшифровано %d пар: %d символов", len(container), len(message))
+        return message
+    
+    def decrypt_container_pair(self, data: Union[bytes, bytearray, memoryview,
+                                                 ElGamalCiphertextContainer], index: int) -> str:
+        """Расшифрование одной пары контейнера (символ или блок символов)"""
+        container = self._open_container(data)
+        return self._container_text(container, self._decrypt_numbers([container.pair(index)]))
+    
+    def message_digest(self, message: Union[str, bytes, BinaryIO]) -> int:
+        """
+        Хеш сообщения SHA-256 как вычет по модулю n
+        Строка кодируется в UTF-8; файловый объект (двоичный или текстовый)
+        читается порциями по DIGEST_CHUNK_SIZE, поэтому память не зависит
+        от размера документа. Результат одинаков во всех процессах
+        """
+        digest = hashlib.new(self.SIGNATURE_HASH)
+        if isinstance(message, str):
+            digest.update(message.encode('utf-8'))
+        elif isinstance(message, (bytes, bytearray, memoryview)):
+            digest.update(message)
+        else:
+            while True:
+                chunk = message.read(self.DIGEST_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        return int.from_bytes(digest.digest(), 'big') % self.n
+    
+    @instrumentation.operation('sign')
+    def sign(self, message: Union[str, bytes, BinaryIO]) -> Tuple[int, int]:
+        """
+        Создание цифровой подписи
+        message - строка, байты или файловый объект (читается потоком)
+        """
+        self._report("Создание цифровой подписи для сообщения '%s'...", message)
+        
+        # Преобразуем сообщение в число (хеш)
+        with instrumentation.phase('hashing'):
+            message_hash = self.message_digest(message)
+        
+        entry = self._pooled_nonce()
+        if entry is not None:
+            # k, r = alpha^k mod p и k^(-1) вычислены заранее
+            r, k_inv = entry.alpha_power, entry.k_inverse
+        else:
+            # Выбираем случайное k
+            k = random.randrange(1, self.n)
+            while math.gcd(k, self.n) != 1:
+                k = random.randrange(1, self.n)
+            
+            # Вычисляем r = alpha^k mod p
+            with instrumentation.phase('exponentiation'):
+                r = pow(self.alpha, k, self.p)
+                instrumentation.count_exponentiation(k)
+            
+            with instrumentation.phase('inverse'):
+                k_inv = self.modular_inverse(k, self.n)
         
         # Вычисляем s = (message_hash - private_key * r) * k^(-1) mod n
-        k_inv = self.modular_inverse(k, self.n)
         s = ((message_hash - self.private_key * r) * k_inv) % self.n
+        instrumentation.count(multiplications=2)
         
         signature = (r, s)
-        print(f"Цифровая подпись: {signature}")
+        self._report("Цифровая подпись: %s", signature)
         return signature
     
-    def verify_signature(self, message: str, signature: Tuple[int, int], public_key: int) -> bool:
-        """Проверка цифровой подписи"""
-        print(f"Проверка цифровой подписи {signature} для сообщения '{message}'...")
+    @instrumentation.operation('verify_signature')
+    def verify_signature(self, message: Union[str, bytes, BinaryIO], signature: Tuple[int, int],
+                         public_key: int) -> bool:
+        """Проверка цифровой подписи (message - как в sign)"""
+        self._report("Проверка цифровой подписи %s для сообщения '%s'...", signature, message)
         
         r, s = signature
+        if not (0 < r < self.p and 0 <= s < self.n):
+            self._report("Подпись невалидна: r или s вне допустимого диапазона")
+            return False
         
         # Преобразуем сообщение в число (хеш)
-        message_hash = hash(message) % self.p
-        if message_hash < 0:
-            message_hash += self.p
+        with instrumentation.phase('hashing'):
+            message_hash = self.message_digest(message)
         
+        with instrumentation.phase('exponentiation'):
+            is_valid = self._signature_holds(message_hash, r, s, public_key)
+        
+        self._report("Подпись %s", 'валидна' if is_valid else 'невалидна')
+        return is_valid
+    
+    def _signature_holds(self, message_hash: int, r: int, s: int, public_key: int) -> bool:
+        """
+        Проверка равенства alpha^h = y^r * r^s mod p для одной подписи
+        alpha^h берется из таблицы степеней alpha, y^r * r^s вычисляется
+        одним совместным проходом по битам показателей (прием Шамира);
+        если y лежит в подгруппе порядка n, показатель r приводится по модулю n
+        """
         # Вычисляем v1 = alpha^message_hash mod p
-        v1 = pow(self.alpha, message_hash, self.p)
+        v1 = self.fixed_base_table(self.alpha, self.p, self.n).power(message_hash)
         
         # Вычисляем v2 = (public_key^r * r^s) mod p
-        v2 = (pow(public_key, r, self.p) * pow(r, s, self.p)) % self.p
-        
-        is_valid = v1 == v2
-        print(f"Подпись {'валидна' if is_valid else 'невалидна'}")
-        return is_valid
+        key_exponent = r % self.n if self.public_key_in_subgroup(public_key) else r
+        v2 = number_theory.multi_exponentiation((public_key, r), (key_exponent, s), self.p)
+        return v1 == v2
+    
+    @instrumentation.operation('verify_batch')
+    def verify_batch(self, messages: List[Union[str, bytes, BinaryIO]],
+                     signatures: List[Tuple[int, int]], public_key: int) -> List[bool]:
+        """
+        Проверка списка подписей одним открытым ключом
+        
+        Со случайными нечетными весами w_i все равенства alpha^h_i = y^r_i * r_i^s_i
+        проверяются одним мультивозведением (метод Штрауса, возведения
+        в квадрат общие для всех оснований):
+        prod r_i^(w_i*s_i) * y^(sum w_i*r_i) * alpha^(-sum w_i*h_i) = 1 mod p.
+        Показатели при y и alpha приводятся по модулю n: оба лежат
+        в подгруппе порядка n. Если равенство не выполняется, пакет делится
+        пополам до отдельных неверных подписей.
+        
+        Нечетные веса сохраняют множители порядка 2: две подписи, равенства
+        которых нарушены на множитель -1, в произведении дают 1. Поэтому
+        в пакет попадают только подписи с r из подгруппы (r^n = 1 mod p);
+        остальные, как и все подписи ключа вне подгруппы, проверяются
+        по отдельности
+        """
+        if len(messages) != len(signatures):
+            raise ValueError("Число сообщений и подписей должно совпадать")
+        with instrumentation.phase('hashing'):
+            digests = [self.message_digest(message) for message in messages]
+        results = [0 < r < self.p and 0 <= s < self.n for r, s in signatures]
+        indices = [i for i, valid in enumerate(results) if valid]
+        
+        with instrumentation.phase('exponentiation'):
+            batch = []
+            in_subgroup = self.public_key_in_subgroup(public_key)
+            for i in indices:
+                r, s = signatures[i]
+                if in_subgroup:
+                    instrumentation.count_exponentiation(self.n)
+                    if pow(r, self.n, self.p) == 1:
+                        batch.append(i)
+                        continue
+                results[i] = self._signature_holds(digests[i], r, s, public_key)
+            self._verify_batch_range(batch, digests, signatures, public_key, results)
+        self._report("Пакетная проверка: %d из %d подписей валидны", sum(results), len(results))
+        return results
+    
+    def _verify_batch_range(self, indices: List[int], digests: List[int],
+                            signatures: List[Tuple[int, int]], public_key: int,
+                            results: List[bool]):
+        """
+        Проверка подписей с номерами indices (r, y и alpha в подгруппе порядка n)
+        со случайными весами и делением пополам
+        """
+        if not indices:
+            return
+        if len(indices) == 1:
+            i = indices[0]
+            results[i] = self._signature_holds(digests[i], *signatures[i], public_key)
+            return
+        
+        weights = [random.getrandbits(self.BATCH_VERIFY_WEIGHT_BITS) | 1 for _ in indices]
+        bases = [signatures[i][0] for i in indices] + [public_key, self.alpha]
+        exponents = [weight * signatures[i][1] for weight, i in zip(weights, indices)]
+        exponents.append(sum(weight * signatures[i][0] for weight, i in zip(weights, indices)) % self.n)
+        exponents.append(-sum(weight * digests[i] for weight, i in zip(weights, indices)) % self.n)
+        if number_theory.multi_exponentiation(bases, exponents, self.p) == 1:
+            return
+        
+        middle = len(indices) // 2
+        self._verify_batch_range(indices[:middle], digests, signatures, public_key, results)
+        self._verify_batch_range(indices[middle:], digests, signatures, public_key, results)
     
     def modular_inverse(self, a: int, m: int) -> int:
-        """Вычисление модульного обратного элемента"""
-        def extended_gcd(a, b):
-            if a == 0:
-                return b, 0, 1
-            gcd, x1, y1 = extended_gcd(b % a, a)
-            x = y1 - (b // a) * x1
-            y = x1
-            return gcd, x, y
-        
-        gcd, x, _ = extended_gcd(a, m)
-        if gcd != 1:
-            raise ValueError(f"Обратный элемент для {a} по модулю {m} не существует")
-        
-        return x % m
+        """
+        Вычисление модульного обратного элемента
+        Используется итеративный расширенный алгоритм Евклида из общего модуля
+        """
+        return number_theory.modular_inverse(a, m)
 
 
 def main():
@@ -290,7 +675,7 @@ def main():
     print("Практическая работа №10 - Вариант 7")
     print("=" * 60)
     
-    elgamal = ElGamal()
+    elgamal = ElGamal(verbose=True)
     
     # Ввод параметров
     print("\n1. ВВОД ПАРАМЕТРОВ")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Генерация параметров группы для алгоритма Эль-Гамаля
+Практическая работа №10 - Вариант 7
+
+Строит (p, n, alpha) заданной длины: n - простое число длиной n_bits бит,
+p = k*n + 1 - простое число длиной p_bits бит, alpha - элемент порядка n
+(группа Шнорра; при p_bits = n_bits + 1 получается безопасное простое
+p = 2n + 1).
+
+Кандидаты сначала просеиваются по малым простым из общего решета, затем
+выжившие проверяются одним раундом теста Миллера-Рабина параллельно
+в пуле процессов; найденное число подтверждается полным тестом.
+Сгенерированные группы сохраняются в JSON-файл (по умолчанию
+~/.cache/elgamal/elgamal_groups.json или $XDG_CACHE_HOME/elgamal/...)
+и при повторном запросе тех же размеров загружаются без вычислений:
+
+    python3 elgamal_params.py 2048 256
+"""
+
+import functools
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import shared_modules  # noqa: F401 - каталог общих модулей работы №9
+
+import number_theory
+from prime_sieve import get_prime_sieve
+
+# Файл кэша групп по умолчанию - в каталоге кэша пользователя, а не рядом с исходниками
+DEFAULT_CACHE_PATH = (Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache")
+                      / "elgamal" / "elgamal_groups.json")
+# Граница малых простых для просеивания кандидатов
+SIEVE_BOUND = 1 << 16
+# Число кандидатов в одном окне решета
+SIEVE_WINDOW = 4096
+# Число кандидатов на процесс в одной параллельной проверке
+CANDIDATES_PER_WORKER = 4
+# Если четных k для p = k*n + 1 меньше этого числа, n и p ищутся совместно
+SMALL_K_RANGE = 64
+# Число групп, результат проверки которых запоминается is_valid_group
+VALID_GROUP_CACHE_SIZE = 32
+
+_cache_lock = threading.Lock()
+
+
+def _sieved(start: int, step: int, count: int, bound: int,
+            forms: Tuple[Tuple[int, int], ...] = ()) -> Iterator[int]:
+    """
+    Номера i < count, для которых числа start + step*i (и все числа
+    a + b*i для (a, b) из forms) не делятся на простые меньше bound
+    Для каждого простого r вычеркиваются номера i ≡ -a * b^(-1) (mod r)
+    """
+    flags = bytearray([1]) * count
+    for r in get_prime_sieve().primes(bound - 1):
+        for a, b in ((start, step),) + forms:
+            if b % r == 0:
+                if a % r == 0:
+                    return
+                continue
+            first = (-a * pow(b, -1, r)) % r
+            flags[first::r] = bytes(len(range(first, count, r)))
+    yield from itertools.compress(range(count), flags)
+
+
+def _probable_primes(*numbers: int) -> bool:
+    """Один раунд теста Миллера-Рабина для всех чисел (выполняется в процессе пула)"""
+    return all(number_theory.is_probable_prime(number, 1) for number in numbers)
+
+
+def _first_prime(candidates: Iterator[Tuple[int, ...]], executor: Optional[Executor],
+                 batch: int) -> Optional[Tuple[int, ...]]:
+    """
+    Первый (в порядке перебора) кортеж кандидатов, все числа которого простые
+    Кандидаты проверяются пакетами по batch штук одним раундом теста
+    Миллера-Рабина в executor (или в текущем процессе), выжившие
+    подтверждаются полным тестом
+    """
+    while True:
+        chunk = list(itertools.islice(candidates, batch))
+        if not chunk:
+            return None
+        if executor is None:
+            passed = [_probable_primes(*numbers) for numbers in chunk]
+        else:
+            passed = list(executor.map(_probable_primes, *zip(*chunk)))
+        for numbers, probable in zip(chunk, passed):
+            if probable and all(number_theory.is_probable_prime(number) for number in numbers):
+                return numbers
+
+
+def _random_prime(bits: int, rng: random.Random, executor: Optional[Executor], batch: int) -> int:
+    """Случайное простое число длиной ровно bits бит"""
+    bound = min(SIEVE_BOUND, 1 << (bits - 1))
+    while True:
+        start = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        count = min(SIEVE_WINDOW, ((1 << bits) - start) // 2 + 1)
+        found = _first_prime(((start + 2 * i,) for i in _sieved(start, 2, count, bound)),
+                             executor, batch)
+        if found is not None:
+            return found[0]
+
+
+def _k_range(p_bits: int, n: int) -> Tuple[int, int]:
+    """Наименьшее и наибольшее четное k, для которых k*n + 1 имеет длину p_bits бит"""
+    k_min = -(-((1 << (p_bits - 1)) - 1) // n)
+    k_min += k_min % 2
+    k_max = ((1 << p_bits) - 2) // n
+    k_max -= k_max % 2
+    return k_min, k_max
+
+
+def _schnorr_prime(p_bits: int, n: int, rng: random.Random,
+                   executor: Optional[Executor], batch: int) -> int:
+    """Простое p = k*n + 1 длиной ровно p_bits бит (k четное) для найденного n"""
+    k_min, k_max = _k_range(p_bits, n)
+    bound = min(SIEVE_BOUND, 1 << (p_bits - 1))
+    while True:
+        k = k_min + 2 * rng.randrange((k_max - k_min) // 2 + 1)
+        count = min(SIEVE_WINDOW, (k_max - k) // 2 + 1)
+        start = k * n + 1
+        found = _first_prime(((start + 2 * n * i,) for i in _sieved(start, 2 * n, count, bound)),
+                             executor, batch)
+        if found is not None:
+            return found[0]
+
+
+def _schnorr_pair(p_bits: int, n_bits: int, k: int, rng: random.Random,
+                  executor: Optional[Executor], batch: int) -> Optional[Tuple[int, int]]:
+    """
+    Совместный поиск простых n и p = k*n + 1 при фиксированном k
+    (для p_bits, близких к n_bits, например безопасных простых p = 2n + 1):
+    n и p просеиваются одним решетом. None - подходящих n длиной n_bits нет
+    """
+    n_low = max(1 << (n_bits - 1), -(-((1 << (p_bits - 1)) - 1) // k)) | 1
+    n_high = min((1 << n_bits) - 1, ((1 << p_bits) - 2) // k)
+    if n_low > n_high:
+        return None
+    bound = min(SIEVE_BOUND, 1 << (n_bits - 1))
+    while True:
+        start = n_low + 2 * rng.randrange((n_high - n_low) // 2 + 1)
+        count = min(SIEVE_WINDOW, (n_high - start) // 2 + 1)
+        indices = _sieved(start, 2, count, bound, ((k * start + 1, 2 * k),))
+        found = _first_prime(((start + 2 * i, k * (start + 2 * i) + 1) for i in indices),
+                             executor, batch)
+        if found is not None:
+            return found[0], found[1]
+
+
+def _generator(p: int, n: int) -> int:
+    """Элемент порядка n: h^((p-1)/n) для наименьшего h, дающего не 1"""
+    cofactor = (p - 1) // n
+    for h in range(2, p):
+        alpha = pow(h, cofactor, p)
+        if alpha != 1:
+            return alpha
+    raise ValueError("Элемент порядка n не найден")
+
+
+@functools.lru_cache(maxsize=VALID_GROUP_CACHE_SIZE)
+def is_valid_group(p: int, n: int, alpha: int) -> bool:
+    """
+    Проверка группы из кэша: n | p-1, alpha != 1, alpha^n = 1 и простота
+    p и n. Файл кэша доступен пользователю для записи, поэтому простота p
+    проверяется заново; для 2048-битного p это около секунды (40 раундов
+    Миллера-Рабина), и результат запоминается на время работы процесса
+    """
+    return (n > 2 and (p - 1) % n == 0 and 1 < alpha < p and pow(alpha, n, p) == 1
+            and number_theory.is_probable_prime(n) and number_theory.is_probable_prime(p))
+
+
+def _load_cache(path: Path) -> dict:
+    """Содержимое файла кэша (пустой словарь, если файла нет или он поврежден)"""
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_cache(path: Path, key: str, group: Tuple[int, int, int]):
+    """Добавление группы в файл кэша (запись через временный файл)"""
+    with _cache_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cache = _load_cache(path)
+        cache[key] = {'p': hex(group[0]), 'n': hex(group[1]), 'alpha': hex(group[2])}
+        temporary = path.with_name(path.name + f".{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(cache, indent=2), encoding='utf-8')
+        os.replace(temporary, path)
+
+
+def generate_group(p_bits: int, n_bits: int, workers: Optional[int] = None,
+                   cache_path: Optional[Path] = DEFAULT_CACHE_PATH, fresh: bool = False,
+                   seed: Optional[int] = None,
+                   progress: Optional[Callable[[str], None]] = None) -> Tuple[int, int, int]:
+    """
+    Генерация параметров (p, n, alpha) группы Эль-Гамаля
+
+    p_bits, n_bits - длины p и n в битах (n_bits < p_bits)
+    workers - число процессов для теста Миллера-Рабина (по умолчанию - число
+              ядер, 1 - без пула процессов)
+    cache_path - файл кэша групп (None - без кэша); fresh=True - сгенерировать
+                 новую группу, даже если в кэше есть группа тех же размеров
+    seed - начальное значение генератора случайных чисел (для воспроизводимости)
+    """
+    if n_bits < 8 or p_bits <= n_bits:
+        raise ValueError("Нужно n_bits >= 8 и p_bits > n_bits")
+    key = f"{p_bits}/{n_bits}"
+    if cache_path is not None and not fresh:
+        entry = _load_cache(Path(cache_path)).get(key)
+        if entry is not None:
+            try:
+                group = (int(entry['p'], 16), int(entry['n'], 16), int(entry['alpha'], 16))
+            except (KeyError, TypeError, ValueError):
+                group = None
+            if group is not None and is_valid_group(*group):
+                return group
+
+    rng = random.Random(seed)
+    workers = workers or os.cpu_count() or 1
+    batch = max(1, workers * CANDIDATES_PER_WORKER)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # При малой разнице длин четных k мало, и n с p ищутся совместно
+        k_min = _k_range(p_bits, (1 << n_bits) - 1)[0]
+        k_max = _k_range(p_bits, 1 << (n_bits - 1))[1]
+        if (k_max - k_min) // 2 < SMALL_K_RANGE:
+            if progress:
+                progress(f"совместный поиск простых n ({n_bits} бит) и p ({p_bits} бит)")
+            found = None
+            while found is None:
+                found = _schnorr_pair(p_bits, n_bits, rng.randrange(k_min, k_max + 1, 2),
+                                      rng, executor, batch)
+            n, p = found
+        else:
+            if progress:
+                progress(f"поиск простого n ({n_bits} бит)")
+            n = _random_prime(n_bits, rng, executor, batch)
+            if progress:
+                progress(f"поиск простого p = k*n + 1 ({p_bits} бит)")
+            p = _schnorr_prime(p_bits, n, rng, executor, batch)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    group = (p, n, _generator(p, n))
+    if cache_path is not None:
+        _store_cache(Path(cache_path), key, group)
+    return group
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Генерация параметров группы Эль-Гамаля")
+    parser.add_argument('p_bits', type=int, nargs='?', default=2048, help="длина p в битах")
+    parser.add_argument('n_bits', type=int, nargs='?', default=256, help="длина n в битах")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов")
+    parser.add_argument('--fresh', action='store_true', help="не использовать кэш")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    p, n, alpha = generate_group(args.p_bits, args.n_bits, args.workers, fresh=args.fresh,
+                                 progress=lambda text: print(f"... {text}", file=sys.stderr))
+    print(f"p = {p}\nn = {n}\nalpha = {alpha}")
+    print(f"Время: {time.perf_counter() - start:.2f} с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
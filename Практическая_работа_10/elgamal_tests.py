@@ -6,8 +6,30 @@
 Практическая работа №10 - Вариант 7
 """
 
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
+from pathlib import Path
+
+import shared_modules  # noqa: F401 - каталог общих модулей работы №9
+import crypto_service
+from elgamal_container import ElGamalCiphertextContainer
 from elgamal_implementation import ElGamal
+import elgamal_benchmark
+import elgamal_params
+import instrumentation
+import key_registry
+import rsa_benchmark
+from rsa_implementation import RSAImplementation
 
 
 class TestElGamal(unittest.TestCase):
@@ -35,6 +57,12 @@ class TestElGamal(unittest.TestCase):
         self.assertFalse(self.elgamal.is_prime(4))
         self.assertFalse(self.elgamal.is_prime(15))
         self.assertFalse(self.elgamal.is_prime(25))
+        
+        # Числа за границей начального решета
+        self.assertTrue(self.elgamal.is_prime(1000003))
+        self.assertFalse(self.elgamal.is_prime(1000001))
+        self.assertTrue(self.elgamal.is_prime(2 ** 31 - 1))
+        self.assertFalse(self.elgamal.is_prime(1000003 * 1000033))
     
     def test_miller_rabin_test(self):
         """Тест Миллера-Рабина"""
@@ -60,6 +88,16 @@ class TestElGamal(unittest.TestCase):
         self.assertFalse(self.elgamal.fermat_test(4))
         self.assertFalse(self.elgamal.fermat_test(15))
     
+    def test_check_prime(self):
+        """Тест проверки простоты с выбором метода по размеру числа"""
+        self.assertTrue(self.elgamal.check_prime(2039))
+        self.assertFalse(self.elgamal.check_prime(2037))
+        self.assertTrue(self.elgamal.check_prime(2 ** 61 - 1))
+        self.assertFalse(self.elgamal.check_prime(3215031751))  # сильное псевдопростое по 2, 3, 5, 7
+        # Большие числа проверяются тестом Миллера-Рабина без перебора делителей до √p
+        self.assertTrue(self.elgamal.check_prime(2 ** 2203 - 1))
+        self.assertFalse(self.elgamal.check_prime((2 ** 1279 - 1) * (2 ** 607 - 1)))
+    
     def test_check_parameters(self):
         """Тест проверки параметров"""
         # Корректные параметры
@@ -70,6 +108,57 @@ class TestElGamal(unittest.TestCase):
         # Проверим с alpha=1, который точно не подходит
         self.assertFalse(self.elgamal.check_parameters(23, 11, 1))  # alpha=1 не подходит
     
+    def test_check_parameters_large_subgroup(self):
+        """Тест проверки порядка alpha по разложению n"""
+        # n = 2^255 - 19 (простое), p = 28n + 1, alpha = 2^28 mod p имеет порядок n
+        n = 2 ** 255 - 19
+        p = 28 * n + 1
+        alpha = pow(2, 28, p)
+        self.assertTrue(self.elgamal.check_parameters(p, n, alpha))
+        
+        # Составной порядок: alpha порядка n не подходит для 2n, а alpha^2 - для n
+        self.assertFalse(self.elgamal.check_parameters(p, 2 * n, alpha))
+        self.assertTrue(self.elgamal.check_parameters(p, 2 * n, p - alpha))
+        self.assertFalse(self.elgamal.check_parameters(p, 4 * n, p - alpha))
+        
+        # Гладкий порядок: 1019 * 2 для p = 2039
+        self.assertTrue(self.elgamal.check_parameters(2039, 2038, 7))
+        self.assertFalse(self.elgamal.check_parameters(2039, 2038, 4))
+    
+    def test_generate_parameters(self):
+        """Тест генерации параметров группы"""
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = Path(directory) / "groups.json"
+            for p_bits, n_bits in ((64, 32), (129, 128), (512, 160)):
+                p, n, alpha = elgamal_params.generate_group(p_bits, n_bits, workers=1,
+                                                            cache_path=cache_path, seed=7)
+                self.assertEqual((p.bit_length(), n.bit_length()), (p_bits, n_bits))
+                self.assertEqual((p - 1) % n, 0)
+                self.assertTrue(self.elgamal.check_prime(p))
+                self.assertTrue(self.elgamal.check_parameters(p, n, alpha))
+            
+            # Повторный запрос тех же размеров загружается из кэша
+            self.assertEqual(elgamal_params.generate_group(512, 160, cache_path=cache_path), (p, n, alpha))
+            
+            params = self.elgamal.generate_parameters(64, 32, workers=2, cache_path=cache_path, fresh=True)
+            self.assertTrue(elgamal_params.is_valid_group(*params))
+            _, public_key = self.elgamal.generate_keys(*params)
+            self.assertEqual(self.elgamal.decrypt_blocks(self.elgamal.encrypt_blocks("GROUP", public_key)),
+                             "GROUP")
+            
+            # Группа с составным p = 2039^2 (alpha порядка 1019) из кэша не принимается
+            composite = (2039 ** 2, 1019, pow(4, 2039, 2039 ** 2))
+            self.assertFalse(elgamal_params.is_valid_group(*composite))
+            cache_path.write_text(json.dumps({"22/10": {name: hex(value) for name, value
+                                                        in zip(("p", "n", "alpha"), composite)}}),
+                                  encoding='utf-8')
+            p, n, alpha = elgamal_params.generate_group(22, 10, workers=1, cache_path=cache_path, seed=7)
+            self.assertNotEqual(p, composite[0])
+            self.assertTrue(elgamal_params.is_valid_group(p, n, alpha))
+        
+        with self.assertRaises(ValueError):
+            elgamal_params.generate_group(64, 64, cache_path=None)
+    
     def test_text_to_numbers(self):
         """Тест преобразования текста в числа"""
         result = self.elgamal.text_to_numbers("ABC")
@@ -82,6 +171,19 @@ class TestElGamal(unittest.TestCase):
         expected = "ABC"
         self.assertEqual(result, expected)
     
+    def test_text_conversion_table(self):
+        """Тест табличного преобразования текста"""
+        def reference(char):
+            if char == ' ':
+                return 27
+            if char.isalpha():
+                return ord(char.upper()) - ord('A') + 1
+            return (ord(char) % 26) + 1
+        
+        for text in ("Hello, World! 123", "Гусев ElGamal", ""):
+            self.assertEqual(self.elgamal.text_to_numbers(text), [reference(char) for char in text])
+        self.assertEqual(self.elgamal.numbers_to_text([8, 9, 27, 0, 28, 300, -1]), "HI ZBNY")
+    
     def test_modular_inverse(self):
         """Тест вычисления модульного обратного"""
         # Тест для простых случаев
@@ -91,6 +193,13 @@ class TestElGamal(unittest.TestCase):
         # Тест для случая, когда обратный не существует
         with self.assertRaises(ValueError):
             self.elgamal.modular_inverse(2, 4)  # gcd(2, 4) = 2 != 1
+        
+        # Большие операнды не упираются в ограничение глубины рекурсии
+        fib = [0, 1]
+        while len(fib) < 6000:
+            fib.append(fib[-1] + fib[-2])
+        inverse = self.elgamal.modular_inverse(fib[-2], fib[-1])
+        self.assertEqual((inverse * fib[-2]) % fib[-1], 1)
     
     def test_encrypt_decrypt(self):
         """Тест шифрования и расшифрования"""
@@ -107,6 +216,110 @@ class TestElGamal(unittest.TestCase):
         
         self.assertEqual(message, decrypted)
     
+    def test_fixed_base_tables(self):
+        """Тест шифрования с таблицами степеней alpha и открытого ключа"""
+        # p = 2 * 1019 + 1, alpha = 4 - квадратичный вычет порядка 1019
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = 2039, 1019, 4
+        _, public_key = self.elgamal.generate_keys(2039, 1019, 4)
+        alpha_table = self.elgamal.fixed_base_table(4, 2039, 1019)
+        for k in (1, 2, 500, 1018):
+            self.assertEqual(alpha_table.power(k), pow(4, k, 2039))
+        
+        message = "FIXED BASE TABLES"
+        with instrumentation.instrumented() as stats:
+            encrypted = self.elgamal.encrypt(message, public_key)
+        self.assertEqual(self.elgamal.decrypt(encrypted), message)
+        # Таблицы построены в generate_keys и переиспользуются без возведений в степень
+        self.assertIs(self.elgamal.fixed_base_table(4, 2039, 1019), alpha_table)
+        self.assertEqual(stats.operations['encrypt']['modular_exponentiations'], 0)
+        for c1, c2 in encrypted:
+            self.assertEqual(pow(c1, 1019, 2039), 1)
+    
+    def test_block_encryption(self):
+        """Тест блочного шифрования: несколько символов в одном элементе группы"""
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = 2039, 1019, 4
+        _, public_key = self.elgamal.generate_keys(2039, 1019, 4)
+        self.assertEqual(self.elgamal.block_size(), 2)  # 28^2 <= 2039 < 28^3
+        
+        for message in ("HELLO WORLD", "ODD", "", "Gusev, 2025"):
+            encrypted = self.elgamal.encrypt_blocks(message, public_key)
+            self.assertEqual(len(encrypted), (len(message) + 1) // 2)
+            self.assertEqual(self.elgamal.decrypt_blocks(encrypted),
+                             self.elgamal.numbers_to_text(self.elgamal.text_to_numbers(message)))
+        
+        # Для p < 28 в блок не помещается ни одного символа
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = 23, 11, 2
+        with self.assertRaises(ValueError):
+            self.elgamal.encrypt_blocks("HELLO", self.elgamal.public_key)
+    
+    def test_container(self):
+        """Тест компактного двоичного контейнера шифртекста"""
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = 2039, 1019, 4
+        self.elgamal.generate_keys(2039, 1019, 4)
+        message = "HELLO WORLD Гусев"
+        data = self.elgamal.encrypt_container(message, self.elgamal.public_key)
+        container = ElGamalCiphertextContainer(data)
+        self.assertEqual((container.p, container.block_size, container.width, len(container)),
+                         (2039, 0, 2, len(message)))
+        self.assertEqual(len(data), ElGamalCiphertextContainer.HEADER.size + 2 + 4 * len(message))
+        self.assertEqual(self.elgamal.decrypt_container(data), self.elgamal.decrypt(list(container)))
+        self.assertEqual(self.elgamal.decrypt_container(data),
+                         self.elgamal.numbers_to_text(self.elgamal.text_to_numbers(message)))
+        self.assertEqual(self.elgamal.decrypt_container_pair(data, 4), "O")
+        
+        # Блочный режим: два символа в элементе (28^2 < 2039)
+        data = self.elgamal.encrypt_container("HELLO WORLD", self.elgamal.public_key, block_mode=True)
+        container = ElGamalCiphertextContainer(data)
+        self.assertEqual((container.block_size, len(container)), (2, 6))
+        self.assertEqual(self.elgamal.decrypt_container(container), "HELLO WORLD")
+        self.assertEqual(self.elgamal.decrypt_container_pair(container, 1), "LL")
+        
+        # Файл, отображенный в память, и произвольный доступ к парам
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "message.elgc"
+            container.write_file(path)
+            with ElGamalCiphertextContainer.open_file(path) as mapped:
+                self.assertEqual(mapped.pairs(), container.pairs())
+                self.assertEqual(mapped.pair(5), container.pair(5))
+                self.assertEqual(self.elgamal.decrypt_container(mapped), "HELLO WORLD")
+            with self.assertRaises(ValueError):
+                mapped.pair(0)
+        
+        with self.assertRaises(IndexError):
+            container.pair(6)
+        with self.assertRaises(ValueError):
+            ElGamalCiphertextContainer(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            ElGamalCiphertextContainer(data[:-1])
+        self.elgamal.p = 23
+        with self.assertRaises(ValueError):
+            self.elgamal.decrypt_container(data)
+    
+    def test_decrypt_paths(self):
+        """Тест расшифрования с известным и неизвестным порядком подгруппы"""
+        message = "DECRYPTION PATHS"
+        
+        # alpha = 4 имеет порядок 1019: показатель n - x, без обращений
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = 2039, 1019, 4
+        _, public_key = self.elgamal.generate_keys(2039, 1019, 4)
+        self.assertTrue(self.elgamal.subgroup_order_known())
+        encrypted = self.elgamal.encrypt(message, public_key)
+        with instrumentation.instrumented() as stats:
+            self.assertEqual(self.elgamal.decrypt(encrypted), message)
+        self.assertNotIn('inverse', stats.operations['decrypt']['phases'])
+        
+        # alpha = 7 имеет порядок 2038, не делящий n: c1^x и пакетное обращение
+        self.elgamal.alpha = 7
+        _, public_key = self.elgamal.generate_keys(2039, 1019, 7)
+        self.assertFalse(self.elgamal.subgroup_order_known())
+        encrypted = self.elgamal.encrypt(message, public_key)
+        with instrumentation.instrumented() as stats:
+            self.assertEqual(self.elgamal.decrypt(encrypted), message)
+        self.assertIn('inverse', stats.operations['decrypt']['phases'])
+        
+        with self.assertRaises(ValueError):
+            self.elgamal.decrypt([(0, 5)])
+    
     def test_sign_verify(self):
         """Тест создания и проверки цифровой подписи"""
         message = "TEST"
@@ -134,6 +347,187 @@ class TestElGamal(unittest.TestCase):
         
         self.assertFalse(is_valid)
     
+    def test_message_digest(self):
+        """Тест хеша подписи: SHA-256 mod n, одинаковый в разных процессах и для потока"""
+        expected = int.from_bytes(hashlib.sha256("TEST".encode('utf-8')).digest(), 'big') % 11
+        self.assertEqual(self.elgamal.message_digest("TEST"), expected)
+        self.assertEqual(self.elgamal.message_digest(b"TEST"), expected)
+        self.assertEqual(self.elgamal.message_digest(io.StringIO("TEST")), expected)
+        
+        # Значение не зависит от PYTHONHASHSEED
+        code = ("from elgamal_implementation import ElGamal; e = ElGamal(); e.n = 11; "
+                "print(e.message_digest('TEST'))")
+        for seed in ('1', '2'):
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    cwd=Path(__file__).resolve().parent,
+                                    env={**os.environ, 'PYTHONHASHSEED': seed}, check=True).stdout
+            self.assertEqual(int(output.split()[-1]), expected)
+        
+        # Поток читается порциями, результат совпадает с хешем байтов целиком
+        payload = bytes(range(256)) * 1024 + b"tail"
+        stream = io.BytesIO(payload)
+        self.assertEqual(self.elgamal.message_digest(stream), self.elgamal.message_digest(payload))
+        self.assertEqual(stream.read(), b"")
+    
+    def test_sign_verify_stream(self):
+        """Тест подписи файлового объекта и проверки другим экземпляром"""
+        payload = b"document " * 20000
+        signature = self.elgamal.sign(io.BytesIO(payload))
+        
+        verifier = ElGamal()
+        verifier.p, verifier.n, verifier.alpha = 23, 11, 2
+        self.assertTrue(verifier.verify_signature(payload, signature, self.elgamal.public_key))
+        self.assertTrue(verifier.verify_signature(io.BytesIO(payload), signature, self.elgamal.public_key))
+        self.assertFalse(verifier.verify_signature(payload, (0, signature[1]), self.elgamal.public_key))
+    
+    def test_verify_batch(self):
+        """Тест пакетной проверки подписей со случайными весами"""
+        n = 2 ** 255 - 19
+        self.elgamal.p, self.elgamal.n = 28 * n + 1, n
+        self.elgamal.alpha = pow(2, 28, self.elgamal.p)
+        self.elgamal.generate_keys(self.elgamal.p, n, self.elgamal.alpha)
+        public_key = self.elgamal.public_key
+        messages = [f"Сообщение {i}" for i in range(20)] + [b"\x00\xff", b""]
+        signatures = [self.elgamal.sign(message) for message in messages]
+        self.assertEqual(self.elgamal.verify_batch(messages, signatures, public_key), [True] * 22)
+        self.assertEqual(self.elgamal.verify_batch([], [], public_key), [])
+        
+        forged = list(signatures)
+        r, s = forged[3]
+        forged[3] = (r, (s + 1) % n)
+        r, s = forged[7]
+        forged[7] = (self.elgamal.p - r, s)  # r вне подгруппы порядка n
+        forged[10] = (0, forged[10][1])
+        changed = list(messages)
+        changed[15] = "Другое сообщение"
+        
+        with instrumentation.instrumented() as stats:
+            results = self.elgamal.verify_batch(changed, forged, public_key)
+        self.assertEqual([i for i, valid in enumerate(results) if not valid], [3, 7, 10, 15])
+        self.assertEqual(stats.operations['verify_batch']['calls'], 1)
+        
+        with self.assertRaises(ValueError):
+            self.elgamal.verify_batch(messages, signatures[:-1], public_key)
+    
+    def test_verify_batch_order_two_forgeries(self):
+        """Тест: подписи, равенства которых нарушены на множитель -1, отклоняются пакетом"""
+        n = 2 ** 255 - 19
+        p = 28 * n + 1
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = p, n, pow(2, 28, p)
+        self.elgamal.generate_keys(p, n, self.elgamal.alpha)
+        x, y = self.elgamal.private_key, self.elgamal.public_key
+        
+        messages = [f"Сообщение {i}" for i in range(6)]
+        forged = []
+        for message in messages[:2]:
+            # r' = p - r = -alpha^k; s' выбирается так, что y^r' * r^s' = alpha^h,
+            # и при нечетном s' получается y^r' * r'^s' = -alpha^h
+            while True:
+                k = random.randrange(1, n)
+                r = pow(self.elgamal.alpha, k, p)
+                s = ((self.elgamal.message_digest(message) - x * (p - r)) * self.elgamal.modular_inverse(k, n)) % n
+                if s % 2 == 1:
+                    break
+            forged.append((p - r, s))
+            self.assertEqual(pow(y, (p - r) % n, p) * pow(p - r, s, p) % p,
+                             p - pow(self.elgamal.alpha, self.elgamal.message_digest(message), p))
+        signatures = forged + [self.elgamal.sign(message) for message in messages[2:]]
+        
+        for _ in range(10):
+            self.assertEqual(self.elgamal.verify_batch(messages, signatures, y),
+                             [False, False, True, True, True, True])
+    
+    def test_nonce_pool(self):
+        """Тест пула заранее вычисленных одноразовых ключей"""
+        n = 2 ** 255 - 19
+        p = 28 * n + 1
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = p, n, pow(2, 28, p)
+        self.elgamal.generate_keys(p, n, self.elgamal.alpha)
+        
+        pool = self.elgamal.start_nonce_pool(capacity=16, background=False)
+        self.assertEqual(pool.refill(), 16)
+        self.assertEqual(pool.refill(), 0)
+        entry = pool.take()
+        self.assertEqual(entry.alpha_power, pow(self.elgamal.alpha, entry.k, p))
+        self.assertEqual(entry.key_power, pow(self.elgamal.public_key, entry.k, p))
+        self.assertEqual(entry.k * entry.k_inverse % n, 1)
+        
+        with instrumentation.instrumented() as stats:
+            signature = self.elgamal.sign("TEST")
+        self.assertEqual(stats.totals['modular_exponentiations'], 0)
+        self.assertTrue(self.elgamal.verify_signature("TEST", signature, self.elgamal.public_key))
+        encrypted = self.elgamal.encrypt("HELLO WORLD", self.elgamal.public_key)
+        self.assertEqual(self.elgamal.decrypt(encrypted), "HELLO WORLD")
+        # Каждая запись выдается один раз
+        self.assertEqual(len({c1 for c1, _ in encrypted} | {signature[0], entry.alpha_power}), 13)
+        self.assertEqual((pool.hits, pool.misses, len(pool)), (13, 0, 3))
+        
+        # Пустой пул вычисляет запись сразу; пул другого ключа не используется
+        self.elgamal.encrypt("ABCD", self.elgamal.public_key)
+        self.assertEqual((pool.hits, pool.misses), (16, 1))
+        self.elgamal.encrypt("ABCD", pow(self.elgamal.alpha, 5, p))
+        self.assertEqual((pool.hits, pool.misses), (16, 1))
+        
+        # Фоновое заполнение не попадает в статистику основного потока
+        with instrumentation.instrumented() as stats:
+            pool = self.elgamal.start_nonce_pool(capacity=4)
+            table_multiplications = stats.totals['modular_multiplications']
+            deadline = time.monotonic() + 30
+            while len(pool) < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(len(pool), 4)
+        self.assertEqual(stats.totals['modular_multiplications'], table_multiplications)
+        self.elgamal.stop_nonce_pool()
+        self.assertIsNone(self.elgamal.nonce_pool)
+        self.assertEqual(len(pool), 0)
+    
+    def test_verbose_flag(self):
+        """Тест тихого режима (журнал DEBUG) и подробного режима (печать)"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), \
+                self.assertLogs('elgamal_implementation', level='DEBUG') as logs:
+            encrypted = self.elgamal.encrypt("HI", self.elgamal.public_key)
+        self.assertEqual(output.getvalue(), "")
+        self.assertTrue(any("Шифрование сообщения 'HI'" in line for line in logs.output))
+        
+        verbose = ElGamal(verbose=True)
+        verbose.p, verbose.n, verbose.alpha, verbose.private_key = 23, 11, 2, 7
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(verbose.decrypt(encrypted), "HI")
+        self.assertIn("Расшифрованное сообщение: 'HI'", output.getvalue())
+    
+    def test_benchmark(self):
+        """Тест замеров подробного и тихого режимов"""
+        records = elgamal_benchmark.run_benchmark(2000)
+        self.assertEqual([(record['operation'], record['verbose']) for record in records],
+                         [('encrypt', True), ('decrypt', True), ('encrypt', False), ('decrypt', False)])
+        self.assertTrue(all(record['throughput_bytes_per_s'] > 0 for record in records))
+        self.assertIn("тихий", elgamal_benchmark.format_results(records))
+    
+    def test_instrumentation(self):
+        """Тест подсчета операций и времени этапов"""
+        with instrumentation.instrumented() as stats:
+            signature = self.elgamal.sign("TEST")
+            self.elgamal.verify_signature("TEST", signature, self.elgamal.public_key)
+            self.elgamal.verify_signature("TEST", signature, self.elgamal.public_key)
+        
+        report = stats.to_dict()
+        self.assertEqual(report['operations']['sign']['calls'], 1)
+        self.assertEqual(report['operations']['sign']['modular_exponentiations'], 1)
+        # Проверка y^n = 1 выполняется один раз для ключа; alpha^h и y^r * r^s
+        # вычисляются таблицей степеней и приемом Шамира без отдельных возведений
+        verify = report['operations']['verify_signature']
+        self.assertEqual(verify['calls'], 2)
+        self.assertEqual(verify['modular_exponentiations'], 1)
+        self.assertGreater(verify['modular_multiplications'], 0)
+        self.assertIn('exponentiation', verify['phases'])
+        self.assertEqual(report['totals']['modular_exponentiations'], 2)
+        self.assertIn('"sign"', stats.to_json())
+        
+        # Вне блока with статистика не накапливается
+        self.elgamal.sign("TEST")
+        self.assertEqual(stats.totals['modular_exponentiations'], 2)
+    
     def test_generate_keys(self):
         """Тест генерации ключей"""
         private_key, public_key = self.elgamal.generate_keys(23, 11, 2)
@@ -149,6 +543,113 @@ class TestElGamal(unittest.TestCase):
         self.assertEqual(public_key, expected_public_key)
 
 
+class TestCryptoService(unittest.IsolatedAsyncioTestCase):
+    """Тесты асинхронного сервиса операций с ключами"""
+    
+    def setUp(self):
+        """Ключи RSA (256 бит) и Эль-Гамаля (p = 2039)"""
+        self.rsa = RSAImplementation()
+        rsa_benchmark.make_key(self.rsa, 256, '65537')
+        self.elgamal = ElGamal()
+        self.elgamal.p, self.elgamal.n, self.elgamal.alpha = 2039, 1019, 4
+        self.elgamal.generate_keys(2039, 1019, 4)
+    
+    def test_key_registry(self):
+        """Тест реестра ключей с LRU-кэшем производных данных"""
+        registry = key_registry.KeyRegistry()
+        registry.add_rsa_key('rsa', self.rsa)
+        for tenant in range(3):
+            registry.add_elgamal(tenant, 2039, 1019, 4, tenant + 2, pow(4, tenant + 2, 2039))
+        self.assertEqual(len(registry), 4)
+        
+        rsa = registry.get('rsa')
+        self.assertIsNot(rsa, self.rsa)
+        self.assertIs(registry.get('rsa'), rsa)
+        self.assertEqual(rsa.sign("TEST"), self.rsa.sign("TEST"))
+        elgamal = registry.get(1)
+        self.assertGreater(elgamal.memory_size(), ElGamal().memory_size())
+        self.assertEqual(elgamal.decrypt(elgamal.encrypt("HELLO", elgamal.public_key)), "HELLO")
+        stats = registry.stats()
+        self.assertEqual((stats['keys'], stats['cached'], stats['hits'], stats['misses']), (4, 2, 1, 2))
+        self.assertEqual(stats['memory_bytes'],
+                         rsa.memory_size() + elgamal.memory_size())
+        
+        # Контексты Монтгомери модулей p, q и n хранятся в объекте ключа
+        registry_rsa = key_registry.KeyRegistry(context_kind='montgomery')
+        registry_rsa.add_rsa_key('rsa', self.rsa)
+        rsa_montgomery = registry_rsa.get('rsa')
+        self.assertEqual(rsa_montgomery.sign("TEST"), self.rsa.sign("TEST"))
+        self.assertTrue(rsa_montgomery.verify("TEST", rsa_montgomery.sign("TEST"), rsa_montgomery.public_key))
+        self.assertEqual(rsa_montgomery.decrypt(rsa_montgomery.encrypt("HI", rsa_montgomery.public_key),
+                                                rsa_montgomery.private_key), "HI")
+        self.assertGreater(rsa_montgomery.memory_size(), rsa.memory_size())
+        
+        # Бюджет на один объект Эль-Гамаля: давно не использовавшийся вытесняется
+        registry = key_registry.KeyRegistry(memory_budget=elgamal.memory_size() + 100)
+        for tenant in range(3):
+            registry.add_elgamal(tenant, 2039, 1019, 4, tenant + 2, pow(4, tenant + 2, 2039))
+        first = registry.get(0)
+        registry.get(1)
+        self.assertIsNot(registry.get(0), first)
+        self.assertEqual(registry.stats()['evictions'], 2)
+        self.assertLessEqual(registry.stats()['memory_bytes'], registry.memory_budget)
+        
+        # Замена ключа сбрасывает кэш; удаление убирает ключ
+        cached = registry.get(0)
+        registry.add_elgamal(0, 2039, 1019, 4, 9, pow(4, 9, 2039))
+        self.assertEqual(registry.get(0).private_key, 9)
+        self.assertIsNot(registry.get(0), cached)
+        registry.remove(0)
+        self.assertNotIn(0, registry)
+        with self.assertRaises(KeyError):
+            registry.get(0)
+        
+        # Объект больше бюджета выдается без кэширования
+        tiny = key_registry.KeyRegistry(memory_budget=1)
+        tiny.add_rsa_key('rsa', self.rsa)
+        self.assertIsNot(tiny.get('rsa'), tiny.get('rsa'))
+        self.assertEqual(tiny.stats()['cached'], 0)
+    
+    async def test_operations(self):
+        """Тест операций обоих алгоритмов через пул процессов"""
+        async with crypto_service.CryptoService(workers=1, max_pending=4) as service:
+            service.add_rsa_key('rsa', self.rsa)
+            service.add_elgamal_key('elgamal', self.elgamal)
+            
+            for key_id in ('rsa', 'elgamal'):
+                encrypted = await service.encrypt(key_id, "HELLO")
+                self.assertEqual(await service.decrypt(key_id, encrypted), "HELLO")
+            
+            # Конкурентные запросы собираются в пакеты; max_pending ограничивает очередь
+            messages = [f"MESSAGE {i}" for i in range(12)]
+            signatures = await asyncio.gather(*(service.sign('rsa', message) for message in messages))
+            self.assertEqual(signatures, [self.rsa.sign(message) for message in messages])
+            results = await asyncio.gather(
+                *(service.verify('rsa', message, signature) for message, signature in zip(messages, signatures)),
+                service.verify('rsa', "WRONG", signatures[0]))
+            self.assertEqual(results, [True] * 12 + [False])
+            
+            signature = await service.sign('elgamal', "TEST")
+            self.assertTrue(await service.verify('elgamal', "TEST", signature))
+            self.assertFalse(await service.verify('elgamal', "WRONG", signature))
+            
+            # Ошибка операции передается только своему запросу
+            with self.assertRaises(ValueError):
+                await service.decrypt('elgamal', [(0, 5)])
+            with self.assertRaises(KeyError):
+                await service.sign('unknown', "TEST")
+            
+            stats = service.stats()
+            self.assertEqual((stats['queue_depth'], stats['in_flight'], stats['failed']), (0, 0, 1))
+            self.assertEqual(stats['completed'], 32)
+            self.assertLess(stats['batches'], 32)
+            self.assertGreater(stats['latency_p99'], 0)
+            
+            report = await crypto_service.load_test(service, 'rsa', 'sign', "LOAD", rate=200, duration=0.1)
+            self.assertEqual(report['requests'], 20)
+            self.assertLessEqual(report['p50'], report['p99'])
+
+
 def run_tests():
     """Запуск всех тестов"""
     print("=" * 60)
@@ -156,7 +657,9 @@ def run_tests():
     print("=" * 60)
     
     # Создаем тестовый набор
-    test_suite = unittest.TestLoader().loadTestsFromTestCase(TestElGamal)
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite([loader.loadTestsFromTestCase(TestElGamal),
+                                     loader.loadTestsFromTestCase(TestCryptoService)])
     
     # Запускаем тесты
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Реестр ключей RSA и Эль-Гамаля с кэшем производных данных
+Практическая работа №10 - Вариант 7
+
+Реестр хранит ключи по идентификатору (только числа ключа) и выдает
+готовые объекты RSAImplementation / ElGamal, для которых уже вычислены
+дорогие производные данные (методы precompute): параметры КТО для
+подписи RSA и контексты модулей p, q и n (деление, форма Монтгомери или
+редукция Барретта), таблицы степеней alpha и открытого ключа Эль-Гамаля,
+проверки принадлежности подгруппе. Объекты хранятся в LRU-кэше с бюджетом памяти: при
+превышении бюджета вытесняются давно не использовавшиеся ключи, и при
+следующем обращении их данные вычисляются заново.
+
+    registry = KeyRegistry(memory_budget=64 << 20)
+    registry.add_elgamal('tenant-1', p, n, alpha, x, y)
+    ciphertext = registry.get('tenant-1').encrypt("HELLO", y)
+"""
+
+import collections
+import threading
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+import shared_modules  # noqa: F401 - каталог общих модулей работы №9
+
+from elgamal_implementation import ElGamal
+from rsa_implementation import RSAImplementation
+
+# Бюджет памяти производных данных по умолчанию (байт)
+DEFAULT_MEMORY_BUDGET = 64 << 20
+
+Primitive = Union[RSAImplementation, ElGamal]
+
+
+def _build(spec: tuple, context_kind: Optional[str] = None) -> Primitive:
+    """Объект алгоритма по описанию ключа с вычисленными производными данными"""
+    if spec[0] == 'rsa':
+        _, p, q, e, d = spec
+        rsa = RSAImplementation()
+        rsa.p, rsa.q, rsa.n = p, q, p * q
+        rsa.phi = (p - 1) * (q - 1)
+        rsa.e, rsa.d = e, d
+        rsa.public_key, rsa.private_key = (e, rsa.n), (d, rsa.n)
+        rsa.precompute(context_kind)
+        return rsa
+    _, p, n, alpha, private_key, public_key = spec
+    elgamal = ElGamal()
+    elgamal.p, elgamal.n, elgamal.alpha = p, n, alpha
+    elgamal.private_key, elgamal.public_key = private_key, public_key
+    elgamal.precompute()
+    return elgamal
+
+
+class KeyRegistry:
+    """Ключи по идентификаторам и LRU-кэш объектов с производными данными"""
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, context_kind: Optional[str] = None):
+        """
+        memory_budget - наибольший суммарный размер кэшированных объектов (байт);
+        context_kind - вид контекстов модульной арифметики ключей RSA
+        (modular_arithmetic.CONTEXT_KINDS, по умолчанию - деление)
+        """
+        if memory_budget < 1:
+            raise ValueError("Бюджет памяти должен быть положительным")
+        self.memory_budget = memory_budget
+        self.context_kind = context_kind
+        self._specs: Dict[Hashable, tuple] = {}
+        self._cache: "collections.OrderedDict[Hashable, Tuple[Primitive, int]]" = collections.OrderedDict()
+        self._memory = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add_rsa(self, key_id: Hashable, p: int, q: int, e: int, d: int):
+        """Регистрация ключевой пары RSA (p, q, e, d)"""
+        self._add(key_id, ('rsa', p, q, e, d))
+
+    def add_rsa_key(self, key_id: Hashable, rsa: RSAImplementation):
+        """Регистрация ключевой пары объекта RSAImplementation"""
+        if not rsa.d:
+            raise ValueError("Ключи RSA не сгенерированы")
+        self.add_rsa(key_id, rsa.p, rsa.q, rsa.e, rsa.d)
+
+    def add_elgamal(self, key_id: Hashable, p: int, n: int, alpha: int, private_key: int, public_key: int):
+        """Регистрация параметров (p, n, alpha) и ключевой пары Эль-Гамаля"""
+        self._add(key_id, ('elgamal', p, n, alpha, private_key, public_key))
+
+    def add_elgamal_key(self, key_id: Hashable, elgamal: ElGamal):
+        """Регистрация параметров и ключевой пары объекта ElGamal"""
+        if not elgamal.private_key:
+            raise ValueError("Ключи Эль-Гамаля не сгенерированы")
+        self.add_elgamal(key_id, elgamal.p, elgamal.n, elgamal.alpha,
+                         elgamal.private_key, elgamal.public_key)
+
+    def _add(self, key_id: Hashable, spec: tuple):
+        """Регистрация описания ключа; кэш прежнего ключа с тем же id сбрасывается"""
+        with self._lock:
+            if self._specs.get(key_id) != spec:
+                self._drop(key_id)
+            self._specs[key_id] = spec
+
+    def remove(self, key_id: Hashable):
+        """Удаление ключа и его производных данных"""
+        with self._lock:
+            del self._specs[key_id]
+            self._drop(key_id)
+
+    def __contains__(self, key_id: Hashable) -> bool:
+        return key_id in self._specs
+
+    def __len__(self) -> int:
+        """Число зарегистрированных ключей"""
+        return len(self._specs)
+
+    def get(self, key_id: Hashable) -> Primitive:
+        """
+        Объект алгоритма для ключа key_id с вычисленными производными данными
+        Объект, не помещающийся в бюджет целиком, возвращается без кэширования
+        """
+        with self._lock:
+            entry = self._cache.get(key_id)
+            if entry is not None:
+                self._cache.move_to_end(key_id)
+                self.hits += 1
+                return entry[0]
+            spec = self._specs[key_id]
+            self.misses += 1
+        primitive = _build(spec, self.context_kind)
+        size = primitive.memory_size()
+        with self._lock:
+            if self._specs.get(key_id) != spec or size > self.memory_budget:
+                return primitive
+            self._drop(key_id)
+            self._cache[key_id] = (primitive, size)
+            self._memory += size
+            while self._memory > self.memory_budget:
+                self._drop(next(iter(self._cache)))
+                self.evictions += 1
+        return primitive
+
+    def _drop(self, key_id: Hashable):
+        """Удаление объекта из кэша (вызывается под блокировкой)"""
+        entry = self._cache.pop(key_id, None)
+        if entry is not None:
+            self._memory -= entry[1]
+
+    def stats(self) -> dict:
+        """Число ключей, объектов в кэше, занятая память и счетчики обращений"""
+        with self._lock:
+            return {
+                'keys': len(self._specs),
+                'cached': len(self._cache),
+                'memory_bytes': self._memory,
+                'memory_budget': self.memory_budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Пул заранее вычисленных одноразовых ключей для алгоритма Эль-Гамаля
+Практическая работа №10 - Вариант 7
+
+Каждая подпись и каждый шифруемый символ требуют случайного k, степеней
+alpha^k и y^k и (для подписи) обратного k^(-1) mod n. Пул вычисляет
+записи (k, alpha^k, k^(-1), y^k) заранее - в фоновом потоке или явным
+вызовом refill() в свободное время, - а подпись и шифрование берут
+готовую запись и выполняют только несколько умножений.
+
+Каждая запись выдается ровно один раз (повтор k раскрывает закрытый
+ключ). Если пул пуст, запись вычисляется сразу в вызывающем потоке
+(счетчик misses). Длинная арифметика CPython не отпускает GIL, поэтому
+фоновый поток снижает задержку, только пока в программе есть простои.
+
+    with NoncePool(p, n, alpha, public_key) as pool:
+        entry = pool.take()
+"""
+
+import math
+import queue
+import random
+import threading
+from typing import NamedTuple, Optional
+
+import shared_modules  # noqa: F401 - каталог общих модулей работы №9
+
+import number_theory
+
+# Число записей в пуле по умолчанию
+NONCE_POOL_CAPACITY = 1024
+# Период проверки флага остановки фоновым потоком при заполненном пуле (с)
+FILL_POLL_SECONDS = 0.1
+
+
+class NonceEntry(NamedTuple):
+    """Одноразовый ключ k и зависящие от него значения"""
+    k: int
+    alpha_power: int  # alpha^k mod p
+    k_inverse: int  # k^(-1) mod n
+    key_power: int  # y^k mod p
+
+
+class NoncePool:
+    """Ограниченная очередь записей NonceEntry для группы (p, n, alpha) и ключа y"""
+
+    def __init__(self, p: int, n: int, alpha: int, public_key: int,
+                 capacity: int = NONCE_POOL_CAPACITY, background: bool = True):
+        """
+        Создание пула
+        background=True - пул заполняется фоновым потоком-демоном,
+        иначе только вызовами refill()
+        """
+        if capacity < 1:
+            raise ValueError("Емкость пула должна быть положительной")
+        self.p = p
+        self.n = n
+        self.alpha = alpha
+        self.public_key = public_key
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "queue.Queue[NonceEntry]" = queue.Queue(maxsize=capacity)
+        self._alpha_table = number_theory.FixedBaseTable(alpha, p, max(1, (n - 1).bit_length()))
+        self._key_table = number_theory.FixedBaseTable(public_key, p, max(1, (n - 1).bit_length()))
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(target=self._fill, name="nonce-pool", daemon=True)
+            self._thread.start()
+
+    def __len__(self) -> int:
+        """Число готовых записей"""
+        return self._entries.qsize()
+
+    def __enter__(self) -> "NoncePool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def matches(self, p: int, n: int, alpha: int, public_key: Optional[int] = None) -> bool:
+        """Подходит ли пул для группы (p, n, alpha) и ключа public_key (None - любой ключ)"""
+        return ((self.p, self.n, self.alpha) == (p, n, alpha)
+                and (public_key is None or public_key == self.public_key))
+
+    def compute(self) -> NonceEntry:
+        """Вычисление новой записи"""
+        k = random.randrange(1, self.n)
+        while math.gcd(k, self.n) != 1:
+            k = random.randrange(1, self.n)
+        return NonceEntry(k, self._alpha_table.power(k), number_theory.modular_inverse(k, self.n),
+                          self._key_table.power(k))
+
+    def take(self) -> NonceEntry:
+        """Готовая запись из пула (при пустом пуле - вычисленная сразу)"""
+        try:
+            entry = self._entries.get_nowait()
+        except queue.Empty:
+            self.misses += 1
+            return self.compute()
+        self.hits += 1
+        return entry
+
+    def refill(self, count: Optional[int] = None) -> int:
+        """Добавление до count записей (по умолчанию - до заполнения); число добавленных"""
+        added = 0
+        while count is None or added < count:
+            try:
+                self._entries.put_nowait(self.compute())
+            except queue.Full:
+                break
+            added += 1
+        return added
+
+    def close(self):
+        """Остановка фонового потока и удаление неиспользованных записей"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        while True:
+            try:
+                self._entries.get_nowait()
+            except queue.Empty:
+                break
+
+    def _fill(self):
+        """Цикл фонового потока: записи добавляются, пока пул не остановлен"""
+        while not self._stopped.is_set():
+            entry = self.compute()
+            while not self._stopped.is_set():
+                try:
+                    self._entries.put(entry, timeout=FILL_POLL_SECONDS)
+                    break
+                except queue.Full:
+                    continue
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Подключение общих модулей практической работы №9
+Практическая работа №10 - Вариант 7
+
+Модули теории чисел, решета, инструментирования, RSA и замеров находятся
+в каталоге практической работы №9. Импорт этого модуля один раз добавляет
+каталог в sys.path; модули работы №10 импортируют его перед общими модулями:
+
+    import shared_modules  # noqa: F401
+    import number_theory
+"""
+
+import sys
+from pathlib import Path
+
+# Каталог общих модулей (практическая работа №9)
+SHARED_DIR = str(Path(__file__).resolve().parent.parent / "Практическая_работа_9")
+
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
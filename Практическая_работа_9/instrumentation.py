@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Инструментирование примитивов RSA и Эль-Гамаля
+Практическая работа №9 - Вариант 7
+
+Автор: Гусев В.М. КВМО-11-24
+Дата: 2025
+
+Подсчитывает модульные умножения, возведения в квадрат и возведения
+в степень, а также время этапов (проверка простоты, обращение e,
+возведение в степень, преобразование текста) для каждой операции.
+
+Пример:
+    with instrumented() as stats:
+        rsa.generate_keys(p, q)
+        rsa.encrypt(message, rsa.public_key)
+    print(stats.to_json())
+
+Пока инструментирование не включено, функции модуля сводятся к одной
+проверке глобальной переменной; во внутренних циклах проверок нет.
+Учитываются только операции потока, включившего инструментирование
+(фоновые вычисления, например пул одноразовых ключей, не попадают
+в статистику текущей операции).
+"""
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+COUNTER_NAMES = ('modular_multiplications', 'modular_squarings', 'modular_exponentiations')
+
+
+class Instrumentation:
+    """Накопитель счетчиков и времени операций"""
+
+    def __init__(self):
+        """Инициализация пустой статистики"""
+        self.totals: Dict[str, int] = dict.fromkeys(COUNTER_NAMES, 0)
+        self.operations: Dict[str, dict] = {}
+        self._stack: List[dict] = []
+
+    def _operation_entry(self, name: str) -> dict:
+        """Статистика операции name (создается при первом обращении)"""
+        entry = self.operations.get(name)
+        if entry is None:
+            entry = {'calls': 0, 'seconds': 0.0, 'phases': {}}
+            entry.update(dict.fromkeys(COUNTER_NAMES, 0))
+            self.operations[name] = entry
+        return entry
+
+    def count(self, multiplications: int = 0, squarings: int = 0, exponentiations: int = 0):
+        """Учет модульных операций во всех открытых операциях"""
+        deltas = (multiplications, squarings, exponentiations)
+        targets = [self.totals] + self._stack
+        for target in targets:
+            for name, delta in zip(COUNTER_NAMES, deltas):
+                target[name] += delta
+
+    def count_exponentiation(self, exponent: int):
+        """Учет возведения в степень бинарным методом"""
+        exponent = abs(exponent)
+        self.count(multiplications=bin(exponent).count('1'),
+                   squarings=exponent.bit_length(), exponentiations=1)
+
+    def add_phase_time(self, name: str, seconds: float):
+        """Учет времени этапа в текущей (самой вложенной) операции"""
+        owner = self._stack[-1] if self._stack else self._operation_entry('<вне операций>')
+        phase = owner['phases'].setdefault(name, {'calls': 0, 'seconds': 0.0})
+        phase['calls'] += 1
+        phase['seconds'] += seconds
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """Измерение одного вызова операции name"""
+        entry = self._operation_entry(name)
+        self._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['seconds'] += time.perf_counter() - start
+            entry['calls'] += 1
+            self._stack.pop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Измерение этапа name внутри текущей операции"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase_time(name, time.perf_counter() - start)
+
+    def to_dict(self) -> dict:
+        """Статистика в виде словаря"""
+        return {
+            'totals': dict(self.totals),
+            'operations': {
+                name: {**entry, 'phases': {phase: dict(value) for phase, value in entry['phases'].items()}}
+                for name, entry in self.operations.items()
+            }
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Статистика в формате JSON"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+
+# Текущий накопитель; None - инструментирование выключено
+_active: Optional[Instrumentation] = None
+# Поток, включивший инструментирование
+_owner: Optional[int] = None
+
+
+def current() -> Optional[Instrumentation]:
+    """Текущий накопитель или None"""
+    return _active
+
+
+@contextmanager
+def instrumented(stats: Optional[Instrumentation] = None) -> Iterator[Instrumentation]:
+    """Включение инструментирования на время блока with"""
+    global _active, _owner
+    previous = _active, _owner
+    _active = stats if stats is not None else Instrumentation()
+    _owner = threading.get_ident()
+    try:
+        yield _active
+    finally:
+        _active, _owner = previous
+
+
+def _enabled() -> bool:
+    """Включено ли инструментирование для текущего потока"""
+    return _active is not None and _owner == threading.get_ident()
+
+
+class _NullPhase:
+    """Пустой контекст этапа для выключенного инструментирования"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name: str):
+    """Контекст этапа; при выключенном инструментировании - общий пустой объект"""
+    if not _enabled():
+        return _NULL_PHASE
+    return _active.phase(name)
+
+
+def count_exponentiation(exponent: int):
+    """Учет одного возведения в степень"""
+    if _enabled():
+        _active.count_exponentiation(exponent)
+
+
+def count(multiplications: int = 0, squarings: int = 0):
+    """Учет отдельных модульных умножений и возведений в квадрат"""
+    if _enabled():
+        _active.count(multiplications=multiplications, squarings=squarings)
+
+
+def operation(name: str) -> Callable:
+    """
+    Декоратор метода-операции: при включенном инструментировании
+    измеряет время вызова, иначе сразу вызывает метод
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled():
+                return function(*args, **kwargs)
+            with _active.operation(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
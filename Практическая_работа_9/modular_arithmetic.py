@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Контексты модульной арифметики с фиксированным модулем
+Практическая работа №9 - Вариант 7
+
+Контекст вычисляет константы модуля один раз и выполняет умножение,
+возведение в квадрат и в степень в своем представлении вычетов:
+
+- ModulusContext - обычное деление с остатком (%), представление
+  совпадает с обычным;
+- MontgomeryContext - форма Монтгомери x*R mod n (R = 2^k, n нечетный):
+  редукция из умножений, маски и сдвига без деления;
+- BarrettContext - редукция Барретта с константой mu = 4^k // n.
+
+Длинная арифметика CPython делит длинные числа в C, и одно деление
+дешевле двух дополнительных длинных умножений, которых требуют формы
+Монтгомери и Барретта (замеры modular_benchmark.py: на 256-4096 битах
+они в 1.4-1.7 раза медленнее %), поэтому по умолчанию используется
+ModulusContext.
+
+    context = modulus_context(n)
+    x = context.to_form(a)
+    y = context.from_form(context.square(x))
+"""
+
+import functools
+import sys
+from typing import Dict, Optional, Type
+
+import number_theory
+
+# Вид контекста по умолчанию (самый быстрый в CPython)
+DEFAULT_CONTEXT_KIND = 'division'
+# Число контекстов, хранимых modulus_context
+MODULUS_CONTEXT_CACHE_SIZE = 64
+
+
+class ModulusContext:
+    """Арифметика по модулю modulus с редукцией делением с остатком"""
+
+    kind = 'division'
+
+    def __init__(self, modulus: int):
+        if modulus < 1:
+            raise ValueError("Модуль должен быть положительным")
+        self.modulus = modulus
+        # Единица в представлении контекста
+        self.one = self.to_form(1)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(bits={self.modulus.bit_length()})"
+
+    def memory_size(self) -> int:
+        """Оценка занимаемой контекстом памяти в байтах (объект и константы модуля)"""
+        return sys.getsizeof(self) + sum(sys.getsizeof(value) for value in vars(self).values())
+
+    def reduce(self, value: int) -> int:
+        """Редукция произведения двух вычетов (0 <= value < modulus^2)"""
+        return value % self.modulus
+
+    def to_form(self, value: int) -> int:
+        """Перевод числа в представление контекста"""
+        return value % self.modulus
+
+    def from_form(self, value: int) -> int:
+        """Перевод вычета из представления контекста в обычное"""
+        return value
+
+    def mul(self, a: int, b: int) -> int:
+        """Произведение вычетов в представлении контекста"""
+        return self.reduce(a * b)
+
+    def square(self, a: int) -> int:
+        """Квадрат вычета в представлении контекста"""
+        return self.reduce(a * a)
+
+    def power(self, base: int, exponent: int) -> int:
+        """base^exponent для base и результата в представлении контекста"""
+        modulus = self.modulus
+        result = self.one
+        while exponent > 0:
+            if exponent & 1:
+                result = (result * base) % modulus
+            exponent >>= 1
+            base = (base * base) % modulus
+        return result
+
+    def pow(self, base: int, exponent: int) -> int:
+        """base^exponent по модулю для обычных чисел (двоичный метод справа налево)"""
+        if exponent < 0:
+            raise ValueError("Показатель должен быть неотрицательным")
+        return self.from_form(self.power(self.to_form(base), exponent))
+
+
+class MontgomeryContext(ModulusContext):
+    """
+    Арифметика в форме Монтгомери x*R mod n, R = 2^k > n (n нечетный)
+    REDC(t) = t*R^(-1) mod n вычисляется как (t + m*n) / R,
+    где m = (t mod R) * n' mod R, n' = -n^(-1) mod R
+    """
+
+    kind = 'montgomery'
+
+    def __init__(self, modulus: int):
+        if modulus < 3 or modulus % 2 == 0:
+            raise ValueError("Модуль формы Монтгомери должен быть нечетным и больше 2")
+        self.shift = modulus.bit_length()
+        self._mask = (1 << self.shift) - 1
+        self._factor = -number_theory.modular_inverse(modulus, 1 << self.shift) & self._mask
+        self._radix_squared = (1 << (2 * self.shift)) % modulus
+        super().__init__(modulus)
+
+    def reduce(self, value: int) -> int:
+        """REDC: value * R^(-1) mod n для 0 <= value < n*R"""
+        value = (value + (((value & self._mask) * self._factor) & self._mask) * self.modulus) >> self.shift
+        return value - self.modulus if value >= self.modulus else value
+
+    def to_form(self, value: int) -> int:
+        return self.reduce((value % self.modulus) * self._radix_squared)
+
+    def from_form(self, value: int) -> int:
+        return self.reduce(value)
+
+    def power(self, base: int, exponent: int) -> int:
+        modulus, mask, factor, shift = self.modulus, self._mask, self._factor, self.shift
+        result = self.one
+        while exponent > 0:
+            if exponent & 1:
+                value = result * base
+                value = (value + (((value & mask) * factor) & mask) * modulus) >> shift
+                result = value - modulus if value >= modulus else value
+            exponent >>= 1
+            value = base * base
+            value = (value + (((value & mask) * factor) & mask) * modulus) >> shift
+            base = value - modulus if value >= modulus else value
+        return result
+
+
+class BarrettContext(ModulusContext):
+    """
+    Арифметика с редукцией Барретта: частное t // n оценивается
+    как ((t >> (k-1)) * mu) >> (k+1), mu = 4^k // n, k - длина n в битах;
+    оценка меньше точного частного не больше чем на 2
+    """
+
+    kind = 'barrett'
+
+    def __init__(self, modulus: int):
+        super().__init__(modulus)
+        self.shift = modulus.bit_length()
+        self._mu = (1 << (2 * self.shift)) // modulus
+
+    def reduce(self, value: int) -> int:
+        """value mod n для 0 <= value < n^2"""
+        value -= (((value >> (self.shift - 1)) * self._mu) >> (self.shift + 1)) * self.modulus
+        while value >= self.modulus:
+            value -= self.modulus
+        return value
+
+    def power(self, base: int, exponent: int) -> int:
+        modulus, mu, low, high = self.modulus, self._mu, self.shift - 1, self.shift + 1
+        result = self.one
+        while exponent > 0:
+            if exponent & 1:
+                value = result * base
+                value -= (((value >> low) * mu) >> high) * modulus
+                while value >= modulus:
+                    value -= modulus
+                result = value
+            exponent >>= 1
+            value = base * base
+            value -= (((value >> low) * mu) >> high) * modulus
+            while value >= modulus:
+                value -= modulus
+            base = value
+        return result
+
+
+CONTEXT_KINDS: Dict[str, Type[ModulusContext]] = {
+    context.kind: context for context in (ModulusContext, MontgomeryContext, BarrettContext)
+}
+
+
+def create_context(modulus: int, kind: Optional[str] = None) -> ModulusContext:
+    """
+    Новый контекст вида kind (по умолчанию DEFAULT_CONTEXT_KIND) для модуля
+    modulus; для четного модуля вместо формы Монтгомери используется деление
+    """
+    kind = kind or DEFAULT_CONTEXT_KIND
+    if kind not in CONTEXT_KINDS:
+        raise ValueError(f"Неизвестный вид контекста: {kind}")
+    if kind == MontgomeryContext.kind and (modulus < 3 or modulus % 2 == 0):
+        kind = ModulusContext.kind
+    return CONTEXT_KINDS[kind](modulus)
+
+
+@functools.lru_cache(maxsize=MODULUS_CONTEXT_CACHE_SIZE)
+def modulus_context(modulus: int, kind: Optional[str] = None) -> ModulusContext:
+    """
+    Контекст create_context(modulus, kind) из общего кэша: константы модуля
+    вычисляются один раз, пока контекст остается в кэше
+    """
+    return create_context(modulus, kind)
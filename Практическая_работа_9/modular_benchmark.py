@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Замеры контекстов модульной арифметики
+Практическая работа №9 - Вариант 7
+
+Для модулей заданных длин сравнивает возведение в степень с показателем
+длины модуля и цепочку возведений в квадрат (как в тесте Миллера-Рабина)
+в контекстах с делением (%), формой Монтгомери и редукцией Барретта,
+а также встроенную функцию pow:
+
+    python3 modular_benchmark.py --sizes 1024 2048 --repeats 5
+"""
+
+import argparse
+import json
+import random
+import sys
+from typing import List, Optional, Sequence
+
+from modular_arithmetic import CONTEXT_KINDS, ModulusContext, modulus_context
+from rsa_benchmark import measure, summarize
+
+DEFAULT_MODULUS_BITS = (256, 512, 1024, 2048, 4096)
+# Длина цепочки возведений в квадрат
+DEFAULT_SQUARINGS = 256
+# Название строки встроенной функции pow
+BUILTIN = 'builtin pow'
+
+
+def _squarings(context: ModulusContext, value: int, count: int) -> int:
+    """count возведений в квадрат в представлении контекста"""
+    square = context.square
+    for _ in range(count):
+        value = square(value)
+    return value
+
+
+def _builtin_squarings(value: int, modulus: int, count: int) -> int:
+    """count возведений в квадрат встроенной функцией pow"""
+    for _ in range(count):
+        value = pow(value, 2, modulus)
+    return value
+
+
+def run_benchmark(modulus_bits: Sequence[int] = DEFAULT_MODULUS_BITS, repeats: int = 5,
+                  squarings: int = DEFAULT_SQUARINGS, seed: Optional[int] = None) -> List[dict]:
+    """Сводки времени pow и цепочки возведений в квадрат для каждого вида контекста"""
+    rng = random.Random(seed)
+    records = []
+    for bits in modulus_bits:
+        modulus = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        base, exponent = rng.randrange(modulus), rng.getrandbits(bits)
+        expected = pow(base, exponent, modulus)
+        expected_square = pow(base, 1 << squarings, modulus)
+        for kind in list(CONTEXT_KINDS) + [BUILTIN]:
+            if kind == BUILTIN:
+                power = lambda: pow(base, exponent, modulus)
+                square = lambda: _builtin_squarings(base, modulus, squarings)
+                setup = []
+            else:
+                context = modulus_context(modulus, kind)
+                start = context.to_form(base)
+                power = lambda: context.pow(base, exponent)
+                square = lambda: context.from_form(_squarings(context, start, squarings))
+                setup = measure(lambda: CONTEXT_KINDS[kind](modulus), repeats)
+            if power() != expected or square() != expected_square:
+                raise AssertionError(f"Неверный результат контекста {kind} ({bits} бит)")
+            for operation, action in (('pow', power), ('squarings', square)):
+                records.append({'bits': bits, 'kind': kind, 'operation': operation,
+                                **summarize(measure(action, repeats))})
+            if setup:
+                records.append({'bits': bits, 'kind': kind, 'operation': 'setup', **summarize(setup)})
+    return records
+
+
+def format_results(records: List[dict]) -> str:
+    """Таблица средних времен (мс) с отношением к контексту с делением"""
+    lines = [f"{'Биты':>6} {'Операция':<10} {'Контекст':<12} {'Среднее, мс':>12} {'Относительно %':>15}"]
+    division = {(record['bits'], record['operation']): record['mean']
+                for record in records if record['kind'] == ModulusContext.kind}
+    for record in records:
+        reference = division.get((record['bits'], record['operation']))
+        ratio = f"{record['mean'] / reference:>14.2f}x" if reference else f"{'':>15}"
+        lines.append(f"{record['bits']:>6} {record['operation']:<10} {record['kind']:<12} "
+                     f"{record['mean'] * 1000:>12.4f} {ratio}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(description="Замеры контекстов модульной арифметики")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_MODULUS_BITS),
+                        help="длины модуля в битах")
+    parser.add_argument('--repeats', type=int, default=5, help="повторов каждой операции")
+    parser.add_argument('--squarings', type=int, default=DEFAULT_SQUARINGS,
+                        help="длина цепочки возведений в квадрат")
+    parser.add_argument('--seed', type=int, default=None, help="начальное значение генератора")
+    parser.add_argument('--json', action='store_true', help="вывести результаты в формате JSON")
+    args = parser.parse_args(argv)
+
+    records = run_benchmark(args.sizes, args.repeats, args.squarings, args.seed)
+    if args.json:
+        print(json.dumps(records, ensure_ascii=False, indent=2))
+    else:
+        print(format_results(records))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
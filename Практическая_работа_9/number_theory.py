@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Общие функции модульной арифметики для RSA и Эль-Гамаля
+Практическая работа №9 - Вариант 7
+
+Автор: Гусев В.М. КВМО-11-24
+Дата: 2025
+
+- Итеративный расширенный алгоритм Евклида (без рекурсии)
+- Ускорение Лемера для операндов из нескольких тысяч бит
+- Нахождение обратного элемента и пакетное обращение (прием Монтгомери)
+- Разложение на множители пробным делением на малые простые
+  и полное разложение (ρ-метод Полларда) с кэшированием результатов
+- Одновременное возведение в степень нескольких оснований (прием Шамира
+  с совместным окном для двух-четырех оснований, метод Штрауса для большего числа)
+- Таблицы степеней фиксированного основания (оконный метод)
+"""
+
+import functools
+import math
+import random
+import sys
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import instrumentation
+from prime_sieve import get_prime_sieve
+
+# Начиная с этого размера меньшего операнда (в битах) используется алгоритм Лемера
+# (по замерам на CPython выигрыш появляется примерно с 3000 бит)
+LEHMER_THRESHOLD_BITS = 3072
+# Число старших бит, по которым алгоритм Лемера моделирует шаги Евклида
+_LEHMER_DIGIT_BITS = 62
+# Граница простых делителей для пробного деления по умолчанию
+TRIAL_FACTOR_BOUND = 1 << 16
+# Ниже этой границы тест Миллера-Рабина с первыми 13 простыми основаниями детерминирован
+DETERMINISTIC_MR_LIMIT = 3317044064679887385961981
+DETERMINISTIC_MR_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+# Число случайных оснований для больших чисел (вероятность ошибки не больше 4^-40)
+PROBABLE_PRIME_ROUNDS = 40
+# Число итераций ρ-метода Полларда на один составной множитель
+RHO_ITERATION_LIMIT = 1 << 22
+# Ширина окна таблицы степеней фиксированного основания в битах
+FIXED_BASE_WINDOW_BITS = 4
+# Суммарная ширина совместного окна (бит на все основания) в приеме Шамира
+JOINT_WINDOW_BITS = 4
+
+
+def extended_gcd(a: int, b: int) -> Tuple[int, int, int]:
+    """
+    Расширенный алгоритм Евклида
+    Возвращает (gcd, x, y) такие, что ax + by = gcd(a, b)
+    Для больших операндов автоматически используется алгоритм Лемера
+    """
+    if min(a, b).bit_length() >= LEHMER_THRESHOLD_BITS:
+        return lehmer_extended_gcd(a, b)
+
+    old_r, r = a, b
+    old_x, x = 1, 0
+    old_y, y = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_x, x = x, old_x - q * x
+        old_y, y = y, old_y - q * y
+    return old_r, old_x, old_y
+
+
+def lehmer_extended_gcd(a: int, b: int) -> Tuple[int, int, int]:
+    """
+    Расширенный алгоритм Евклида с ускорением Лемера (Кнут, алгоритм L)
+    Последовательность частных вычисляется по старшим битам операндов,
+    после чего несколько шагов Евклида применяются к полным числам
+    одним линейным преобразованием
+    """
+    if a < 0 or b < 0:
+        raise ValueError("Алгоритм Лемера реализован для неотрицательных чисел")
+    swapped = a < b
+    if swapped:
+        a, b = b, a
+
+    # Инвариант: u = s0*a + t0*b, v = s1*a + t1*b (коэффициенты t восстанавливаются в конце)
+    u, v = a, b
+    s0, s1 = 1, 0
+    while v.bit_length() > _LEHMER_DIGIT_BITS:
+        shift = u.bit_length() - _LEHMER_DIGIT_BITS
+        u_hat, v_hat = u >> shift, v >> shift
+        A, B, C, D = 1, 0, 0, 1
+        while v_hat + C != 0 and v_hat + D != 0:
+            q = (u_hat + A) // (v_hat + C)
+            if q != (u_hat + B) // (v_hat + D):
+                break
+            A, C = C, A - q * C
+            B, D = D, B - q * D
+            u_hat, v_hat = v_hat, u_hat - q * v_hat
+
+        if B == 0:
+            # Частное не удалось определить по старшим битам - полный шаг деления
+            q, r = divmod(u, v)
+            u, v = v, r
+            s0, s1 = s1, s0 - q * s1
+        else:
+            u, v = A * u + B * v, C * u + D * v
+            s0, s1 = A * s0 + B * s1, C * s0 + D * s1
+
+    g, x, y = extended_gcd(u, v)
+    x_a = x * s0 + y * s1
+    y_b = (g - x_a * a) // b if b else 0
+    if swapped:
+        return g, y_b, x_a
+    return g, x_a, y_b
+
+
+def modular_inverse(a: int, m: int) -> int:
+    """
+    Нахождение обратного элемента по модулю
+    Вызывает ValueError, если обратный элемент не существует
+    """
+    g, x, _ = extended_gcd(a % m, m)
+    if g != 1:
+        raise ValueError(f"Обратный элемент для {a} по модулю {m} не существует")
+    return x % m
+
+
+def batch_modular_inverse(values: Sequence[int], m: int) -> List[int]:
+    """
+    Пакетное нахождение обратных элементов (прием Монтгомери)
+    Для n чисел выполняется одно обращение и 3(n - 1) умножений
+    """
+    if not values:
+        return []
+
+    # prefix[i] = values[0] * ... * values[i] mod m
+    prefix = []
+    accumulator = 1
+    for value in values:
+        accumulator = (accumulator * value) % m
+        prefix.append(accumulator)
+
+    try:
+        inverse = modular_inverse(accumulator, m)
+    except ValueError:
+        raise ValueError(f"Не все элементы пакета обратимы по модулю {m}") from None
+
+    result = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        result[i] = (inverse * prefix[i - 1]) % m
+        inverse = (inverse * values[i]) % m
+    result[0] = inverse
+    return result
+
+
+def trial_factor(n: int, bound: int = TRIAL_FACTOR_BOUND) -> Tuple[Dict[int, int], int]:
+    """
+    Частичное разложение n > 0 делением на простые числа не больше bound
+    Возвращает ({простой делитель: кратность}, неразложенный остаток);
+    остаток равен 1 либо не имеет простых делителей не больше bound
+    """
+    if n < 1:
+        raise ValueError("Раскладываются только натуральные числа")
+    factors: Dict[int, int] = {}
+    for p in get_prime_sieve().primes(bound):
+        if p * p > n:
+            break
+        if n % p == 0:
+            count = 0
+            while n % p == 0:
+                n //= p
+                count += 1
+            factors[p] = count
+    # Остаток без простых делителей до bound, меньший (bound + 1)^2, - простое число
+    if 1 < n < (bound + 1) ** 2:
+        factors[n] = factors.get(n, 0) + 1
+        n = 1
+    return factors, n
+
+
+def multi_exponentiation(bases: Sequence[int], exponents: Sequence[int], modulus: int) -> int:
+    """
+    Произведение bases[i]^exponents[i] по модулю
+    Возведения в квадрат общие для всех оснований: для k показателей
+    длины l выполняется l возведений в квадрат вместо k*l.
+    До JOINT_WINDOW_BITS оснований (например, g^a * h^b) - прием Шамира
+    с совместным окном, для большего числа - метод Штрауса
+    """
+    if len(bases) != len(exponents):
+        raise ValueError("Число оснований и показателей должно совпадать")
+    if any(exponent < 0 for exponent in exponents):
+        raise ValueError("Показатели должны быть неотрицательными")
+    pairs = [(base % modulus, exponent) for base, exponent in zip(bases, exponents) if exponent]
+    if len(pairs) <= JOINT_WINDOW_BITS:
+        return _joint_window_exponentiation(pairs, modulus)
+    length = max((exponent.bit_length() for _, exponent in pairs), default=0)
+    result = 1 % modulus
+    multiplications = 0
+    for bit in range(length - 1, -1, -1):
+        result = (result * result) % modulus
+        for base, exponent in pairs:
+            if exponent >> bit & 1:
+                result = (result * base) % modulus
+                multiplications += 1
+    instrumentation.count(multiplications=multiplications, squarings=length)
+    return result
+
+
+def _joint_window_exponentiation(pairs: List[Tuple[int, int]], modulus: int) -> int:
+    """
+    Прием Шамира с совместным окном для k пар (основание, показатель)
+    Показатели просматриваются одновременно окнами по w = JOINT_WINDOW_BITS // k
+    бит; таблица из 2^(w*k) элементов содержит все произведения
+    base_0^d_0 * ... * base_(k-1)^d_(k-1), поэтому на окно приходится
+    w возведений в квадрат и не больше одного умножения
+    """
+    if not pairs:
+        return 1 % modulus
+    width = JOINT_WINDOW_BITS // len(pairs)
+    mask = (1 << width) - 1
+    # Элемент с номером sum(d_j << (j*w)) равен произведению base_j^d_j
+    table = [1 % modulus]
+    multiplications = 0
+    for base, _ in pairs:
+        powers = [1 % modulus, base]
+        for _ in range(2, 1 << width):
+            powers.append((powers[-1] * base) % modulus)
+        table = [(entry * power) % modulus for power in powers for entry in table]
+        multiplications += len(powers) - 2 + len(table)
+    
+    def window(position: int) -> int:
+        index = 0
+        for j, (_, exponent) in enumerate(pairs):
+            index |= ((exponent >> position) & mask) << (j * width)
+        return index
+    
+    length = max(exponent.bit_length() for _, exponent in pairs)
+    position = (length - 1) // width * width
+    result = table[window(position)]
+    squarings = 0
+    for position in range(position - width, -1, -width):
+        for _ in range(width):
+            result = (result * result) % modulus
+        squarings += width
+        index = window(position)
+        if index:
+            result = (result * table[index]) % modulus
+            multiplications += 1
+    instrumentation.count(multiplications=multiplications, squarings=squarings)
+    return result
+
+
+class FixedBaseTable:
+    """
+    Таблица степеней фиксированного основания по модулю
+    Строка i содержит base^(j * 2^(w*i)) для j = 0..2^w - 1, поэтому
+    base^k для k длиной до max_bits бит - произведение по одному элементу
+    из каждой строки: не больше max_bits / w умножений и ни одного
+    возведения в квадрат
+    """
+
+    def __init__(self, base: int, modulus: int, max_bits: int,
+                 window_bits: int = FIXED_BASE_WINDOW_BITS):
+        """Построение таблицы для показателей длиной до max_bits бит"""
+        if modulus < 2 or max_bits < 1 or window_bits < 1:
+            raise ValueError("Некорректные параметры таблицы степеней")
+        self.base = base
+        self.modulus = modulus
+        self.max_bits = max_bits
+        self.window_bits = window_bits
+        self._mask = (1 << window_bits) - 1
+        self._rows: List[List[int]] = []
+        row_base = base % modulus
+        for _ in range(-(-max_bits // window_bits)):
+            row = [1 % modulus, row_base]
+            for _ in range(2, 1 << window_bits):
+                row.append((row[-1] * row_base) % modulus)
+            self._rows.append(row)
+            row_base = (row[-1] * row_base) % modulus
+        instrumentation.count(multiplications=len(self._rows) << window_bits)
+
+    def __len__(self) -> int:
+        """Число элементов таблицы"""
+        return len(self._rows) << self.window_bits
+
+    def memory_size(self) -> int:
+        """Оценка занимаемой таблицей памяти в байтах (списки и числа)"""
+        return sys.getsizeof(self._rows) + sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in self._rows)
+
+    def power(self, exponent: int) -> int:
+        """base^exponent по модулю; длинные показатели возводятся обычным способом"""
+        if exponent < 0:
+            raise ValueError("Показатель должен быть неотрицательным")
+        if exponent.bit_length() > self.max_bits:
+            instrumentation.count_exponentiation(exponent)
+            return pow(self.base, exponent, self.modulus)
+        result = 1 % self.modulus
+        multiplications = 0
+        for row in self._rows:
+            digit = exponent & self._mask
+            if digit:
+                result = (result * row[digit]) % self.modulus
+                multiplications += 1
+            exponent >>= self.window_bits
+            if not exponent:
+                break
+        instrumentation.count(multiplications=multiplications)
+        return result
+
+
+def miller_rabin(n: int, witnesses: Iterable[int], context=None) -> bool:
+    """
+    Раунды теста Миллера-Рабина для нечетного n > 3 по основаниям witnesses
+    (основания приводятся по модулю n, основания 0 и ±1 пропускаются)
+    context - контекст модульной арифметики для модуля n (modular_arithmetic):
+    возведение в степень и квадраты выполняются в его представлении;
+    по умолчанию - встроенная pow и деление с остатком
+    """
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    if context is None:
+        one, minus_one = 1, n - 1
+        power = lambda a: pow(a, d, n)
+        square = lambda x: (x * x) % n
+    else:
+        one, minus_one = context.one, context.to_form(n - 1)
+        power = lambda a: context.power(context.to_form(a), d)
+        square = context.square
+    for a in witnesses:
+        a %= n
+        if a < 2 or a == n - 1:
+            continue
+        instrumentation.count_exponentiation(d)
+        x = power(a)
+        if x == one or x == minus_one:
+            continue
+        for squarings in range(1, r):
+            x = square(x)
+            if x == minus_one:
+                break
+        else:
+            instrumentation.count(squarings=r - 1)
+            return False
+        instrumentation.count(squarings=squarings)
+    return True
+
+
+def is_probable_prime(n: int, rounds: int = PROBABLE_PRIME_ROUNDS) -> bool:
+    """
+    Тест Миллера-Рабина: детерминированный ниже DETERMINISTIC_MR_LIMIT,
+    с rounds случайными основаниями для больших чисел
+    """
+    if n < 2:
+        return False
+    for p in DETERMINISTIC_MR_WITNESSES:
+        if n % p == 0:
+            return n == p
+    if n < DETERMINISTIC_MR_LIMIT:
+        return miller_rabin(n, DETERMINISTIC_MR_WITNESSES)
+    return miller_rabin(n, [random.randrange(2, n - 1) for _ in range(rounds)])
+
+
+def _pollard_rho(n: int) -> int:
+    """
+    Нетривиальный делитель составного нечетного n (вариант Брента)
+    Вызывает ValueError, если делитель не найден за RHO_ITERATION_LIMIT итераций
+    """
+    for c in range(1, 64):
+        y, r, q, g = 2, 1, 1, 1
+        iterations = 0
+        while g == 1 and iterations < RHO_ITERATION_LIMIT:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                saved = y
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = (q * abs(x - y)) % n
+                g = math.gcd(q, n)
+                k += 128
+            iterations += r
+            r *= 2
+        if g == n:
+            # Произведение обнулилось - повтор с шагом 1 от сохраненной точки
+            g = 1
+            while g == 1:
+                saved = (saved * saved + c) % n
+                g = math.gcd(abs(x - saved), n)
+        if 1 < g < n:
+            return g
+        if iterations >= RHO_ITERATION_LIMIT:
+            break
+    raise ValueError(f"Не удалось разложить {n}: нет малых делителей")
+
+
+@functools.lru_cache(maxsize=256)
+def _factorize_cached(n: int) -> Tuple[Tuple[int, int], ...]:
+    """Полное разложение n > 0 в виде кортежа пар (простой делитель, кратность)"""
+    factors, cofactor = trial_factor(n)
+    pending = [cofactor] if cofactor > 1 else []
+    while pending:
+        m = pending.pop()
+        if is_probable_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        root = math.isqrt(m)
+        divisor = root if root * root == m else _pollard_rho(m)
+        pending += [divisor, m // divisor]
+    return tuple(sorted(factors.items()))
+
+
+def factorize(n: int) -> Dict[int, int]:
+    """
+    Полное разложение n > 0 на простые множители {делитель: кратность}
+    Малые делители отделяются пробным делением, простота остатка проверяется
+    тестом Миллера-Рабина, составные остатки раскладываются ρ-методом Полларда.
+    Быстро для простых и гладких n; результаты кэшируются
+    """
+    if n < 1:
+        raise ValueError("Раскладываются только натуральные числа")
+    return dict(_factorize_cached(n))
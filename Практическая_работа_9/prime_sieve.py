@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Общий кэш малых простых чисел на основе сегментированного решета Эратосфена
+Практическая работа №9 - Вариант 7
+
+Автор: Гусев В.М. КВМО-11-24
+Дата: 2025
+
+Решето строится один раз на процесс при первом обращении и расширяется
+по мере необходимости. Используется проверками простоты RSA (работа №9)
+и Эль-Гамаля (работа №10): числа внутри решета проверяются за O(1),
+для остальных выполняется перебор только по простым делителям.
+"""
+
+import math
+import threading
+from array import array
+from itertools import compress
+from typing import Iterator, Optional
+
+
+class PrimeSieve:
+    """
+    Битовая таблица простоты нечетных чисел
+    Бит с номером i соответствует числу 2i + 1
+    """
+
+    # Начальный размер решета
+    INITIAL_LIMIT = 1 << 16
+    # Размер сегмента, просеиваемого за один проход
+    SEGMENT_SIZE = 1 << 18
+    # Решето не расширяется дальше этой границы (4 МБ битовой таблицы)
+    MAX_LIMIT = 1 << 26
+
+    def __init__(self, initial_limit: int = INITIAL_LIMIT):
+        """Инициализация решета для чисел меньше initial_limit"""
+        self.limit = 0  # Решето покрывает числа [0, limit)
+        self._bits = bytearray()
+        self._odd_primes = array('I')  # Нечетные простые по возрастанию
+        self._lock = threading.Lock()
+        self._build_initial(max(initial_limit, math.isqrt(self.MAX_LIMIT) + 1))
+
+    def _build_initial(self, limit: int):
+        """Построение первого сегмента обычным решетом Эратосфена"""
+        limit = self._round_limit(limit)
+        size = limit // 2
+        flags = bytearray([1]) * size
+        flags[0] = 0  # 1 не является простым
+        for i in range(1, (math.isqrt(limit) - 1) // 2 + 1):
+            if flags[i]:
+                step = 2 * i + 1
+                start = (step * step) // 2
+                flags[start::step] = bytes(len(range(start, size, step)))
+        self._append_segment(flags, 0)
+        self.limit = limit
+
+    @staticmethod
+    def _round_limit(limit: int) -> int:
+        """Граница решета выравнивается на 16, чтобы сегменты занимали целые байты"""
+        return (limit + 15) // 16 * 16
+
+    def _append_segment(self, flags: bytearray, first_index: int):
+        """Упаковка флагов сегмента (по байту на число) в биты"""
+        packed = 0
+        for bit in range(8):
+            part = bytes(flags[bit::8])
+            packed |= int.from_bytes(part, 'little') << bit
+        self._bits += packed.to_bytes(len(flags) // 8, 'little')
+        self._odd_primes.extend(
+            2 * i + 1 for i in compress(range(first_index, first_index + len(flags)), flags))
+
+    def extend(self, limit: int):
+        """Расширение решета до чисел меньше limit (но не дальше MAX_LIMIT)"""
+        limit = self._round_limit(min(limit, self.MAX_LIMIT))
+        if limit <= self.limit:
+            return
+        with self._lock:
+            # Базовых простых (до √MAX_LIMIT) достаточно для любого сегмента
+            base_primes = self._odd_primes[:self._count_below(math.isqrt(limit) + 1)]
+            while self.limit < limit:
+                low = self.limit
+                high = min(low + self.SEGMENT_SIZE, limit)
+                size = (high - low) // 2
+                flags = bytearray([1]) * size
+                for p in base_primes:
+                    # Первое нечетное кратное p, не меньшее max(p², low)
+                    start = max(p * p, (low + p - 1) // p * p)
+                    if start % 2 == 0:
+                        start += p
+                    if start >= high:
+                        continue
+                    index = (start - low) // 2
+                    flags[index::p] = bytes(len(range(index, size, p)))
+                self._append_segment(flags, low // 2)
+                self.limit = high
+
+    def _count_below(self, bound: int) -> int:
+        """Количество нечетных простых меньше bound среди найденных"""
+        low, high = 0, len(self._odd_primes)
+        while low < high:
+            middle = (low + high) // 2
+            if self._odd_primes[middle] < bound:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _lookup(self, n: int) -> bool:
+        """Проверка по таблице для n < limit"""
+        if n % 2 == 0:
+            return n == 2
+        i = n >> 1
+        return bool(self._bits[i >> 3] >> (i & 7) & 1)
+
+    def is_prime(self, n: int) -> bool:
+        """
+        Проверка простоты числа
+        Числа до MAX_LIMIT проверяются по таблице (решето при необходимости
+        расширяется вдвое), для больших выполняется перебор по простым делителям
+        """
+        if n < 2:
+            return False
+        if n < self.limit:
+            return self._lookup(n)
+        if n < self.MAX_LIMIT:
+            self.extend(max(n + 1, 2 * self.limit))
+            return self._lookup(n)
+        return self.trial_division(n)
+
+    def trial_division(self, n: int) -> bool:
+        """
+        Проверка простоты делением на простые числа до √n
+        За пределами решета перебираются нечетные числа
+        """
+        if n < 2:
+            return False
+        if n % 2 == 0:
+            return n == 2
+        root = math.isqrt(n)
+        self.extend(root + 1)
+        for p in self.primes(root):
+            if p != 2 and n % p == 0:
+                return False
+        for i in range(self.limit | 1, root + 1, 2):
+            if n % i == 0:
+                return False
+        return True
+
+    def primes(self, upper: Optional[int] = None) -> Iterator[int]:
+        """Простые числа из решета, не превосходящие upper"""
+        if upper is None or upper >= 2:
+            yield 2
+        count = len(self._odd_primes) if upper is None else self._count_below(upper + 1)
+        yield from self._odd_primes[:count]
+
+
+_shared_sieve: Optional[PrimeSieve] = None
+_shared_sieve_lock = threading.Lock()
+
+
+def get_prime_sieve() -> PrimeSieve:
+    """Общее для всего процесса решето, создается при первом вызове"""
+    global _shared_sieve
+    if _shared_sieve is None:
+        with _shared_sieve_lock:
+            if _shared_sieve is None:
+                _shared_sieve = PrimeSieve()
+    return _shared_sieve
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Набор замеров производительности RSA
+Практическая работа №9 - Вариант 7
+
+Автор: Гусев В.М. КВМО-11-24
+Дата: 2025
+
+Перебирает размеры модуля (64-4096 бит), открытые экспоненты
+(3, 17, 65537 и случайную) и длины сообщений, измеряет задержку
+генерации ключей, шифрования и расшифрования (перцентили p50/p90/p99)
+и пропускную способность. Шифрование и расшифрование замеряются для
+текстового интерфейса encrypt/decrypt и отдельно для двоичного контейнера
+(encrypt_container/decrypt_container). Результаты можно сохранить как
+базовые (по умолчанию - в каталоге кэша пользователя) и сравнивать с ними
+следующие версии:
+
+    python3 rsa_benchmark.py --save-baseline
+    python3 rsa_benchmark.py --compare
+
+Пропускная способность пакетной подписи и проверки (10^4-10^6 подписей):
+
+    python3 rsa_benchmark.py --sizes 1024 --messages --signatures 10000 100000 1000000
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from rsa_implementation import RSAImplementation
+
+DEFAULT_MODULUS_BITS = (64, 128, 256, 512, 1024, 2048, 4096)
+DEFAULT_EXPONENTS = ('3', '17', '65537', 'random')
+DEFAULT_MESSAGE_BYTES = (16, 256, 4096)
+DEFAULT_SIGNATURE_COUNTS = (10 ** 4, 10 ** 5, 10 ** 6)
+# Файл базовых результатов по умолчанию - в каталоге кэша пользователя, а не рядом с исходниками
+DEFAULT_BASELINE = (Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache")
+                    / "rsa_benchmark" / "benchmark_baseline.json")
+# Символы случайных сообщений для encrypt/decrypt (один байт UTF-8 на символ)
+MESSAGE_ALPHABET = string.ascii_letters + string.digits + ' '
+# Замедление относительно базовых результатов, считающееся регрессией
+REGRESSION_TOLERANCE = 0.10
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Перцентиль q (0-100) методом ближайшего ранга"""
+    if not samples:
+        raise ValueError("Нет измерений для вычисления перцентиля")
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float], payload_bytes: Optional[int] = None) -> dict:
+    """Сводка измерений: перцентили, среднее и пропускная способность"""
+    summary = {
+        'samples': len(samples),
+        'mean': sum(samples) / len(samples),
+        'p50': percentile(samples, 50),
+        'p90': percentile(samples, 90),
+        'p99': percentile(samples, 99),
+    }
+    if payload_bytes is not None:
+        total = sum(samples)
+        summary['throughput_bytes_per_s'] = payload_bytes * len(samples) / total if total else float('inf')
+    return summary
+
+
+def measure(action: Callable[[], object], repeats: int) -> List[float]:
+    """Время выполнения action в секундах для каждого из repeats запусков"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def make_key(rsa: RSAImplementation, bits: int, exponent: str) -> None:
+    """
+    Генерация ключа с модулем bits бит и экспонентой exponent
+    ('random' - случайная экспонента, как в прежнем запасном варианте find_e)
+    """
+    fixed_e = None if exponent == 'random' else int(exponent)
+    while True:
+        p = rsa.generate_prime(bits - bits // 2, fixed_e)
+        q = rsa.generate_prime(bits // 2, fixed_e)
+        if p != q and (p * q).bit_length() == bits:
+            break
+    e = fixed_e
+    if e is None:
+        phi = (p - 1) * (q - 1)
+        e = random.randrange(3, phi)
+        while rsa.gcd(e, phi) != 1:
+            e = random.randrange(3, phi)
+    if not rsa.generate_keys(p, q, e):
+        raise RuntimeError(f"Не удалось сгенерировать ключ {bits} бит с e = {exponent}")
+
+
+def measure_signatures(rsa: RSAImplementation, count: int) -> List[dict]:
+    """Время пакетной подписи и пакетной проверки count сообщений текущим ключом"""
+    messages = [index.to_bytes(8, 'big') for index in range(count)]
+    start = time.perf_counter()
+    signatures = rsa.sign_batch(messages)
+    sign_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    verified = rsa.verify_batch(messages, signatures, rsa.public_key)
+    verify_seconds = time.perf_counter() - start
+    if not all(verified):
+        raise RuntimeError("Пакетная проверка отклонила верные подписи")
+    return [{'operation': operation, 'count': count, 'seconds': seconds,
+             'per_signature': seconds / count, 'signatures_per_s': count / seconds}
+            for operation, seconds in (('sign', sign_seconds), ('verify', verify_seconds))]
+
+
+def run_benchmark(modulus_bits: Sequence[int] = DEFAULT_MODULUS_BITS,
+                  exponents: Sequence[str] = DEFAULT_EXPONENTS,
+                  message_bytes: Sequence[int] = DEFAULT_MESSAGE_BYTES,
+                  repeats: int = 5, keygen_repeats: int = 3,
+                  progress: Optional[Callable[[str], None]] = None,
+                  signature_counts: Sequence[int] = ()) -> dict:
+    """
+    Выполнение всех замеров, возвращает словарь результатов
+    Замеры подписи выполняются только при непустом signature_counts
+    """
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeats': repeats,
+            'keygen_repeats': keygen_repeats,
+        },
+        'keygen': [],
+        'operations': [],
+        'signatures': [],
+    }
+    rsa = RSAImplementation()
+
+    for bits in modulus_bits:
+        for exponent in exponents:
+            if progress:
+                progress(f"{bits} бит, e = {exponent}: генерация ключей")
+            samples = measure(lambda: make_key(rsa, bits, exponent), keygen_repeats)
+            results['keygen'].append({
+                'modulus_bits': bits,
+                'exponent': exponent,
+                'e_bits': rsa.e.bit_length(),
+                'latency': summarize(samples),
+            })
+
+            for length in message_bytes:
+                if progress:
+                    progress(f"{bits} бит, e = {exponent}: сообщение {length} байт")
+                text = ''.join(random.choice(MESSAGE_ALPHABET) for _ in range(length))
+                encrypted = rsa.encrypt(text, rsa.public_key)
+                if rsa.decrypt(encrypted, rsa.private_key) != text:
+                    raise RuntimeError(f"Неверное расшифрование ({bits} бит, e = {exponent})")
+                data = os.urandom(length)
+                container = rsa.encrypt_container(data, rsa.public_key)
+                timings = (
+                    ('encrypt', lambda: rsa.encrypt(text, rsa.public_key)),
+                    ('decrypt', lambda: rsa.decrypt(encrypted, rsa.private_key)),
+                    ('encrypt_container', lambda: rsa.encrypt_container(data, rsa.public_key)),
+                    ('decrypt_container',
+                     lambda: rsa.decrypt_container(container, rsa.private_key, workers=1)),
+                )
+                for operation, action in timings:
+                    samples = measure(action, repeats)
+                    results['operations'].append({
+                        'modulus_bits': bits,
+                        'exponent': exponent,
+                        'message_bytes': length,
+                        'operation': operation,
+                        'latency': summarize(samples, length),
+                    })
+
+            for count in signature_counts:
+                if progress:
+                    progress(f"{bits} бит, e = {exponent}: {count} подписей")
+                for record in measure_signatures(rsa, count):
+                    results['signatures'].append({'modulus_bits': bits, 'exponent': exponent, **record})
+    return results
+
+
+def _record_key(record: dict) -> tuple:
+    """Ключ сопоставления записи с базовыми результатами"""
+    return (record.get('operation', 'keygen'), record['modulus_bits'],
+            record['exponent'], record.get('message_bytes', record.get('count')))
+
+
+def _record_time(record: dict) -> float:
+    """Сравниваемое время записи: медиана задержки или время одной подписи"""
+    return record['latency']['p50'] if 'latency' in record else record['per_signature']
+
+
+def _records(results: dict) -> List[dict]:
+    """Все записи результатов"""
+    return results.get('keygen', []) + results.get('operations', []) + results.get('signatures', [])
+
+
+def compare(results: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> List[dict]:
+    """
+    Сравнение медиан с базовыми результатами
+    Возвращает записи с отношением current/baseline и признаком регрессии
+    """
+    baseline_records = {_record_key(record): record for record in _records(baseline)}
+    comparison = []
+    for record in _records(results):
+        reference = baseline_records.get(_record_key(record))
+        if reference is None:
+            continue
+        ratio = _record_time(record) / _record_time(reference)
+        comparison.append({
+            'key': _record_key(record),
+            'baseline_p50': _record_time(reference),
+            'current_p50': _record_time(record),
+            'ratio': ratio,
+            'regression': ratio > 1 + tolerance,
+        })
+    return comparison
+
+
+def format_results(results: dict) -> str:
+    """Табличное представление результатов"""
+    lines = ["ГЕНЕРАЦИЯ КЛЮЧЕЙ",
+             f"{'бит':>6} {'e':>8} {'p50, мс':>12} {'p90, мс':>12} {'p99, мс':>12}"]
+    for record in results['keygen']:
+        latency = record['latency']
+        lines.append(f"{record['modulus_bits']:>6} {record['exponent']:>8} "
+                     f"{latency['p50'] * 1000:>12.3f} {latency['p90'] * 1000:>12.3f} "
+                     f"{latency['p99'] * 1000:>12.3f}")
+    lines += ["", "ШИФРОВАНИЕ И РАСШИФРОВАНИЕ",
+              f"{'бит':>6} {'e':>8} {'байт':>6} {'операция':>17} {'p50, мс':>12} "
+              f"{'p99, мс':>12} {'КБ/с':>12}"]
+    for record in results['operations']:
+        latency = record['latency']
+        lines.append(f"{record['modulus_bits']:>6} {record['exponent']:>8} "
+                     f"{record['message_bytes']:>6} {record['operation']:>17} "
+                     f"{latency['p50'] * 1000:>12.3f} {latency['p99'] * 1000:>12.3f} "
+                     f"{latency['throughput_bytes_per_s'] / 1024:>12.1f}")
+    if results.get('signatures'):
+        lines += ["", "ПАКЕТНАЯ ПОДПИСЬ И ПРОВЕРКА",
+                  f"{'бит':>6} {'e':>8} {'подписей':>9} {'операция':>10} {'всего, с':>12} "
+                  f"{'подписей/с':>12}"]
+        for record in results['signatures']:
+            lines.append(f"{record['modulus_bits']:>6} {record['exponent']:>8} "
+                         f"{record['count']:>9} {record['operation']:>10} "
+                         f"{record['seconds']:>12.3f} {record['signatures_per_s']:>12.1f}")
+    return "\n".join(lines)
+
+
+def format_comparison(comparison: List[dict]) -> str:
+    """Табличное представление сравнения с базовыми результатами"""
+    lines = ["СРАВНЕНИЕ С БАЗОВЫМИ РЕЗУЛЬТАТАМИ (p50)"]
+    for item in comparison:
+        operation, bits, exponent, length = item['key']
+        unit = "подписей" if operation in ('sign', 'verify') else "байт"
+        label = f"{operation} {bits} бит e={exponent}" + (f" {length} {unit}" if length else "")
+        mark = "РЕГРЕССИЯ" if item['regression'] else "ok"
+        lines.append(f"{label:<40} {item['ratio']:>7.2f}x  {mark}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(description="Замеры производительности RSA")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_MODULUS_BITS),
+                        help="размеры модуля в битах")
+    parser.add_argument('--exponents', nargs='+', default=list(DEFAULT_EXPONENTS),
+                        help="открытые экспоненты (числа или random)")
+    parser.add_argument('--messages', type=int, nargs='*', default=list(DEFAULT_MESSAGE_BYTES),
+                        help="длины сообщений в байтах")
+    parser.add_argument('--signatures', type=int, nargs='*', metavar='COUNT',
+                        help="число подписей в пакете (без значений - "
+                             f"{', '.join(map(str, DEFAULT_SIGNATURE_COUNTS))})")
+    parser.add_argument('--repeats', type=int, default=5, help="повторов шифрования/расшифрования")
+    parser.add_argument('--keygen-repeats', type=int, default=3, help="повторов генерации ключей")
+    parser.add_argument('--save-baseline', nargs='?', const=str(DEFAULT_BASELINE), metavar='PATH',
+                        help="сохранить результаты как базовые")
+    parser.add_argument('--compare', nargs='?', const=str(DEFAULT_BASELINE), metavar='PATH',
+                        help="сравнить с базовыми результатами")
+    parser.add_argument('--json', action='store_true', help="вывести результаты в формате JSON")
+    args = parser.parse_args(argv)
+
+    signature_counts = args.signatures
+    if signature_counts == []:
+        signature_counts = list(DEFAULT_SIGNATURE_COUNTS)
+    results = run_benchmark(args.sizes, args.exponents, args.messages, args.repeats,
+                            args.keygen_repeats,
+                            progress=lambda text: print(f"... {text}", file=sys.stderr),
+                            signature_counts=signature_counts or ())
+    print(json.dumps(results, ensure_ascii=False, indent=2) if args.json else format_results(results))
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(json.dumps(results, ensure_ascii=False, indent=2),
+                                            encoding='utf-8')
+        print(f"\nБазовые результаты сохранены в {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        comparison = compare(results, baseline)
+        print("\n" + format_comparison(comparison))
+        if any(item['regression'] for item in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Компактный двоичный контейнер шифртекста RSA
+Практическая работа №9 - Вариант 7
+
+Автор: Гусев В.М. КВМО-11-24
+Дата: 2025
+
+Формат контейнера:
+    заголовок HEADER (сигнатура, версия, идентификатор ключа, размер блока
+    открытого текста, размер блока шифртекста, число блоков, длина данных)
+    + block_count блоков шифртекста фиксированной ширины (big-endian)
+
+Все блоки имеют одинаковую ширину, поэтому к любому блоку можно обратиться
+по смещению и расшифровать его независимо от остальных.
+"""
+
+import hashlib
+import struct
+from typing import Iterable, Iterator, Optional, Union
+
+
+def key_id(modulus: int) -> bytes:
+    """Идентификатор ключа: первые 8 байт SHA-256 от модуля (общий для пары ключей)"""
+    width = (modulus.bit_length() + 7) // 8
+    return hashlib.sha256(modulus.to_bytes(width, 'big')).digest()[:8]
+
+
+class RSACiphertextContainer:
+    """
+    Контейнер блоков шифртекста фиксированной ширины
+    Работает поверх bytes/bytearray/memoryview без копирования блоков
+    """
+
+    MAGIC = b"RSAC"
+    VERSION = 1
+    HEADER = struct.Struct(">4sB8sHHQQ")
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        """Разбор контейнера из двоичных данных"""
+        self._view = memoryview(data)
+        if len(self._view) < self.HEADER.size:
+            raise ValueError("Данные короче заголовка контейнера")
+        (magic, version, self.key_id, self.plain_size, self.cipher_size,
+         self.block_count, self.payload_length) = self.HEADER.unpack_from(self._view)
+        if magic != self.MAGIC:
+            raise ValueError("Неизвестный формат контейнера")
+        if version != self.VERSION:
+            raise ValueError(f"Неподдерживаемая версия контейнера: {version}")
+        if self.plain_size < 1 or self.cipher_size <= self.plain_size:
+            raise ValueError("Некорректные размеры блоков в заголовке")
+        if len(self._view) != self.HEADER.size + self.block_count * self.cipher_size:
+            raise ValueError("Размер контейнера не соответствует числу блоков")
+        if self.payload_length > self.block_count * self.plain_size:
+            raise ValueError("Длина данных превышает емкость блоков")
+
+    @classmethod
+    def build(cls, modulus_key_id: bytes, plain_size: int, cipher_size: int,
+              payload_length: int, values: Iterable[int]) -> "RSACiphertextContainer":
+        """Сборка контейнера из зашифрованных блоков"""
+        body = bytearray(cls.HEADER.size)
+        count = 0
+        for value in values:
+            body += value.to_bytes(cipher_size, 'big')
+            count += 1
+        cls.HEADER.pack_into(body, 0, cls.MAGIC, cls.VERSION, modulus_key_id,
+                             plain_size, cipher_size, count, payload_length)
+        return cls(body)
+
+    def __len__(self) -> int:
+        """Число блоков шифртекста"""
+        return self.block_count
+
+    def block(self, index: int) -> int:
+        """Блок шифртекста с номером index"""
+        if not 0 <= index < self.block_count:
+            raise IndexError(f"Блок {index} вне диапазона 0..{self.block_count - 1}")
+        offset = self.HEADER.size + index * self.cipher_size
+        return int.from_bytes(self._view[offset:offset + self.cipher_size], 'big')
+
+    def blocks(self, start: int = 0, stop: Optional[int] = None) -> Iterator[int]:
+        """Блоки шифртекста с номерами [start, stop)"""
+        stop = self.block_count if stop is None else min(stop, self.block_count)
+        for index in range(start, stop):
+            yield self.block(index)
+
+    def plain_length(self, index: int) -> int:
+        """Число байт открытого текста в блоке index (последний блок может быть неполным)"""
+        return max(0, min(self.plain_size, self.payload_length - index * self.plain_size))
+
+    def block_bytes(self, start: int = 0, stop: Optional[int] = None) -> bytes:
+        """Двоичное представление блоков [start, stop) без заголовка"""
+        stop = self.block_count if stop is None else min(stop, self.block_count)
+        offset = self.HEADER.size
+        return bytes(self._view[offset + start * self.cipher_size:offset + stop * self.cipher_size])
+
+    def to_bytes(self) -> bytes:
+        """Сериализованный контейнер"""
+        return bytes(self._view)
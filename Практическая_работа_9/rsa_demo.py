@@ -22,7 +22,7 @@ def demo_prime_tests():
     print("ДЕМОНСТРАЦИЯ ТЕСТОВ ПРОСТОТЫ")
     print("=" * 50)
     
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     # Тестируем различные числа
     test_numbers = [17, 19, 25, 29, 31, 35, 37, 41, 49, 53, 97, 101, 121, 127]
@@ -40,7 +40,7 @@ def demo_key_generation():
     print("ДЕМОНСТРАЦИЯ ГЕНЕРАЦИИ КЛЮЧЕЙ")
     print("=" * 50)
     
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     # Пример 1: Маленькие простые числа
     print("Пример 1: p=11, q=13")
@@ -60,7 +60,7 @@ def demo_text_conversion():
     print("ДЕМОНСТРАЦИЯ ПРЕОБРАЗОВАНИЯ ТЕКСТА")
     print("=" * 50)
     
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     test_messages = ["Hello", "RSA", "Криптография", "123", "АБВ"]
     
@@ -84,7 +84,7 @@ def demo_encryption_decryption():
     print("ДЕМОНСТРАЦИЯ ШИФРОВАНИЯ И РАСШИФРОВАНИЯ")
     print("=" * 50)
     
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     # Генерируем ключи
     print("Генерируем ключи для p=11, q=13...")
@@ -112,7 +112,7 @@ def demo_large_numbers():
     print("ДЕМОНСТРАЦИЯ РАБОТЫ С БОЛЬШИМИ ЧИСЛАМИ")
     print("=" * 50)
     
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     # Используем большие простые числа
     print("Используем p=101, q=103 (n=10403)")
@@ -145,7 +145,7 @@ def demo_error_cases():
     print("ДЕМОНСТРАЦИЯ ОБРАБОТКИ ОШИБОК")
     print("=" * 50)
     
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     # Тест 1: Составные числа
     print("Тест 1: Попытка использовать составные числа")
@@ -180,7 +180,7 @@ def interactive_demo():
     print("ИНТЕРАКТИВНАЯ ДЕМОНСТРАЦИЯ")
     print("=" * 50)
     
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     while True:
         print("\nВыберите действие:")
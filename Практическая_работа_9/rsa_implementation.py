@@ -19,9 +19,26 @@
 1.9 Все функции реализованы самостоятельно
 """
 
+import hashlib
+import itertools
+import logging
 import math
+import os
 import random
-from typing import Tuple, List, Optional
+import struct
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, Tuple, List, Optional, Union
+
+import instrumentation
+from modular_arithmetic import ModulusContext, create_context
+import number_theory
+from prime_sieve import get_prime_sieve
+from rsa_container import RSACiphertextContainer, key_id
+import text_codec
+
+logger = logging.getLogger(__name__)
 
 
 class RSAImplementation:
@@ -29,8 +46,46 @@ class RSAImplementation:
     Класс для реализации алгоритма RSA
     """
     
-    def __init__(self):
-        """Инициализация RSA"""
+    # Ниже этой границы простота определяется по общему решету малых простых
+    SMALL_PRIME_LIMIT = 1 << 16
+    # Допустимая вероятность ошибки вероятностного теста для больших чисел
+    DEFAULT_ERROR_BOUND = 2.0 ** -80
+    # Наибольшая длина автоматически подбираемой открытой экспоненты
+    MAX_E_BITS = 64
+    # Смещение кодов символов при преобразовании текста в числа
+    TEXT_OFFSET = 1000
+    
+    # Заголовок потокового формата: сигнатура, размер блока открытого текста
+    # и размер блока шифртекста в байтах
+    STREAM_MAGIC = b"RSAS"
+    STREAM_HEADER = struct.Struct(">4sHH")
+    # Маркер начала дополнения последнего блока (ISO/IEC 7816-4)
+    STREAM_PADDING_MARKER = 0x80
+    # Контейнеры короче этого числа блоков расшифровываются в одном процессе
+    PARALLEL_THRESHOLD_BLOCKS = 512
+    # Число частей диапазона блоков на один процесс (для равномерной загрузки)
+    PARALLEL_CHUNKS_PER_WORKER = 4
+    
+    # Хеш-функция подписи (подписывается SHA-256 сообщения по модулю n)
+    SIGNATURE_HASH = 'sha256'
+    # Длина случайных весов пакетной проверки подписей в битах
+    # (вероятность принять пакет с неверной подписью не больше 2^-64)
+    BATCH_VERIFY_WEIGHT_BITS = 64
+    # Число раундов проверки знака по случайным подмножествам пакета
+    # (каждый раунд пропускает подмену S на -S с вероятностью 1/2)
+    BATCH_VERIFY_SIGN_ROUNDS = 64
+    # Пакеты меньшего размера проверяются по отдельности: пакетная проверка
+    # требует 1 + BATCH_VERIFY_SIGN_ROUNDS возведений в степень e
+    BATCH_VERIFY_MIN_SIZE = 2 * BATCH_VERIFY_SIGN_ROUNDS
+    
+    def __init__(self, verbose: bool = False):
+        """
+        Инициализация RSA
+        verbose=True - ход вычислений печатается (интерактивная программа
+        и демонстрация), иначе передается в журнал logging на уровне DEBUG
+        и форматируется, только если этот уровень включен
+        """
+        self.verbose = verbose
         self.p = 0
         self.q = 0
         self.n = 0
@@ -39,24 +94,52 @@ class RSAImplementation:
         self.d = 0
         self.public_key = (0, 0)
         self.private_key = (0, 0)
+        # Разложения p-1 и q-1 пробным делением: ({делитель: кратность}, остаток)
+        self.p_minus_1_factors: Tuple[dict, int] = ({}, 1)
+        self.q_minus_1_factors: Tuple[dict, int] = ({}, 1)
+        # Описание выбранной экспоненты и ожидаемой стоимости шифрования
+        self.e_selection: dict = {}
+        # Параметры КТО для подписи: (p, q, d, d mod (p-1), d mod (q-1), q^(-1) mod p)
+        self._crt_cache: Optional[Tuple[int, ...]] = None
+        # Контексты модульной арифметики для p, q и n (precompute): модуль -> контекст
+        self._contexts: Dict[int, ModulusContext] = {}
+    
+    def precompute(self, context_kind: Optional[str] = None):
+        """
+        Вычисление производных данных текущей пары ключей: параметров КТО
+        для подписи и контекстов модульной арифметики вида context_kind
+        (см. modular_arithmetic) для p, q и n. Контексты передаются
+        в modular_exponentiation при шифровании, расшифровании, подписи
+        и проверке подписи этим ключом
+        """
+        self._crt_params()
+        self._contexts = {modulus: create_context(modulus, context_kind)
+                          for modulus in (self.p, self.q, self.n)}
+    
+    def memory_size(self) -> int:
+        """Оценка памяти объекта с ключом и производными данными в байтах"""
+        values = (self.p, self.q, self.n, self.phi, self.e, self.d) + tuple(self._crt_cache or ())
+        return (sys.getsizeof(self) + sum(sys.getsizeof(value) for value in values)
+                + sum(context.memory_size() for context in self._contexts.values()))
+    
+    def _context(self, modulus: int) -> Optional[ModulusContext]:
+        """Контекст модуля из precompute (None - прямое возведение в степень)"""
+        return self._contexts.get(modulus) if self._contexts else None
+    
+    def _report(self, message: str, *args):
+        """Сообщение о ходе вычислений (аргументы подставляются как в logging)"""
+        if self.verbose:
+            print(message % args if args else message)
+        else:
+            logger.debug(message, *args)
     
     def is_prime_simple(self, n: int) -> bool:
         """
         Простая проверка простоты числа методом перебора
-        Проверяет деление на все числа от 2 до √n
+        Числа из общего решета проверяются по таблице, для больших
+        проверяется деление только на простые числа до √n
         """
-        if n < 2:
-            return False
-        if n == 2:
-            return True
-        if n % 2 == 0:
-            return False
-        
-        # Проверяем только нечетные делители до √n
-        for i in range(3, int(math.sqrt(n)) + 1, 2):
-            if n % i == 0:
-                return False
-        return True
+        return get_prime_sieve().is_prime(n)
     
     def is_prime_fermat(self, n: int, k: int = 10) -> bool:
         """
@@ -79,9 +162,22 @@ class RSAImplementation:
                 return False
         return True
     
-    def is_prime_miller_rabin(self, n: int, k: int = 10) -> bool:
+    def is_prime_small(self, n: int) -> bool:
+        """
+        Проверка простоты числа n < SMALL_PRIME_LIMIT по битовой таблице решета
+        """
+        if n >= self.SMALL_PRIME_LIMIT:
+            raise ValueError(f"Число {n} превышает границу таблицы {self.SMALL_PRIME_LIMIT}")
+        return get_prime_sieve().is_prime(n)
+    
+    def is_prime_miller_rabin(self, n: int, k: int = 10,
+                              witnesses: Optional[Tuple[int, ...]] = None,
+                              context: Optional[ModulusContext] = None) -> bool:
         """
         Проверка простоты числа с помощью теста Миллера-Рабина
+        (number_theory.miller_rabin). Если заданы witnesses, проверка ведется
+        по фиксированным основаниям вместо k случайных; context - контекст
+        модульной арифметики для модуля n
         """
         if n < 2:
             return False
@@ -89,29 +185,9 @@ class RSAImplementation:
             return True
         if n % 2 == 0:
             return False
-        
-        # Записываем n-1 в виде d * 2^r
-        r = 0
-        d = n - 1
-        while d % 2 == 0:
-            r += 1
-            d //= 2
-        
-        # Проводим k раундов теста
-        for _ in range(k):
-            a = random.randint(2, n - 2)
-            x = self.modular_exponentiation(a, d, n)
-            
-            if x == 1 or x == n - 1:
-                continue
-            
-            for _ in range(r - 1):
-                x = (x * x) % n
-                if x == n - 1:
-                    break
-            else:
-                return False
-        return True
+        if witnesses is None:
+            witnesses = tuple(random.randint(2, n - 2) for _ in range(k))
+        return number_theory.miller_rabin(n, witnesses, context)
     
     def gcd(self, a: int, b: int) -> int:
         """
@@ -123,16 +199,11 @@ class RSAImplementation:
     
     def extended_gcd(self, a: int, b: int) -> Tuple[int, int, int]:
         """
-        Расширенный алгоритм Евклида
+        Расширенный алгоритм Евклида (итеративный, с ускорением Лемера
+        для больших чисел)
         Возвращает (gcd, x, y) такие, что ax + by = gcd(a, b)
         """
-        if a == 0:
-            return b, 0, 1
-        
-        gcd, x1, y1 = self.extended_gcd(b % a, a)
-        x = y1 - (b // a) * x1
-        y = x1
-        return gcd, x, y
+        return number_theory.extended_gcd(a, b)
     
     def modular_inverse(self, a: int, m: int) -> Optional[int]:
         """
@@ -143,10 +214,25 @@ class RSAImplementation:
             return None  # Обратный элемент не существует
         return (x % m + m) % m
     
-    def modular_exponentiation(self, base: int, exponent: int, modulus: int) -> int:
+    def batch_modular_inverse(self, values: List[int], m: int) -> List[int]:
+        """
+        Нахождение обратных элементов для списка чисел одним обращением
+        (прием Монтгомери); ValueError, если какой-либо элемент необратим
+        """
+        return number_theory.batch_modular_inverse(values, m)
+    
+    def modular_exponentiation(self, base: int, exponent: int, modulus: int,
+                               context: Optional[ModulusContext] = None) -> int:
         """
-        Быстрое возведение в степень по модулю
+        Быстрое возведение в степень по модулю (двоичный метод справа налево)
+        Если передан контекст модуля (modular_arithmetic), умножения
+        выполняются в его представлении (форма Монтгомери, редукция Барретта)
         """
+        instrumentation.count_exponentiation(exponent)
+        if context is not None:
+            if context.modulus != modulus:
+                raise ValueError("Контекст построен для другого модуля")
+            return context.pow(base, exponent)
         result = 1
         base = base % modulus
         
@@ -158,72 +244,196 @@ class RSAImplementation:
         
         return result
     
-    def check_prime(self, n: int) -> dict:
+    def miller_rabin_rounds(self, error_bound: float) -> int:
         """
-        Комплексная проверка простоты числа всеми методами
+        Число раундов Миллера-Рабина, при котором вероятность ошибки
+        не превышает error_bound (каждый раунд дает ошибку не более 1/4)
+        """
+        if not 0 < error_bound < 1:
+            raise ValueError(f"Граница ошибки должна лежать в (0, 1), получено {error_bound}")
+        return max(1, math.ceil(-math.log(error_bound, 4)))
+    
+    @instrumentation.operation('check_prime')
+    def check_prime(self, n: int, error_bound: float = DEFAULT_ERROR_BOUND) -> dict:
+        """
+        Проверка простоты числа с выбором метода по размеру числа:
+        - n < SMALL_PRIME_LIMIT: поиск в битовой таблице малых простых
+        - n < number_theory.DETERMINISTIC_MR_LIMIT: детерминированный тест
+          Миллера-Рабина
+        - иначе: вероятностный тест Миллера-Рабина с ошибкой не более error_bound
+        
+        Невыполненные тесты имеют значение None и перечислены в 'skipped_tests',
+        время выполнения каждого теста (в секундах) записывается в 'timings'
         """
         results = {
             'number': n,
-            'simple_test': self.is_prime_simple(n),
-            'fermat_test': self.is_prime_fermat(n),
-            'miller_rabin_test': self.is_prime_miller_rabin(n),
-            'is_prime': False
+            'simple_test': None,
+            'fermat_test': None,
+            'miller_rabin_test': None,
+            'is_prime': False,
+            'method': None,
+            'skipped_tests': [],
+            'timings': {}
         }
         
-        # Число считается простым, если все тесты дали положительный результат
-        results['is_prime'] = (results['simple_test'] and 
-                              results['fermat_test'] and 
-                              results['miller_rabin_test'])
+        if n < self.SMALL_PRIME_LIMIT:
+            results['method'] = 'bitmap'
+            tests = {'simple_test': lambda: self.is_prime_small(n)}
+        elif n < number_theory.DETERMINISTIC_MR_LIMIT:
+            results['method'] = 'deterministic_miller_rabin'
+            tests = {'miller_rabin_test': lambda: self.is_prime_miller_rabin(
+                n, witnesses=number_theory.DETERMINISTIC_MR_WITNESSES)}
+        else:
+            results['method'] = 'probabilistic_miller_rabin'
+            rounds = self.miller_rabin_rounds(error_bound)
+            tests = {'miller_rabin_test': lambda: self.is_prime_miller_rabin(n, rounds)}
+        
+        for name in ('simple_test', 'fermat_test', 'miller_rabin_test'):
+            if name not in tests:
+                results['skipped_tests'].append(name)
+                continue
+            start = time.perf_counter()
+            results[name] = tests[name]()
+            results['timings'][name] = time.perf_counter() - start
+        
+        # Число считается простым, если все выполненные тесты дали положительный результат
+        results['is_prime'] = all(results[name] for name in tests)
         
         return results
     
-    def find_e(self, phi: int, user_e: Optional[int] = None) -> int:
+    def generate_prime(self, bits: int, e: Optional[int] = None) -> int:
+        """
+        Генерация случайного простого числа длиной ровно bits бит
+        Если задано e, подбирается простое p с НОД(e, p - 1) = 1
+        """
+        if bits < 2:
+            raise ValueError("Простое число должно содержать не менее 2 бит")
+        small_primes = list(get_prime_sieve().primes(min(1 << 10, 1 << (bits - 1))))
+        while True:
+            if bits == 2:
+                candidate = random.choice((2, 3))
+            else:
+                # Старший бит задает длину, младший - нечетность
+                candidate = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+            if candidate > small_primes[-1] and any(candidate % p == 0 for p in small_primes):
+                continue
+            if e is not None and self.gcd(e, candidate - 1) != 1:
+                continue
+            if self.check_prime(candidate)['is_prime']:
+                return candidate
+    
+    def public_exponent_candidates(self, min_e: int = 3, upper: Optional[int] = None,
+                                   max_bits: int = MAX_E_BITS) -> Iterator[int]:
+        """
+        Нечетные кандидаты в e из [min_e, upper) по возрастанию стоимости
+        возведения в степень: сначала по весу Хэмминга (числу умножений),
+        затем по длине (числу возведений в квадрат). Первыми идут числа
+        вида 2^k + 1 (вес 2): 3, 5, 17, 257, 65537
+        """
+        if upper is not None:
+            max_bits = min(max_bits, (upper - 1).bit_length())
+        for weight in range(2, max_bits + 1):
+            for bits in range(weight, max_bits + 1):
+                if (1 << bits) <= min_e:
+                    continue
+                # Старший и младший биты установлены, остальные единицы - внутри
+                base = (1 << (bits - 1)) | 1
+                for middle in itertools.combinations(range(1, bits - 1), weight - 2):
+                    candidate = base | sum(1 << position for position in middle)
+                    if candidate >= min_e and (upper is None or candidate < upper):
+                        yield candidate
+    
+    def select_public_exponent(self, phi: int, min_e: int = 3,
+                               factorizations: Optional[List[Tuple[dict, int]]] = None) -> dict:
+        """
+        Выбор открытой экспоненты e: простое число e >= min_e с наименьшей
+        стоимостью шифрования, взаимно простое с φ(n). Большее min_e
+        (например, 65537) дает запас стойкости ценой более медленного шифрования
+        
+        factorizations - разложения p-1 и q-1 (результаты number_theory.trial_factor):
+        для простого e условие НОД(e, φ) = 1 равносильно тому, что e не делит
+        ни p-1, ни q-1, и проверяется по разложению без деления φ
+        
+        Возвращает словарь из describe_public_exponent
+        """
+        def coprime(e: int) -> bool:
+            if factorizations is None:
+                return phi % e != 0
+            for factors, cofactor in factorizations:
+                if e in factors or (cofactor > 1 and cofactor % e == 0):
+                    return False
+            return True
+        
+        for candidate in self.public_exponent_candidates(max(min_e, 3), phi):
+            if coprime(candidate) and self.check_prime(candidate)['is_prime']:
+                return self.describe_public_exponent(candidate)
+        
+        raise ValueError(f"Не удалось найти подходящее значение e >= {min_e}")
+    
+    def describe_public_exponent(self, e: int) -> dict:
+        """
+        Ожидаемая стоимость шифрования с экспонентой e для modular_exponentiation:
+        по возведению в квадрат на каждый бит и умножение на каждую единицу
+        """
+        squarings = e.bit_length()
+        multiplications = bin(e).count('1')
+        return {
+            'e': e,
+            'bit_length': squarings,
+            'hamming_weight': multiplications,
+            'encryption_cost': {
+                'squarings': squarings,
+                'multiplications': multiplications,
+                'modular_operations': squarings + multiplications,
+            }
+        }
+    
+    def find_e(self, phi: int, user_e: Optional[int] = None, min_e: int = 3,
+               factorizations: Optional[List[Tuple[dict, int]]] = None) -> int:
         """
         Поиск числа e (открытой экспоненты)
         Если пользователь не указал e, подбираем автоматически
+        (параметры min_e и factorizations - как в select_public_exponent)
         """
         if user_e is not None:
             # Проверяем пользовательское значение e
             if self.gcd(user_e, phi) == 1 and 1 < user_e < phi:
                 return user_e
             else:
-                print(f"Ошибка: e = {user_e} не подходит. НОД(e, φ) = {self.gcd(user_e, phi)}")
-                print("Подбираем e автоматически...")
+                self._report("Ошибка: e = %s не подходит. НОД(e, φ) = %s", user_e, self.gcd(user_e, phi))
+                self._report("Подбираем e автоматически...")
         
-        # Подбираем e автоматически
-        # Начинаем с небольших простых чисел
-        candidates = [3, 5, 17, 257, 65537]
-        
-        for candidate in candidates:
-            if self.gcd(candidate, phi) == 1 and 1 < candidate < phi:
-                return candidate
-        
-        # Если стандартные значения не подошли, ищем случайно
-        for _ in range(1000):
-            candidate = random.randint(2, phi - 1)
-            if self.gcd(candidate, phi) == 1:
-                return candidate
-        
-        raise ValueError("Не удалось найти подходящее значение e")
+        # Подбираем e автоматически: простое число с наименьшим весом Хэмминга
+        # (3, 5, 17, 257, 65537, затем 7, 11, 13, ...)
+        return self.select_public_exponent(phi, min_e, factorizations)['e']
     
-    def generate_keys(self, p: int, q: int, user_e: Optional[int] = None) -> bool:
+    @instrumentation.operation('generate_keys')
+    def generate_keys(self, p: int, q: int, user_e: Optional[int] = None, min_e: int = 3) -> bool:
         """
         Генерация ключей RSA
+        Если e не задано, подбирается простое e >= min_e с наименьшей стоимостью
+        шифрования (см. select_public_exponent); выбор сохраняется в e_selection
         """
-        print("Генерация ключей RSA...")
-        print("=" * 50)
+        self._report("Генерация ключей RSA...")
+        self._report("=" * 50)
         
         # Проверяем простоту p и q
-        print(f"Проверка простоты числа p = {p}:")
-        p_check = self.check_prime(p)
+        self._report("Проверка простоты числа p = %s:", p)
+        with instrumentation.phase('prime_check'):
+            p_check = self.check_prime(p)
         self.print_prime_check(p_check)
         
-        print(f"\nПроверка простоты числа q = {q}:")
-        q_check = self.check_prime(q)
+        self._report("\nПроверка простоты числа q = %s:", q)
+        with instrumentation.phase('prime_check'):
+            q_check = self.check_prime(q)
         self.print_prime_check(q_check)
         
         if not p_check['is_prime'] or not q_check['is_prime']:
-            print("\nОшибка: p и q должны быть простыми числами!")
+            self._report("\nОшибка: p и q должны быть простыми числами!")
+            return False
+        
+        if p == q:
+            self._report("\nОшибка: p и q должны быть различными простыми числами!")
             return False
         
         # Сохраняем p и q
@@ -232,92 +442,108 @@ class RSAImplementation:
         
         # Вычисляем n = p * q
         self.n = p * q
-        print(f"\nn = p * q = {p} * {q} = {self.n}")
+        self._report("\nn = p * q = %s * %s = %s", p, q, self.n)
         
         # Вычисляем φ(n) = (p-1)(q-1)
         self.phi = (p - 1) * (q - 1)
-        print(f"φ(n) = (p-1)(q-1) = ({p}-1)({q}-1) = {self.phi}")
+        self._report("φ(n) = (p-1)(q-1) = (%s-1)(%s-1) = %s", p, q, self.phi)
         
         # Находим e
-        self.e = self.find_e(self.phi, user_e)
-        print(f"e = {self.e}")
+        with instrumentation.phase('e_selection'):
+            self.p_minus_1_factors = number_theory.trial_factor(p - 1)
+            self.q_minus_1_factors = number_theory.trial_factor(q - 1)
+            try:
+                self.e = self.find_e(self.phi, user_e, min_e,
+                                     [self.p_minus_1_factors, self.q_minus_1_factors])
+            except ValueError as error:
+                self._report("Ошибка: %s", error)
+                return False
+            self.e_selection = self.describe_public_exponent(self.e)
+        self._report("e = %s", self.e)
         
         # Вычисляем d (закрытую экспоненту)
-        self.d = self.modular_inverse(self.e, self.phi)
+        with instrumentation.phase('e_inverse'):
+            self.d = self.modular_inverse(self.e, self.phi)
         if self.d is None:
-            print("Ошибка: не удалось найти обратный элемент для e")
+            self._report("Ошибка: не удалось найти обратный элемент для e")
             return False
         
-        print(f"d = e^(-1) mod φ(n) = {self.d}")
+        self._report("d = e^(-1) mod φ(n) = %s", self.d)
         
         # Формируем ключи
         self.public_key = (self.e, self.n)
         self.private_key = (self.d, self.n)
         
-        print(f"\nОткрытый ключ: (e, n) = ({self.e}, {self.n})")
-        print(f"Закрытый ключ: (d, n) = ({self.d}, {self.n})")
+        self._report("\nОткрытый ключ: (e, n) = (%s, %s)", self.e, self.n)
+        self._report("Закрытый ключ: (d, n) = (%s, %s)", self.d, self.n)
         
         return True
     
     def print_prime_check(self, check_result: dict):
         """Вывод результатов проверки простоты"""
-        print(f"  Простой тест: {'✓' if check_result['simple_test'] else '✗'}")
-        print(f"  Тест Ферма: {'✓' if check_result['fermat_test'] else '✗'}")
-        print(f"  Тест Миллера-Рабина: {'✓' if check_result['miller_rabin_test'] else '✗'}")
-        print(f"  Итоговый результат: {'Простое' if check_result['is_prime'] else 'Составное'}")
+        timings = check_result.get('timings', {})
+        
+        def mark(name: str) -> str:
+            if check_result[name] is None:
+                return 'пропущен'
+            status = '✓' if check_result[name] else '✗'
+            if name in timings:
+                status += f" ({timings[name] * 1000:.3f} мс)"
+            return status
+        
+        self._report("  Простой тест: %s", mark('simple_test'))
+        self._report("  Тест Ферма: %s", mark('fermat_test'))
+        self._report("  Тест Миллера-Рабина: %s", mark('miller_rabin_test'))
+        self._report("  Итоговый результат: %s", 'Простое' if check_result['is_prime'] else 'Составное')
     
     def text_to_numbers(self, text: str) -> List[int]:
         """
         Преобразование текста в числа
         Алгоритм: каждый символ кодируется как (ASCII код + 1000)
         Это обеспечивает обратимость и избегает проблем с нулями
+        (весь текст преобразуется за один проход, см. text_codec)
         """
-        numbers = []
-        for char in text:
-            ascii_code = ord(char)
-            encoded = ascii_code + 1000  # Добавляем 1000 для избежания нулей
-            numbers.append(encoded)
-        return numbers
+        return text_codec.to_list(text_codec.encode_offset(text, self.TEXT_OFFSET))
     
     def numbers_to_text(self, numbers: List[int]) -> str:
         """
         Преобразование чисел обратно в текст
         """
-        text = ""
-        for num in numbers:
-            ascii_code = num - 1000  # Вычитаем 1000
-            text += chr(ascii_code)
-        return text
+        return text_codec.decode_offset(numbers, self.TEXT_OFFSET)
     
+    @instrumentation.operation('encrypt')
     def encrypt(self, message: str, key: Tuple[int, int]) -> List[int]:
         """
         Шифрование сообщения
         """
-        print(f"Шифрование сообщения: '{message}'")
-        print(f"Используемый ключ: {key}")
+        self._report("Шифрование сообщения: '%s'", message)
+        self._report("Используемый ключ: %s", key)
         
         # Преобразуем текст в числа
-        numbers = self.text_to_numbers(message)
-        print(f"Текст в числах: {numbers}")
+        with instrumentation.phase('text_conversion'):
+            numbers = self.text_to_numbers(message)
+        self._report("Текст в числах: %s", numbers)
         
         # Шифруем каждое число
         encrypted = []
         exponent, modulus = key
+        context = self._context(modulus)
         
-        for num in numbers:
-            if num >= modulus:
-                print(f"Предупреждение: число {num} >= модуля {modulus}")
-                # Разбиваем большое число на части
-                parts = self.encrypt_large_number(num, key)
-                # Добавляем маркер, что это большое число
-                encrypted.append(modulus)  # Маркер начала большого числа
-                encrypted.extend(parts)
-                encrypted.append(modulus + 1)  # Маркер конца большого числа
-            else:
-                encrypted_num = self.modular_exponentiation(num, exponent, modulus)
-                encrypted.append(encrypted_num)
+        with instrumentation.phase('exponentiation'):
+            for num in numbers:
+                if num >= modulus:
+                    self._report("Предупреждение: число %s >= модуля %s", num, modulus)
+                    # Разбиваем большое число на части
+                    parts = self.encrypt_large_number(num, key)
+                    # Добавляем маркер, что это большое число
+                    encrypted.append(modulus)  # Маркер начала большого числа
+                    encrypted.extend(parts)
+                    encrypted.append(modulus + 1)  # Маркер конца большого числа
+                else:
+                    encrypted_num = self.modular_exponentiation(num, exponent, modulus, context)
+                    encrypted.append(encrypted_num)
         
-        print(f"Зашифрованные числа: {encrypted}")
+        self._report("Зашифрованные числа: %s", encrypted)
         return encrypted
     
     def encrypt_large_number(self, num: int, key: Tuple[int, int]) -> List[int]:
@@ -363,56 +589,394 @@ class RSAImplementation:
         
         return result
     
+    @instrumentation.operation('decrypt')
     def decrypt(self, encrypted_numbers: List[int], key: Tuple[int, int]) -> str:
         """
         Расшифрование сообщения
         """
-        print(f"Расшифрование чисел: {encrypted_numbers}")
-        print(f"Используемый ключ: {key}")
+        self._report("Расшифрование чисел: %s", encrypted_numbers)
+        self._report("Используемый ключ: %s", key)
         
         # Расшифровываем каждое число
         decrypted_numbers = []
         exponent, modulus = key
+        context = self._context(modulus)
         
         i = 0
-        while i < len(encrypted_numbers):
-            if encrypted_numbers[i] == modulus:
-                # Маркер начала большого числа
-                i += 1
-                parts = []
-                # Собираем части большого числа
-                while i < len(encrypted_numbers) and encrypted_numbers[i] != modulus + 1:
-                    parts.append(encrypted_numbers[i])
+        with instrumentation.phase('exponentiation'):
+            while i < len(encrypted_numbers):
+                if encrypted_numbers[i] == modulus:
+                    # Маркер начала большого числа
+                    i += 1
+                    parts = []
+                    # Собираем части большого числа
+                    while i < len(encrypted_numbers) and encrypted_numbers[i] != modulus + 1:
+                        parts.append(encrypted_numbers[i])
+                        i += 1
+                    # Пропускаем маркер конца
+                    i += 1
+                    
+                    # Расшифровываем большое число
+                    decrypted_large = self.decrypt_large_number(parts, key)
+                    decrypted_numbers.append(decrypted_large)
+                else:
+                    # Обычное число
+                    decrypted_num = self.modular_exponentiation(encrypted_numbers[i], exponent, modulus, context)
+                    decrypted_numbers.append(decrypted_num)
                     i += 1
-                # Пропускаем маркер конца
-                i += 1
-                
-                # Расшифровываем большое число
-                decrypted_large = self.decrypt_large_number(parts, key)
-                decrypted_numbers.append(decrypted_large)
-            else:
-                # Обычное число
-                decrypted_num = self.modular_exponentiation(encrypted_numbers[i], exponent, modulus)
-                decrypted_numbers.append(decrypted_num)
-                i += 1
         
-        print(f"Расшифрованные числа: {decrypted_numbers}")
+        self._report("Расшифрованные числа: %s", decrypted_numbers)
         
         # Преобразуем числа обратно в текст
-        message = self.numbers_to_text(decrypted_numbers)
-        print(f"Расшифрованное сообщение: '{message}'")
+        with instrumentation.phase('text_conversion'):
+            message = self.numbers_to_text(decrypted_numbers)
+        self._report("Расшифрованное сообщение: '%s'", message)
         
         return message
     
+    def stream_block_sizes(self, modulus: int) -> Tuple[int, int]:
+        """
+        Размеры блоков потокового шифрования для модуля:
+        блок открытого текста всегда меньше модуля, блок шифртекста
+        вмещает любой вычет по модулю
+        """
+        plain_size = (modulus.bit_length() - 1) // 8
+        if plain_size < 1:
+            raise ValueError(f"Модуль {modulus} слишком мал для потокового шифрования (нужен n >= 256)")
+        cipher_size = (modulus.bit_length() + 7) // 8
+        return plain_size, cipher_size
+    
+    @staticmethod
+    def _read_exact(stream: BinaryIO, size: int) -> bytes:
+        """Чтение ровно size байт (меньше - только в конце потока)"""
+        chunks = []
+        remaining = size
+        while remaining:
+            chunk = stream.read(remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    
+    @instrumentation.operation('encrypt_stream')
+    def encrypt_stream(self, source: BinaryIO, destination: BinaryIO, key: Tuple[int, int]) -> int:
+        """
+        Потоковое шифрование двоичных данных блоками фиксированного размера
+        Формат: заголовок STREAM_HEADER, затем блоки шифртекста фиксированной
+        ширины (big-endian). Последний блок дополняется маркером 0x80 и нулями,
+        поэтому память не зависит от размера данных
+        Возвращает число зашифрованных байт
+        """
+        exponent, modulus = key
+        plain_size, cipher_size = self.stream_block_sizes(modulus)
+        destination.write(self.STREAM_HEADER.pack(self.STREAM_MAGIC, plain_size, cipher_size))
+        logger.info("Потоковое шифрование: блок %d байт -> %d байт", plain_size, cipher_size)
+        
+        total = 0
+        blocks = 0
+        while True:
+            chunk = self._read_exact(source, plain_size)
+            total += len(chunk)
+            last = len(chunk) < plain_size
+            if last:
+                chunk += bytes([self.STREAM_PADDING_MARKER]) + bytes(plain_size - len(chunk) - 1)
+            
+            value = self.modular_exponentiation(int.from_bytes(chunk, 'big'), exponent, modulus)
+            destination.write(value.to_bytes(cipher_size, 'big'))
+            blocks += 1
+            logger.debug("Блок %d зашифрован", blocks)
+            if last:
+                break
+        
+        logger.info("Зашифровано %d байт в %d блоках", total, blocks)
+        return total
+    
+    def _decrypt_block_value(self, value: int, key: Tuple[int, int], plain_size: int) -> bytes:
+        """Расшифрование одного блока фиксированного формата в plain_size байт"""
+        exponent, modulus = key
+        if value >= modulus:
+            raise ValueError(f"Блок {value} не является вычетом по модулю {modulus}")
+        decrypted = self.modular_exponentiation(value, exponent, modulus)
+        if decrypted.bit_length() > 8 * plain_size:
+            raise ValueError("Блок не расшифровывается данным ключом")
+        return decrypted.to_bytes(plain_size, 'big')
+    
+    @instrumentation.operation('decrypt_stream')
+    def decrypt_stream(self, source: BinaryIO, destination: BinaryIO, key: Tuple[int, int]) -> int:
+        """
+        Потоковое расшифрование данных, записанных encrypt_stream
+        Возвращает число расшифрованных байт
+        """
+        exponent, modulus = key
+        plain_size, cipher_size = self.stream_block_sizes(modulus)
+        
+        header = self._read_exact(source, self.STREAM_HEADER.size)
+        if len(header) != self.STREAM_HEADER.size:
+            raise ValueError("Поток не содержит заголовка")
+        magic, stream_plain_size, stream_cipher_size = self.STREAM_HEADER.unpack(header)
+        if magic != self.STREAM_MAGIC:
+            raise ValueError("Неизвестный формат потока")
+        if (stream_plain_size, stream_cipher_size) != (plain_size, cipher_size):
+            raise ValueError("Размеры блоков потока не соответствуют ключу")
+        
+        total = 0
+        blocks = 0
+        # Блок читается с опережением на один, чтобы распознать последний
+        block = self._read_exact(source, cipher_size)
+        while block:
+            if len(block) != cipher_size:
+                raise ValueError("Поток обрезан: неполный блок шифртекста")
+            next_block = self._read_exact(source, cipher_size)
+            
+            chunk = self._decrypt_block_value(int.from_bytes(block, 'big'), key, plain_size)
+            blocks += 1
+            
+            if not next_block:
+                stripped = chunk.rstrip(b"\x00")
+                if not stripped or stripped[-1] != self.STREAM_PADDING_MARKER:
+                    raise ValueError("Некорректное дополнение последнего блока")
+                chunk = stripped[:-1]
+            destination.write(chunk)
+            total += len(chunk)
+            logger.debug("Блок %d расшифрован", blocks)
+            block = next_block
+        
+        if blocks == 0:
+            raise ValueError("Поток не содержит блоков шифртекста")
+        logger.info("Расшифровано %d байт из %d блоков", total, blocks)
+        return total
+    
+    @instrumentation.operation('encrypt_container')
+    def encrypt_container(self, message: Union[str, bytes], key: Tuple[int, int]) -> bytes:
+        """
+        Шифрование в двоичный контейнер (см. rsa_container.py)
+        Строка кодируется в UTF-8, данные разбиваются на блоки фиксированного
+        размера без маркеров, последний блок дополняется нулями, а точная
+        длина данных хранится в заголовке
+        """
+        data = message.encode('utf-8') if isinstance(message, str) else bytes(message)
+        exponent, modulus = key
+        plain_size, cipher_size = self.stream_block_sizes(modulus)
+        values = (
+            self.modular_exponentiation(
+                int.from_bytes(data[offset:offset + plain_size].ljust(plain_size, b"\x00"), 'big'),
+                exponent, modulus)
+            for offset in range(0, len(data), plain_size)
+        )
+        container = RSACiphertextContainer.build(key_id(modulus), plain_size, cipher_size,
+                                                 len(data), values)
+        logger.info("Зашифровано %d байт в %d блоках", len(data), len(container))
+        return container.to_bytes()
+    
+    def _open_container(self, data: Union[bytes, bytearray, memoryview, RSACiphertextContainer],
+                        key: Tuple[int, int]) -> RSACiphertextContainer:
+        """Разбор контейнера и проверка соответствия ключу"""
+        container = data if isinstance(data, RSACiphertextContainer) else RSACiphertextContainer(data)
+        modulus = key[1]
+        if container.key_id != key_id(modulus):
+            raise ValueError("Контейнер зашифрован ключом с другим модулем")
+        if (container.plain_size, container.cipher_size) != self.stream_block_sizes(modulus):
+            raise ValueError("Размеры блоков контейнера не соответствуют ключу")
+        return container
+    
+    def decrypt_container_block(self, data: Union[bytes, RSACiphertextContainer],
+                                index: int, key: Tuple[int, int]) -> bytes:
+        """Независимое расшифрование одного блока контейнера"""
+        container = self._open_container(data, key)
+        chunk = self._decrypt_block_value(container.block(index), key, container.plain_size)
+        return chunk[:container.plain_length(index)]
+    
+    @instrumentation.operation('decrypt_container')
+    def decrypt_container(self, data: Union[bytes, RSACiphertextContainer],
+                          key: Tuple[int, int], workers: Optional[int] = None,
+                          executor: Optional[Executor] = None) -> bytes:
+        """
+        Расшифрование всего контейнера, возвращает исходные байты
+        
+        Контейнеры от PARALLEL_THRESHOLD_BLOCKS блоков расшифровываются
+        параллельно: диапазоны блоков распределяются по пулу процессов
+        (workers процессов, по умолчанию - число ядер, либо переданный
+        executor) и собираются в исходном порядке. workers=1 отключает
+        параллельный режим
+        """
+        container = self._open_container(data, key)
+        if executor is None and workers is None:
+            workers = os.cpu_count() or 1
+        parallel = (len(container) >= self.PARALLEL_THRESHOLD_BLOCKS
+                    and (executor is not None or workers > 1))
+        
+        if not parallel:
+            plaintext = b"".join(
+                self._decrypt_block_value(value, key, container.plain_size)
+                for value in container.blocks())
+        else:
+            if executor is None:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    plaintext = self._decrypt_container_parallel(container, key, pool, workers)
+            else:
+                plaintext = self._decrypt_container_parallel(
+                    container, key, executor, workers or os.cpu_count() or 1)
+        
+        logger.info("Расшифровано %d байт из %d блоков (%s)", container.payload_length,
+                    len(container), "параллельно" if parallel else "последовательно")
+        return plaintext[:container.payload_length]
+    
+    def _decrypt_container_parallel(self, container: RSACiphertextContainer,
+                                    key: Tuple[int, int], executor: Executor,
+                                    workers: int) -> bytes:
+        """Расшифрование диапазонов блоков в пуле процессов с сохранением порядка"""
+        chunk_count = max(1, workers * self.PARALLEL_CHUNKS_PER_WORKER)
+        chunk_size = -(-len(container) // chunk_count)
+        ranges = [container.block_bytes(start, start + chunk_size)
+                  for start in range(0, len(container), chunk_size)]
+        parts = executor.map(_decrypt_block_range, ranges,
+                             [key] * len(ranges),
+                             [container.plain_size] * len(ranges),
+                             [container.cipher_size] * len(ranges))
+        return b"".join(parts)
+    
+    def message_digest(self, message: Union[str, bytes], modulus: int) -> int:
+        """Хеш сообщения (строка кодируется в UTF-8) как вычет по модулю"""
+        data = message.encode('utf-8') if isinstance(message, str) else bytes(message)
+        digest = hashlib.new(self.SIGNATURE_HASH, data).digest()
+        return int.from_bytes(digest, 'big') % modulus
+    
+    def _crt_params(self) -> Tuple[int, ...]:
+        """
+        Параметры подписи по китайской теореме об остатках
+        Вычисляются один раз для текущей пары ключей
+        """
+        if not self.d:
+            raise ValueError("Ключи не сгенерированы")
+        cache = self._crt_cache
+        if cache is None or cache[:3] != (self.p, self.q, self.d):
+            if self.p == self.q:
+                raise ValueError("Подпись по КТО требует различных простых p и q")
+            cache = (self.p, self.q, self.d, self.d % (self.p - 1), self.d % (self.q - 1),
+                     number_theory.modular_inverse(self.q, self.p))
+            self._crt_cache = cache
+        return cache
+    
+    def _sign_digest(self, digest: int, crt: Tuple[int, ...]) -> int:
+        """Подпись хеша: два возведения в степень по модулям p и q вместо одного по n"""
+        p, q, _, dp, dq, q_inv = crt
+        s_p = self.modular_exponentiation(digest, dp, p, self._context(p))
+        s_q = self.modular_exponentiation(digest, dq, q, self._context(q))
+        return s_q + q * ((q_inv * (s_p - s_q)) % p)
+    
+    @instrumentation.operation('sign')
+    def sign(self, message: Union[str, bytes]) -> int:
+        """Подпись сообщения закрытым ключом: S = H(M)^d mod n"""
+        return self.sign_batch([message])[0]
+    
+    @instrumentation.operation('sign_batch')
+    def sign_batch(self, messages: List[Union[str, bytes]]) -> List[int]:
+        """
+        Подпись списка сообщений закрытым ключом
+        Параметры КТО вычисляются один раз на пакет
+        """
+        crt = self._crt_params()
+        with instrumentation.phase('hashing'):
+            digests = [self.message_digest(message, self.n) for message in messages]
+        with instrumentation.phase('exponentiation'):
+            return [self._sign_digest(digest, crt) for digest in digests]
+    
+    @instrumentation.operation('verify')
+    def verify(self, message: Union[str, bytes], signature: int, key: Tuple[int, int]) -> bool:
+        """Проверка подписи открытым ключом: S^e mod n = H(M)"""
+        exponent, modulus = key
+        if not 0 <= signature < modulus:
+            return False
+        with instrumentation.phase('exponentiation'):
+            return (self.modular_exponentiation(signature, exponent, modulus, self._context(modulus))
+                    == self.message_digest(message, modulus))
+    
+    @instrumentation.operation('verify_batch')
+    def verify_batch(self, messages: List[Union[str, bytes]], signatures: List[int],
+                     key: Tuple[int, int]) -> List[bool]:
+        """
+        Проверка списка подписей одним открытым ключом
+        
+        При длинной экспоненте (больше BATCH_VERIFY_WEIGHT_BITS бит) пакет
+        из BATCH_VERIFY_MIN_SIZE и более подписей проверяется со случайными
+        весами (см. _verify_batch_range). Короткие экспоненты (3, 17, 65537)
+        и небольшие пакеты дешевле проверять по отдельности
+        """
+        if len(messages) != len(signatures):
+            raise ValueError("Число сообщений и подписей должно совпадать")
+        exponent, modulus = key
+        with instrumentation.phase('hashing'):
+            digests = [self.message_digest(message, modulus) for message in messages]
+        results = [0 <= signature < modulus for signature in signatures]
+        indices = [i for i, valid in enumerate(results) if valid]
+        
+        with instrumentation.phase('exponentiation'):
+            if exponent.bit_length() <= self.BATCH_VERIFY_WEIGHT_BITS:
+                self._verify_each(indices, digests, signatures, key, results)
+            else:
+                self._verify_batch_range(indices, digests, signatures, key, results)
+        return results
+    
+    def _verify_each(self, indices: List[int], digests: List[int], signatures: List[int],
+                     key: Tuple[int, int], results: List[bool]):
+        """Поштучная проверка подписей с номерами indices"""
+        exponent, modulus = key
+        context = self._context(modulus)
+        for i in indices:
+            results[i] = self.modular_exponentiation(signatures[i], exponent, modulus, context) == digests[i]
+    
+    def _verify_batch_range(self, indices: List[int], digests: List[int], signatures: List[int],
+                            key: Tuple[int, int], results: List[bool]):
+        """
+        Проверка подписей с номерами indices со случайными весами
+        
+        Сначала проверяются квадраты: (prod S_i^r_i)^(2e) = (prod H_i^r_i)^2;
+        при несовпадении пакет делится пополам. Квадраты не различают S и
+        S*u при u^2 = 1 (например, n - S), а в неквадратной проверке такие
+        множители с нечетными весами взаимно сокращаются. Поэтому прошедший
+        пакет проверяется еще BATCH_VERIFY_SIGN_ROUNDS раундами по случайным
+        подмножествам T: (prod S_i)^e = prod H_i, i из T. Если хотя бы
+        один раунд не выполняется, подписи проверяются по отдельности
+        """
+        exponent, modulus = key
+        if len(indices) < self.BATCH_VERIFY_MIN_SIZE:
+            self._verify_each(indices, digests, signatures, key, results)
+            return
+        
+        context = self._context(modulus)
+        weights = [random.getrandbits(self.BATCH_VERIFY_WEIGHT_BITS) for _ in indices]
+        signed = number_theory.multi_exponentiation([signatures[i] for i in indices], weights, modulus)
+        expected = number_theory.multi_exponentiation([digests[i] for i in indices], weights, modulus)
+        if self.modular_exponentiation(signed, 2 * exponent, modulus, context) != (expected * expected) % modulus:
+            middle = len(indices) // 2
+            self._verify_batch_range(indices[:middle], digests, signatures, key, results)
+            self._verify_batch_range(indices[middle:], digests, signatures, key, results)
+            return
+        
+        for _ in range(self.BATCH_VERIFY_SIGN_ROUNDS):
+            mask = random.getrandbits(len(indices))
+            signed, expected = 1, 1
+            for position, i in enumerate(indices):
+                if mask >> position & 1:
+                    signed = (signed * signatures[i]) % modulus
+                    expected = (expected * digests[i]) % modulus
+            if self.modular_exponentiation(signed, exponent, modulus, context) != expected:
+                self._verify_each(indices, digests, signatures, key, results)
+                return
+    
     def demonstrate_rsa(self, message: str, user_p: int, user_q: int, user_e: Optional[int] = None):
         """
         Демонстрация работы RSA
+        Заголовки и результаты экспериментов печатаются всегда; ход
+        вычислений (ключи, шифртексты) - только при verbose=True
         """
         print("ДЕМОНСТРАЦИЯ АЛГОРИТМА RSA")
         print("=" * 60)
         
         # Генерируем ключи
         if not self.generate_keys(user_p, user_q, user_e):
+            print("Ключи не сгенерированы: проверьте p, q и e")
             return
         
         print("\n" + "=" * 60)
@@ -468,6 +1032,16 @@ class RSAImplementation:
             print("✓ Эксперимент 3 прошел успешно! (как и ожидалось)")
 
 
+def _decrypt_block_range(block_bytes: bytes, key: Tuple[int, int],
+                         plain_size: int, cipher_size: int) -> bytes:
+    """Расшифрование непрерывного диапазона блоков (выполняется в процессе пула)"""
+    rsa = RSAImplementation()
+    return b"".join(
+        rsa._decrypt_block_value(int.from_bytes(block_bytes[offset:offset + cipher_size], 'big'),
+                                 key, plain_size)
+        for offset in range(0, len(block_bytes), cipher_size))
+
+
 def main():
     """Основная функция программы"""
     print("РЕАЛИЗАЦИЯ АЛГОРИТМА RSA")
@@ -475,7 +1049,7 @@ def main():
     print("=" * 60)
     
     # Создаем экземпляр RSA
-    rsa = RSAImplementation()
+    rsa = RSAImplementation(verbose=True)
     
     # Сообщение для шифрования (фамилия)
     message = "Иванов"  # Замените на свою фамилию
@@ -10,6 +10,16 @@
 Тестирует все функции RSA на корректность работы
 """
 
+import contextlib
+import io
+
+import instrumentation
+import modular_arithmetic
+import modular_benchmark
+import number_theory
+import rsa_benchmark
+from prime_sieve import PrimeSieve, get_prime_sieve
+from rsa_container import RSACiphertextContainer
 from rsa_implementation import RSAImplementation
 
 
@@ -62,6 +72,59 @@ class RSATests:
             result = self.rsa.check_prime(composite)
             self.assert_true(not result['is_prime'], f"Число {composite} должно быть составным")
     
+    def test_prime_dispatch(self):
+        """Тестирование выбора метода проверки простоты по размеру числа"""
+        print("\nТЕСТИРОВАНИЕ ВЫБОРА МЕТОДА ПРОВЕРКИ ПРОСТОТЫ")
+        print("=" * 50)
+        
+        # Малые числа проверяются по таблице, остальные тесты пропускаются
+        result = self.rsa.check_prime(65521)
+        self.assert_equal(result['method'], 'bitmap', "Метод для 65521")
+        self.assert_true(result['is_prime'], "65521 - простое")
+        self.assert_equal(result['skipped_tests'], ['fermat_test', 'miller_rabin_test'],
+                          "Пропущенные тесты для 65521")
+        self.assert_true('simple_test' in result['timings'], "Время простого теста записано")
+        
+        # Сильные псевдопростые по основаниям 2, 3, 5, 7 отсеиваются детерминированным тестом
+        for composite in [3215031751, 3825123056546413051]:
+            result = self.rsa.check_prime(composite)
+            self.assert_equal(result['method'], 'deterministic_miller_rabin', f"Метод для {composite}")
+            self.assert_true(not result['is_prime'], f"Число {composite} должно быть составным")
+        
+        result = self.rsa.check_prime(2 ** 61 - 1)
+        self.assert_true(result['is_prime'], "2^61 - 1 - простое")
+        self.assert_true(result['simple_test'] is None, "Перебор для 2^61 - 1 пропущен")
+        
+        # Большие числа проверяются вероятностным тестом
+        result = self.rsa.check_prime(2 ** 127 - 1)
+        self.assert_equal(result['method'], 'probabilistic_miller_rabin', "Метод для 2^127 - 1")
+        self.assert_true(result['is_prime'], "2^127 - 1 - простое")
+        result = self.rsa.check_prime((2 ** 61 - 1) * (2 ** 89 - 1), error_bound=2 ** -20)
+        self.assert_true(not result['is_prime'], "(2^61 - 1)(2^89 - 1) - составное")
+        self.assert_equal(self.rsa.miller_rabin_rounds(2 ** -80), 40, "Раунды для ошибки 2^-80")
+    
+    def test_prime_sieve(self):
+        """Тестирование общего решета малых простых чисел"""
+        print("\nТЕСТИРОВАНИЕ РЕШЕТА ЭРАТОСФЕНА")
+        print("=" * 50)
+        
+        self.assert_true(get_prime_sieve() is get_prime_sieve(), "Решето общее для процесса")
+        
+        sieve = PrimeSieve()
+        initial_limit = sieve.limit
+        expected = [n for n in range(2, 1000) if all(n % d for d in range(2, n))]
+        self.assert_equal(list(sieve.primes(1000)), expected, "Простые числа до 1000")
+        
+        # Проверка за границей решета расширяет его сегментами
+        self.assert_true(sieve.is_prime(1000003), "1000003 - простое")
+        self.assert_true(not sieve.is_prime(1000001), "1000001 = 101 * 9901 - составное")
+        self.assert_true(sieve.limit > initial_limit, "Решето расширилось")
+        
+        # Большие числа проверяются перебором по простым делителям
+        self.assert_true(sieve.is_prime(2 ** 31 - 1), "2^31 - 1 - простое")
+        self.assert_true(not sieve.is_prime(1000003 * 1000033), "1000003 * 1000033 - составное")
+        self.assert_true(self.rsa.is_prime_simple(2 ** 31 - 1), "Простой тест RSA использует решето")
+    
     def test_gcd(self):
         """Тестирование алгоритма Евклида"""
         print("\nТЕСТИРОВАНИЕ АЛГОРИТМА ЕВКЛИДА")
@@ -101,6 +164,41 @@ class RSATests:
             # Проверяем, что ax + by = gcd
             result = a * x + b * y
             self.assert_equal(result, gcd, f"Расширенный НОД({a}, {b}): {a}*{x} + {b}*{y} = {result}")
+        
+        # Соседние числа Фибоначчи дают максимальное число шагов алгоритма
+        fib = [0, 1]
+        while len(fib) < 6000:
+            fib.append(fib[-1] + fib[-2])
+        gcd, x, y = self.rsa.extended_gcd(fib[-1], fib[-2])
+        self.assert_true(gcd == 1 and fib[-1] * x + fib[-2] * y == 1,
+                         "Расширенный НОД чисел Фибоначчи F(5999), F(5998)")
+        
+        # Ветка Лемера для операндов из нескольких тысяч бит
+        a = 3 ** 4000 + 2
+        b = 2 ** 6000 - 5
+        gcd, x, y = number_theory.lehmer_extended_gcd(a, b)
+        self.assert_true(a * x + b * y == gcd == 1, "Расширенный НОД Лемера для 6000-битных чисел")
+    
+    def test_factorization(self):
+        """Тестирование разложения на множители"""
+        print("\nТЕСТИРОВАНИЕ РАЗЛОЖЕНИЯ НА МНОЖИТЕЛИ")
+        print("=" * 50)
+        
+        test_cases = [
+            (1, {}),
+            (2, {2: 1}),
+            (600851475143, {71: 1, 839: 1, 1471: 1, 6857: 1}),
+            (7 * 1000003 ** 2, {7: 1, 1000003: 2}),
+            (2 ** 64 + 1, {274177: 1, 67280421310721: 1}),
+            ((2 ** 61 - 1) * (2 ** 31 - 1), {2 ** 31 - 1: 1, 2 ** 61 - 1: 1}),
+            (2 ** 255 - 19, {2 ** 255 - 19: 1}),
+        ]
+        for n, expected in test_cases:
+            self.assert_equal(number_theory.factorize(n), expected, f"Разложение {n}")
+        
+        self.assert_true(number_theory.is_probable_prime(2 ** 127 - 1), "2^127 - 1 простое")
+        self.assert_true(not number_theory.is_probable_prime(3215031751), "Псевдопростое по основаниям 2, 3, 5, 7")
+        self.assert_true(not number_theory.is_probable_prime((2 ** 89 - 1) * (2 ** 107 - 1)), "Произведение двух простых")
     
     def test_modular_inverse(self):
         """Тестирование нахождения обратного элемента"""
@@ -124,6 +222,13 @@ class RSATests:
             else:
                 print(f"✗ Обратный элемент для {a} mod {m} не найден")
                 self.tests_failed += 1
+        
+        # Пакетное обращение приемом Монтгомери
+        values = [3, 5, 7, 2, 4, 8, 10]
+        inverses = self.rsa.batch_modular_inverse(values, 11)
+        self.assert_equal([(a * inv) % 11 for a, inv in zip(values, inverses)], [1] * len(values),
+                          "Пакетное обращение по модулю 11")
+        self.assert_true(self.rsa.modular_inverse(4, 8) is None, "4^(-1) mod 8 не существует")
     
     def test_modular_exponentiation(self):
         """Тестирование быстрого возведения в степень"""
@@ -141,6 +246,62 @@ class RSATests:
         for base, exp, mod, expected in test_cases:
             actual = self.rsa.modular_exponentiation(base, exp, mod)
             self.assert_equal(actual, expected, f"{base}^{exp} mod {mod}")
+        
+        # Таблица степеней фиксированного основания
+        modulus = 2 ** 127 - 1
+        table = number_theory.FixedBaseTable(3, modulus, 100)
+        for exponent in (0, 1, 15, 16, 2 ** 100 - 1, 123456789 ** 3, 2 ** 100 + 5):
+            self.assert_equal(table.power(exponent), pow(3, exponent, modulus),
+                              f"3^{exponent} mod 2^127-1 по таблице")
+        
+        self.assert_equal(number_theory.multi_exponentiation([2, 3, 5], [10, 0, 7], 1009),
+                          (pow(2, 10, 1009) * pow(5, 7, 1009)) % 1009, "Произведение степеней (Шамир)")
+        modulus = 2 ** 127 - 1
+        bases = [3, 5, 7, 11, 13, 17]
+        exponents = [2 ** 200 + 12345, 2 ** 127 - 2, 1, 99, 2 ** 64, 31]
+        for count in range(1, len(bases) + 1):
+            expected = 1
+            for base, exponent in zip(bases[:count], exponents[:count]):
+                expected = (expected * pow(base, exponent, modulus)) % modulus
+            self.assert_equal(number_theory.multi_exponentiation(bases[:count], exponents[:count], modulus),
+                              expected, f"Произведение {count} степеней по модулю 2^127-1")
+    
+    def test_modular_contexts(self):
+        """Тестирование контекстов модульной арифметики (деление, Монтгомери, Барретт)"""
+        print("\nТЕСТИРОВАНИЕ КОНТЕКСТОВ МОДУЛЬНОЙ АРИФМЕТИКИ")
+        print("=" * 50)
+        
+        modulus = 2 ** 127 - 1
+        base, exponent = 3 ** 90, 2 ** 130 + 12345
+        for kind in modular_arithmetic.CONTEXT_KINDS:
+            context = modular_arithmetic.modulus_context(modulus, kind)
+            self.assert_equal(context.kind, kind, f"Вид контекста {kind}")
+            self.assert_equal(context.pow(base, exponent), pow(base, exponent, modulus),
+                              f"Степень в контексте {kind}")
+            x, y = context.to_form(base), context.to_form(modulus - 2)
+            self.assert_equal(context.from_form(context.mul(x, y)), (base * (modulus - 2)) % modulus,
+                              f"Умножение в контексте {kind}")
+            self.assert_equal(context.from_form(context.square(x)), (base * base) % modulus,
+                              f"Квадрат в контексте {kind}")
+            self.assert_equal(self.rsa.modular_exponentiation(base, exponent, modulus, context),
+                              pow(base, exponent, modulus), f"Возведение в степень с контекстом {kind}")
+        
+        for kind in modular_arithmetic.CONTEXT_KINDS:
+            composite = modulus * (2 ** 61 - 1)
+            self.assert_true(self.rsa.is_prime_miller_rabin(
+                modulus, 5, context=modular_arithmetic.modulus_context(modulus, kind)),
+                f"Тест Миллера-Рабина в контексте {kind}")
+            self.assert_true(not self.rsa.is_prime_miller_rabin(
+                composite, 5, context=modular_arithmetic.modulus_context(composite, kind)),
+                f"Составное число в тесте Миллера-Рабина ({kind})")
+        self.assert_true(modular_arithmetic.modulus_context(modulus) is modular_arithmetic.modulus_context(modulus),
+                         "Кэш контекстов модуля")
+        self.assert_equal(modular_arithmetic.modulus_context(1000, 'montgomery').kind, 'division',
+                          "Четный модуль без формы Монтгомери")
+        self.assert_equal(modular_arithmetic.modulus_context(1, 'barrett').pow(7, 5), 0, "Модуль 1")
+        
+        records = modular_benchmark.run_benchmark([64], repeats=2, squarings=8, seed=1)
+        self.assert_equal(len(records), 11, "Замеры контекстов и встроенной pow")
     
     def test_text_conversion(self):
         """Тестирование преобразования текста в числа и обратно"""
@@ -163,6 +324,50 @@ class RSATests:
             numbers = self.rsa.text_to_numbers(message)
             restored = self.rsa.numbers_to_text(numbers)
             self.assert_equal(restored, message, f"Преобразование '{message}'")
+        
+        # Пакетное преобразование совпадает с посимвольным
+        message = "Гусев В.М. КВМО-11-24 \U0001d11e" * 1000
+        numbers = self.rsa.text_to_numbers(message)
+        self.assert_equal(numbers, [ord(char) + 1000 for char in message], "Коды длинного сообщения")
+        self.assert_equal(self.rsa.numbers_to_text(numbers), message, "Восстановление длинного сообщения")
+        
+        # Числа вне быстрого пути обрабатываются посимвольно, с прежними ошибками
+        self.assert_equal(self.rsa.numbers_to_text([1065, 0xD800 + 1000]), "A\ud800", "Суррогатный код")
+        for numbers in ([999], [1000 + 0x110000]):
+            try:
+                self.rsa.numbers_to_text(numbers)
+                self.assert_true(False, f"Ошибка для кодов {numbers}")
+            except ValueError:
+                self.assert_true(True, f"Ошибка для кодов {numbers}")
+    
+    def test_public_exponent_selection(self):
+        """Тестирование выбора открытой экспоненты"""
+        print("\nТЕСТИРОВАНИЕ ВЫБОРА ОТКРЫТОЙ ЭКСПОНЕНТЫ")
+        print("=" * 50)
+        
+        # Сначала числа Ферма, затем простые с весом Хэмминга 3
+        self.assert_equal(self.rsa.find_e(120), 17, "e для φ = 120")
+        self.assert_equal(self.rsa.find_e(2 * 3 * 5 * 17 * 257 * 65537), 7, "e, когда числа Ферма не подходят")
+        
+        selection = self.rsa.select_public_exponent(2 ** 200, min_e=65538)
+        self.assert_equal(selection['e'], 65539, "Наименьшая по стоимости e >= 65538")
+        self.assert_equal(selection['encryption_cost'],
+                          {'squarings': 17, 'multiplications': 3, 'modular_operations': 20},
+                          "Стоимость шифрования для e = 65539")
+        
+        # Взаимная простота проверяется по разложениям p-1 и q-1
+        success = self.rsa.generate_keys(1000003, 1000033)
+        self.assert_true(success, "Генерация ключей с разложением p-1 и q-1")
+        factors, cofactor = self.rsa.p_minus_1_factors
+        product = cofactor
+        for prime, power in factors.items():
+            product *= prime ** power
+        self.assert_equal(product, 1000002, "Разложение p-1")
+        self.assert_equal(self.rsa.e, 5, "e = 5 (3 делит p-1 = 1000002)")
+        self.assert_equal(self.rsa.e_selection['hamming_weight'], 2, "Вес Хэмминга e")
+        
+        success = self.rsa.generate_keys(1000003, 1000033, min_e=65537)
+        self.assert_true(success and self.rsa.e >= 65537, "Генерация ключей с e >= 65537")
     
     def test_key_generation(self):
         """Тестирование генерации ключей"""
@@ -211,6 +416,218 @@ class RSATests:
             
             self.assert_equal(decrypted, message, f"Шифрование/расшифрование '{message}'")
     
+    def test_verbose_flag(self):
+        """Тестирование тихого и подробного режимов"""
+        print("\nТЕСТИРОВАНИЕ ТИХОГО РЕЖИМА")
+        print("=" * 50)
+        
+        quiet, verbose = RSAImplementation(), RSAImplementation(verbose=True)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            quiet.generate_keys(11, 13)
+            encrypted = quiet.encrypt("HI", quiet.public_key)
+        self.assert_equal(output.getvalue(), "", "Тихий режим ничего не печатает")
+        
+        verbose.generate_keys(11, 13)
+        with contextlib.redirect_stdout(output):
+            decrypted = verbose.decrypt(encrypted, quiet.private_key)
+        self.assert_true(decrypted == "HI" and "Расшифрованное сообщение: 'HI'" in output.getvalue(),
+                         "Подробный режим печатает ход расшифрования")
+        
+        # Демонстрация печатает результаты экспериментов и в тихом режиме
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            RSAImplementation().demonstrate_rsa("HI", 11, 13)
+        self.assert_true("✓ Эксперимент 2 прошел успешно!" in output.getvalue()
+                         and "Открытый ключ" not in output.getvalue(),
+                         "demonstrate_rsa печатает результаты без хода вычислений")
+    
+    def test_stream_encryption(self):
+        """Тестирование потокового шифрования"""
+        print("\nТЕСТИРОВАНИЕ ПОТОКОВОГО ШИФРОВАНИЯ")
+        print("=" * 50)
+        
+        success = self.rsa.generate_keys(1000003, 1000033)
+        self.assert_true(success, "Генерация ключей для потокового шифрования")
+        if not success:
+            return
+        
+        plain_size, cipher_size = self.rsa.stream_block_sizes(self.rsa.n)
+        header_size = self.rsa.STREAM_HEADER.size
+        for data in [b"", b"RSA", bytes(range(256)) * 3, "Криптография".encode("utf-8")]:
+            encrypted = io.BytesIO()
+            written = self.rsa.encrypt_stream(io.BytesIO(data), encrypted, self.rsa.public_key)
+            blocks = (len(encrypted.getvalue()) - header_size) // cipher_size
+            self.assert_equal(blocks, len(data) // plain_size + 1, f"Число блоков для {len(data)} байт")
+            
+            encrypted.seek(0)
+            decrypted = io.BytesIO()
+            read = self.rsa.decrypt_stream(encrypted, decrypted, self.rsa.private_key)
+            self.assert_true(written == read == len(data) and decrypted.getvalue() == data,
+                             f"Потоковое шифрование/расшифрование {len(data)} байт")
+        
+        # Слишком малый модуль не вмещает даже одного байта
+        try:
+            self.rsa.stream_block_sizes(143)
+            self.assert_true(False, "Ошибка для модуля 143")
+        except ValueError:
+            self.assert_true(True, "Ошибка для модуля 143")
+    
+    def test_ciphertext_container(self):
+        """Тестирование двоичного контейнера шифртекста"""
+        print("\nТЕСТИРОВАНИЕ ДВОИЧНОГО КОНТЕЙНЕРА")
+        print("=" * 50)
+        
+        success = self.rsa.generate_keys(1000003, 1000033)
+        self.assert_true(success, "Генерация ключей для контейнера")
+        if not success:
+            return
+        
+        message = "Иванов: шифрование фамилии"
+        data = self.rsa.encrypt_container(message, self.rsa.public_key)
+        container = RSACiphertextContainer(data)
+        payload = message.encode("utf-8")
+        self.assert_equal(container.payload_length, len(payload), "Длина данных в заголовке")
+        self.assert_equal(len(container), -(-len(payload) // container.plain_size), "Число блоков")
+        self.assert_equal(len(data), container.HEADER.size + len(container) * container.cipher_size,
+                          "Фиксированная ширина блоков")
+        
+        decrypted = self.rsa.decrypt_container(data, self.rsa.private_key)
+        self.assert_equal(decrypted.decode("utf-8"), message, "Расшифрование контейнера")
+        
+        # Любой блок расшифровывается независимо
+        last = len(container) - 1
+        chunk = self.rsa.decrypt_container_block(container, last, self.rsa.private_key)
+        self.assert_equal(chunk, payload[last * container.plain_size:], "Независимое расшифрование блока")
+        
+        # Параллельное расшифрование собирает блоки в исходном порядке
+        long_message = message * 40
+        long_data = self.rsa.encrypt_container(long_message, self.rsa.public_key)
+        self.rsa.PARALLEL_THRESHOLD_BLOCKS = 16
+        try:
+            decrypted = self.rsa.decrypt_container(long_data, self.rsa.private_key, workers=3)
+        finally:
+            del self.rsa.PARALLEL_THRESHOLD_BLOCKS
+        self.assert_equal(decrypted.decode("utf-8"), long_message, "Параллельное расшифрование контейнера")
+        
+        # Контейнер чужого ключа отвергается
+        other = RSAImplementation()
+        other.generate_keys(1000037, 1000039)
+        try:
+            other.decrypt_container(data, other.private_key)
+            self.assert_true(False, "Контейнер чужого ключа отвергается")
+        except ValueError:
+            self.assert_true(True, "Контейнер чужого ключа отвергается")
+    
+    def test_instrumentation(self):
+        """Тестирование подсчета операций и времени этапов"""
+        print("\nТЕСТИРОВАНИЕ ИНСТРУМЕНТИРОВАНИЯ")
+        print("=" * 50)
+        
+        with instrumentation.instrumented() as stats:
+            self.rsa.generate_keys(11, 13)
+            encrypted = self.rsa.encrypt("Hi", self.rsa.public_key)
+            self.rsa.decrypt(encrypted, self.rsa.private_key)
+        report = stats.to_dict()
+        
+        phases = report['operations']['generate_keys']['phases']
+        self.assert_true({'prime_check', 'e_selection', 'e_inverse'} <= set(phases),
+                         "Этапы генерации ключей")
+        self.assert_true({'text_conversion', 'exponentiation'} <= set(report['operations']['encrypt']['phases']),
+                         "Этапы шифрования")
+        
+        # Каждое возведение в степень e дает столько умножений, сколько единиц в записи e
+        encrypt_stats = report['operations']['encrypt']
+        exponentiations = encrypt_stats['modular_exponentiations']
+        self.assert_equal(exponentiations, len([c for c in encrypted if c < self.rsa.n]),
+                          "Число возведений в степень при шифровании")
+        self.assert_equal(encrypt_stats['modular_multiplications'],
+                          bin(self.rsa.e).count('1') * exponentiations,
+                          "Число умножений при шифровании")
+        self.assert_true('"generate_keys"' in stats.to_json(), "Экспорт в JSON")
+        
+        # Без блока with статистика не накапливается
+        self.rsa.encrypt("Hi", self.rsa.public_key)
+        self.assert_equal(stats.totals['modular_exponentiations'], report['totals']['modular_exponentiations'],
+                          "Инструментирование выключено вне блока with")
+    
+    def test_signatures(self):
+        """Тестирование подписи и пакетной проверки"""
+        print("\nТЕСТИРОВАНИЕ ПОДПИСИ")
+        print("=" * 50)
+        
+        rsa_benchmark.make_key(self.rsa, 256, '65537')
+        messages = [f"Сообщение {i}" for i in range(20)] + [b"\x00\xff", b""]
+        signatures = self.rsa.sign_batch(messages)
+        digests = [self.rsa.message_digest(message, self.rsa.n) for message in messages]
+        self.assert_equal(signatures, [self.rsa.modular_exponentiation(digest, self.rsa.d, self.rsa.n)
+                                       for digest in digests], "Подпись по КТО совпадает с H(M)^d mod n")
+        self.assert_equal(self.rsa.sign(messages[0]), signatures[0], "Одиночная подпись")
+        self.assert_true(self.rsa.verify(messages[0], signatures[0], self.rsa.public_key),
+                         "Проверка верной подписи")
+        self.assert_true(not self.rsa.verify(messages[1], signatures[0], self.rsa.public_key),
+                         "Подпись другого сообщения отклоняется")
+        
+        # Короткая экспонента: поштучная проверка; длинная: проверка со случайными весами
+        for exponent in ('65537', 'random'):
+            rsa_benchmark.make_key(self.rsa, 256, exponent)
+            signatures = self.rsa.sign_batch(messages)
+            self.assert_true(all(self.rsa.verify_batch(messages, signatures, self.rsa.public_key)),
+                             f"Пакетная проверка верных подписей (e = {exponent})")
+            forged = list(signatures)
+            forged[3] = forged[3] * 2 % self.rsa.n
+            forged[7] = forged[7] * pow(2, -1, self.rsa.n) % self.rsa.n  # произведение не меняется
+            forged[10] = self.rsa.n
+            results = self.rsa.verify_batch(messages, forged, self.rsa.public_key)
+            self.assert_equal([i for i, valid in enumerate(results) if not valid], [3, 7, 10],
+                              f"Пакетная проверка находит неверные подписи (e = {exponent})")
+        
+        # Пакет со случайными весами: подписи n - S с нечетными весами взаимно сокращаются
+        # в (prod S_i^r_i)^e и не различаются квадратами, их находят раунды по подмножествам
+        batch = [f"Пакет {i}" for i in range(self.rsa.BATCH_VERIFY_MIN_SIZE + 2)]
+        signatures = self.rsa.sign_batch(batch)
+        self.assert_true(all(self.rsa.verify_batch(batch, signatures, self.rsa.public_key)),
+                         "Пакетная проверка большого пакета верных подписей")
+        negated = list(signatures)
+        negated[5] = self.rsa.n - negated[5]
+        negated[9] = self.rsa.n - negated[9]
+        self.assert_true(all([i for i, valid in enumerate(self.rsa.verify_batch(batch, negated, self.rsa.public_key))
+                              if not valid] == [5, 9] for _ in range(10)),
+                         "Пакетная проверка отклоняет пару подписей n - S")
+        negated[20] = negated[20] * 2 % self.rsa.n
+        self.assert_equal([i for i, valid in enumerate(self.rsa.verify_batch(batch, negated, self.rsa.public_key))
+                           if not valid], [5, 9, 20], "Пакетная проверка: подписи n - S и неверная подпись")
+        
+        records = rsa_benchmark.measure_signatures(self.rsa, 50)
+        self.assert_true([record['operation'] for record in records] == ['sign', 'verify']
+                         and all(record['signatures_per_s'] > 0 for record in records),
+                         "Замер пропускной способности подписи")
+    
+    def test_benchmark(self):
+        """Тестирование генерации простых чисел и набора замеров"""
+        print("\nТЕСТИРОВАНИЕ НАБОРА ЗАМЕРОВ")
+        print("=" * 50)
+        
+        prime = self.rsa.generate_prime(64, e=3)
+        self.assert_true(prime.bit_length() == 64 and self.rsa.check_prime(prime)['is_prime'],
+                         "Генерация 64-битного простого числа")
+        self.assert_true((prime - 1) % 3 != 0, "НОД(3, p - 1) = 1")
+        
+        self.assert_equal(rsa_benchmark.percentile([5, 1, 4, 2, 3], 50), 3, "Медиана")
+        self.assert_equal(rsa_benchmark.percentile(list(range(1, 101)), 99), 99, "Перцентиль p99")
+        
+        results = rsa_benchmark.run_benchmark([64], ['3', 'random'], [32], repeats=2, keygen_repeats=1)
+        self.assert_equal(len(results['keygen']), 2, "Замеры генерации ключей")
+        self.assert_equal([record['operation'] for record in results['operations']],
+                          ['encrypt', 'decrypt', 'encrypt_container', 'decrypt_container'] * 2,
+                          "Замеры encrypt/decrypt и контейнера")
+        self.assert_true(all(record['latency']['throughput_bytes_per_s'] > 0
+                             for record in results['operations']), "Пропускная способность")
+        
+        comparison = rsa_benchmark.compare(results, results)
+        self.assert_true(len(comparison) == 10 and not any(item['regression'] for item in comparison),
+                         "Сравнение с базовыми результатами")
+    
     def test_rsa_properties(self):
         """Тестирование свойств RSA"""
         print("\nТЕСТИРОВАНИЕ СВОЙСТВ RSA")
@@ -256,6 +673,16 @@ class RSATests:
         # Тест 3: Одинаковые простые числа
         success = self.rsa.generate_keys(11, 11)
         self.assert_true(not success, "Ошибка при одинаковых простых числах")
+        
+        # Тест 4: Подпись ключом с p = q, заданным вручную
+        rsa = RSAImplementation()
+        rsa.p = rsa.q = 11
+        rsa.n, rsa.e, rsa.d = 121, 3, 7
+        try:
+            rsa.sign("M")
+            self.assert_true(False, "Ошибка подписи при p = q")
+        except ValueError:
+            self.assert_true(True, "Ошибка подписи при p = q")
     
     def run_all_tests(self):
         """Запуск всех тестов"""
@@ -264,13 +691,24 @@ class RSATests:
         print("=" * 60)
         
         self.test_prime_detection()
+        self.test_prime_dispatch()
+        self.test_prime_sieve()
         self.test_gcd()
         self.test_extended_gcd()
+        self.test_factorization()
         self.test_modular_inverse()
         self.test_modular_exponentiation()
+        self.test_modular_contexts()
         self.test_text_conversion()
+        self.test_public_exponent_selection()
         self.test_key_generation()
         self.test_encryption_decryption()
+        self.test_verbose_flag()
+        self.test_stream_encryption()
+        self.test_ciphertext_container()
+        self.test_instrumentation()
+        self.test_signatures()
+        self.test_benchmark()
         self.test_rsa_properties()
         self.test_error_handling()
         
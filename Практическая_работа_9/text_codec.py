@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Пакетное преобразование текста в числа и обратно для RSA и Эль-Гамаля
+Практическая работа №9 - Вариант 7
+
+Автор: Гусев В.М. КВМО-11-24
+Дата: 2025
+
+Текст кодируется одним вызовом str.encode в буфер array('I'), смещение
+прибавляется ко всем кодам сразу сложением двух длинных чисел (коды
+занимают 32-битные разряды, переносов между разрядами нет). Обратное
+преобразование - одно вычитание и один вызов bytes.decode. Мегабайтные
+сообщения преобразуются за миллисекунды вместо посимвольного цикла.
+
+Если данные не укладываются в быстрый путь (отрицательные числа, коды
+вне диапазона Unicode), используется посимвольное преобразование
+с прежним поведением, включая исключения.
+"""
+
+from array import array
+from typing import Iterable, List, Sequence, Union
+
+# Кодировка, совпадающая с форматом array('I') на данной платформе
+_UTF32 = 'utf-32-le' if array('I', [1]).tobytes()[0] == 1 else 'utf-32-be'
+_BYTEORDER = 'little' if _UTF32 == 'utf-32-le' else 'big'
+
+# Алфавитное кодирование Эль-Гамаля: A=1, ..., Z=26, пробел=27,
+# прочие символы - (код % 26) + 1
+ALPHABET_SPACE = 27
+# Основание упаковки алфавитных кодов в блоки (коды 1..27 и ноль)
+ALPHABET_BASE = 28
+
+
+def _packed(values: array) -> int:
+    """Буфер 32-битных чисел как одно длинное число"""
+    return int.from_bytes(values.tobytes(), _BYTEORDER)
+
+
+def _unpacked(value: int, count: int) -> array:
+    """Обратное к _packed преобразование"""
+    result = array('I')
+    result.frombytes(value.to_bytes(4 * count, _BYTEORDER))
+    return result
+
+
+def _repeated(offset: int, count: int) -> int:
+    """Длинное число, в каждом из count 32-битных разрядов которого записано offset"""
+    return int.from_bytes(array('I', [offset]).tobytes() * count, _BYTEORDER)
+
+
+def encode_offset(text: str, offset: int) -> array:
+    """
+    Коды символов text, увеличенные на offset, в виде array('I')
+    (offset + 0x10FFFF должно помещаться в 32 бита)
+    """
+    codes = array('I')
+    codes.frombytes(text.encode(_UTF32, 'surrogatepass'))
+    if offset and codes:
+        codes = _unpacked(_packed(codes) + _repeated(offset, len(codes)), len(codes))
+    return codes
+
+
+def decode_offset(numbers: Union[Sequence[int], array], offset: int) -> str:
+    """Текст по кодам символов, увеличенным на offset"""
+    try:
+        codes = numbers if isinstance(numbers, array) and numbers.typecode == 'I' else array('I', numbers)
+        if codes and min(codes) < offset:
+            raise OverflowError("Код меньше смещения")
+        if offset and codes:
+            codes = _unpacked(_packed(codes) - _repeated(offset, len(codes)), len(codes))
+        return codes.tobytes().decode(_UTF32, 'surrogatepass')
+    except (OverflowError, TypeError, UnicodeDecodeError):
+        return _decode_offset_slow(numbers, offset)
+
+
+def _decode_offset_slow(numbers: Iterable[int], offset: int) -> str:
+    """Посимвольное преобразование (исключения как у chr)"""
+    return ''.join([chr(number - offset) for number in numbers])
+
+
+def _alphabet_code(char: str) -> int:
+    """Алфавитный код одного символа"""
+    if char == ' ':
+        return ALPHABET_SPACE
+    if char.isalpha():
+        return ord(char.upper()) - ord('A') + 1
+    return (ord(char) % 26) + 1
+
+
+def _alphabet_char(number: int) -> str:
+    """Символ по алфавитному коду"""
+    if number == ALPHABET_SPACE:
+        return ' '
+    return chr((number - 1) % 26 + ord('A'))
+
+
+# Таблицы перекодировки ASCII -> алфавитный код и байт -> символ
+_ALPHABET_ENCODE = bytes(_alphabet_code(chr(code)) for code in range(128)) + bytes(128)
+_ALPHABET_DECODE = bytes(ord(_alphabet_char(number)) for number in range(256))
+
+
+def encode_alphabet(text: str) -> Union[bytes, array]:
+    """
+    Алфавитные коды символов text
+    Текст ASCII перекодируется одним вызовом bytes.translate (по байту
+    на символ), остальной текст - посимвольно в array('I')
+    """
+    if text.isascii():
+        return text.encode('ascii').translate(_ALPHABET_ENCODE)
+    return array('I', [_alphabet_code(char) for char in text])
+
+
+def decode_alphabet(numbers: Union[Sequence[int], bytes]) -> str:
+    """Текст по алфавитным кодам"""
+    try:
+        return bytes(numbers).translate(_ALPHABET_DECODE).decode('ascii')
+    except (ValueError, TypeError):
+        return ''.join([_alphabet_char(number) for number in numbers])
+
+
+def alphabet_block_size(modulus: int) -> int:
+    """Наибольшее число символов алфавита, упаковываемых в одно число меньше modulus"""
+    size = 0
+    capacity = ALPHABET_BASE
+    while capacity <= modulus:
+        size += 1
+        capacity *= ALPHABET_BASE
+    return size
+
+
+def pack_alphabet(codes: Sequence[int], block_size: int) -> List[int]:
+    """
+    Упаковка алфавитных кодов в числа по block_size символов
+    (цифры системы счисления с основанием 28, младшая цифра - первый символ)
+    Коды вне 1..27 приводятся к коду того же символа при обратном
+    преобразовании, поэтому все цифры ненулевые и длина блока
+    восстанавливается без дополнительных данных
+    """
+    if block_size < 1:
+        raise ValueError("В блок должен помещаться хотя бы один символ")
+    digits = [code if code == ALPHABET_SPACE else (code - 1) % 26 + 1 for code in codes]
+    blocks = []
+    for start in range(0, len(digits), block_size):
+        value = 0
+        for digit in reversed(digits[start:start + block_size]):
+            value = value * ALPHABET_BASE + digit
+        blocks.append(value)
+    return blocks
+
+
+def unpack_alphabet(blocks: Iterable[int]) -> List[int]:
+    """Алфавитные коды из чисел, упакованных pack_alphabet"""
+    codes = []
+    for value in blocks:
+        while value:
+            value, digit = divmod(value, ALPHABET_BASE)
+            codes.append(digit)
+    return codes
+
+
+def to_list(codes: Union[array, bytes]) -> List[int]:
+    """Коды в виде списка целых чисел"""
+    return codes.tolist() if isinstance(codes, array) else list(codes)